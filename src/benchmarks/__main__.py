@@ -0,0 +1,52 @@
+"""Benchmarks of the petoi agent.
+
+Usage:
+    1. Move to the 'src' directory.
+    2. Run '{your python interpreter} -m benchmarks {benchmark} [--json PATH]'
+
+    EX) Run the benchmark of the serial hot path and save the results as a json.
+        $ python -m benchmarks serial --json ../bench_output.txt
+"""
+import sys
+import os
+import argparse
+import logging
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from benchmarks import bench_serial, bench_read_port, bench_api_load, bench_pack_memory
+from benchmarks.report import make_report, write_json, print_results
+
+
+BENCHMARKS = {
+    'serial': bench_serial,
+    'read-port': bench_read_port,
+    'api-load': bench_api_load,
+    'pack-memory': bench_pack_memory,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        prog='benchmarks', description=__doc__.split('\n')[0])
+    parser.add_argument('--loglevel', default='WARNING')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    for name, module in BENCHMARKS.items():
+        subparser = subparsers.add_parser(name, help=module.__doc__.split('\n')[0])
+        subparser.add_argument('--json', metavar='PATH',
+                               help="Save the results as a json ('-' for the stdout).")
+        module.add_arguments(subparser)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=args.loglevel)
+
+    results = BENCHMARKS[args.benchmark].run(args)
+
+    params = {k: v for k, v in vars(args).items() if k not in ('benchmark', 'json', 'loglevel')}
+    report = make_report(args.benchmark, params, results)
+    if args.json:
+        write_json(report, args.json)
+    if args.json != '-':
+        print_results(results)
+
+    sys.exit()
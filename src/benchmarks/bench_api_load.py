@@ -0,0 +1,124 @@
+"""Load test of the ApiClient against the local mock API server.
+
+Runs the concurrent clients polling the action, each with its own token,
+and measures the request rate, the latency and the token fetches.
+"""
+import os
+import time
+import tempfile
+import threading
+
+from modules.api_client import ApiClient
+from modules.mock_api_server import MockApiServer
+from benchmarks.report import summarize
+
+
+CLIENTS = 8
+
+REQUESTS = 50
+
+
+def add_arguments(parser):
+    parser.add_argument('--clients', type=int, default=CLIENTS)
+    parser.add_argument('--requests', type=int, default=REQUESTS, help='Requests per client.')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds of the server latency (the min if --latency-max is set).')
+    parser.add_argument('--latency-max', type=float, default=None)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--token-lifetime', type=int, default=MockApiServer.TOKEN_LIFETIME)
+    parser.add_argument('--retries', type=int, default=ApiClient.RETRIES)
+    parser.add_argument('--no-not-modified', action='store_true',
+                        help="The server never answers '304 Not Modified'.")
+
+
+def run_client(client, requests, latencies, statuses, errors):
+    """Poll the action, on the worker thread."""
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            status, _ = client.get_action()
+        except Exception:
+            # i.e) The token has expired before the background refresh.
+            errors.append(1)
+            refresh_token(client)
+            continue
+
+        latencies.append(time.perf_counter() - started)
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 401:
+            refresh_token(client)
+
+
+def refresh_token(client):
+    try:
+        client.refresh_token(timeout=5)
+    except Exception:
+        # Already logged in the 'fetch_token', count it by the next request.
+        pass
+
+
+def run(args):
+    """Run the benchmark and returns the results as a dict."""
+    # The mock server is served over the plain http.
+    os.environ.setdefault('OAUTHLIB_INSECURE_TRANSPORT', '1')
+
+    latency = args.latency if args.latency_max is None else (args.latency, args.latency_max)
+    server = MockApiServer(
+        latency=latency, error_rate=args.error_rate, token_lifetime=args.token_lifetime,
+        not_modified=not args.no_not_modified, seed=0)
+
+    latencies = [[] for _ in range(args.clients)]
+    statuses = [{} for _ in range(args.clients)]
+    errors = [[] for _ in range(args.clients)]
+
+    with server, tempfile.TemporaryDirectory() as cache_root:
+        clients = []
+        for i in range(args.clients):
+            cache_dir = f'{cache_root}/{i}'
+            os.mkdir(cache_dir)
+            client = ApiClient(
+                f'bench-client-{i}', 'bench-secret',
+                end_point_token=server.end_point_token,
+                end_point_action=server.end_point_action,
+                cache_dir=cache_dir, retries=args.retries, backoff_base=0.01)
+            client.fetch_token()
+            client.start_auto_refresh()
+            clients.append(client)
+
+        workers = [
+            threading.Thread(
+                target=run_client,
+                args=(client, args.requests, latencies[i], statuses[i], errors[i]))
+            for i, client in enumerate(clients)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        for client in clients:
+            client.stop_auto_refresh()
+
+        server_stats = server.stats
+
+    all_latencies = [val for values in latencies for val in values]
+    all_statuses = {}
+    for counts in statuses:
+        for status, count in counts.items():
+            all_statuses[str(status)] = all_statuses.get(str(status), 0) + count
+
+    return {
+        'requests': len(all_latencies),
+        'seconds': elapsed,
+        'per_second': len(all_latencies) / elapsed,
+        'latency_ms': summarize(all_latencies, 1000),
+        'statuses': all_statuses,
+        'errors': sum(len(values) for values in errors),
+        'server': {
+            'action_requests': server_stats['action_requests'],
+            'token_fetches': server_stats['token_requests'],
+            'statuses': {str(k): v for k, v in server_stats['statuses'].items()},
+        },
+    }
@@ -0,0 +1,90 @@
+"""Benchmark of the memory of the CommandPack.
+
+Compares the compact CommandPack with the former list of dicts
+for a generated choreography of 'm' frames, parsed from the json as the API delivers.
+"""
+import gc
+import json
+import time
+import random
+import logging
+import traceback
+import tracemalloc
+
+from modules.serial_agent import CommandPack
+
+
+COMMANDS = 20000
+
+JOINTS = (0, 8, 9, 10, 11, 12, 13, 14, 15)
+
+
+def make_payload(commands, seed=0):
+    """Returns the json of the choreography of the 'm' frames."""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(commands):
+        joints = rng.sample(JOINTS, 4)
+        cmd = 'm' + ' '.join(f'{joint} {rng.randint(-45, 45)}' for joint in joints)
+        items.append({'cmd': cmd, 'duration': rng.randint(0, 3)})
+    return json.dumps({'commandPack': items})
+
+
+def legacy_command_pack(data):
+    """The former implementation of the 'CommandPack', returns the items."""
+    items = []
+    try:
+        tmp = json.loads(data)
+    except:
+        logging.error('Fails to load json. (%s)', traceback.format_exc())
+        raise
+
+    validator = CommandPack()
+    for item in tmp.get('commandPack', []):
+        if type(item) is not dict:
+            continue
+        duration = item.get('duration', 0)
+        if not validator.is_valid_duration(duration):
+            continue
+        cmd = item.get('cmd', '')
+        if not validator.is_valid_cmd(cmd):
+            continue
+        items.append({'cmd': cmd, 'duration': int(duration)})
+
+    return items
+
+
+def measure(build, payload):
+    """Returns the bytes retained by the built object, the peak bytes and the seconds to build."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    built = build(payload)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del built
+    return retained, peak, elapsed
+
+
+def add_arguments(parser):
+    parser.add_argument('--commands', type=int, default=COMMANDS)
+
+
+def run(args):
+    """Run the benchmark and returns the results as a dict."""
+    payload = make_payload(args.commands)
+
+    results = {'payload_bytes': len(payload)}
+    for name, build in (('legacy', legacy_command_pack), ('compact', CommandPack)):
+        retained, peak, elapsed = measure(build, payload)
+        results[name] = {
+            'retained_bytes': retained,
+            'bytes_per_command': retained / args.commands,
+            'peak_bytes': peak,
+            'build_ms': elapsed * 1000,
+        }
+
+    results['reduction'] = results['legacy']['retained_bytes'] / results['compact']['retained_bytes']
+    return results
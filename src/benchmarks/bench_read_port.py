@@ -0,0 +1,106 @@
+"""Benchmark of the receive path of the SerialAgent.
+
+Compares the bulk byte-level 'read_port' with the former per-line
+'readline' + 're.sub' implementation for bursts of board messages.
+"""
+import re
+import time
+from statistics import median
+
+from modules.serial_agent import SerialAgent
+
+
+BURST_LINES = 500
+
+REPEAT = 20
+
+SAMPLE_LINE = b'1283 105 26 61\r\n'
+
+
+class BurstSerial:
+    """In-memory stand-in of the 'serial.Serial' holding a burst of lines."""
+
+    def __init__(self) -> None:
+        self.is_open = True
+        self._rx = b''
+        self._pos = 0
+
+    def load(self, data):
+        self._rx = data
+        self._pos = 0
+
+    @property
+    def in_waiting(self):
+        return len(self._rx) - self._pos
+
+    def read(self, size=1):
+        data = self._rx[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+    def readline(self):
+        end = self._rx.find(b'\n', self._pos)
+        end = len(self._rx) if end < 0 else end + 1
+        data = self._rx[self._pos:end]
+        self._pos = end
+        return data
+
+
+def legacy_read_port(ser, repeat_read_delay=0.01, max_readable_line=500):
+    """The former implementation of 'SerialAgent.read_port'."""
+    if (not ser.is_open or ser.in_waiting == 0):
+        return []
+
+    msg = []
+    repeat_counter = 0
+    while True:
+        time.sleep(repeat_read_delay)
+        repeat_counter += 1
+        if (ser.in_waiting == 0 or repeat_counter > max_readable_line):
+            break
+
+        buff = ser.readline()
+        if type(buff) == bytes:
+            msg.append(re.sub(
+                '\n|\r\n', '', buff.decode('utf-8', 'ignore')))
+
+    return msg
+
+
+def measure(read, ser, burst, repeat):
+    """Returns the median seconds to drain the burst and the number of lines read."""
+    elapsed = []
+    lines = 0
+    for _ in range(repeat):
+        ser.load(burst)
+        started = time.perf_counter()
+        lines = len(read())
+        elapsed.append(time.perf_counter() - started)
+
+    return median(elapsed), lines
+
+
+def add_arguments(parser):
+    parser.add_argument('--lines', type=int, default=BURST_LINES)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--with-delay', action='store_true',
+                        help='Keep the per-line REPEAT_READ_DELAY sleep of the legacy path.')
+
+
+def run(args):
+    """Run the benchmark and returns the results as a dict."""
+    burst = SAMPLE_LINE * args.lines
+    ser = BurstSerial()
+    agent = SerialAgent('bench://', serial_api=ser, start_up_waiting=0)
+
+    delay = SerialAgent.REPEAT_READ_DELAY if args.with_delay else 0
+    legacy_ms, legacy_lines = measure(
+        lambda: legacy_read_port(ser, repeat_read_delay=delay), ser, burst,
+        1 if args.with_delay else args.repeat)
+    bulk_ms, bulk_lines = measure(agent.read_port, ser, burst, args.repeat)
+
+    return {
+        'legacy': {'ms': legacy_ms * 1000, 'lines': legacy_lines},
+        'bulk': {'ms': bulk_ms * 1000, 'lines': bulk_lines},
+        'speedup': legacy_ms / bulk_ms,
+    }
@@ -0,0 +1,148 @@
+"""Benchmark of the serial hot path of the SerialAgent.
+
+Drives 'write_command', 'read_port' and 'is_ready' against the VirtualBittle
+on a pseudo-terminal at 115200 baud.
+
+Measures:
+    - connect: Seconds from creating the agent until the board is ready.
+    - commands: Commands per second, write-to-ack latency and CPU per command
+      (of the calling thread, the emulator and the reader thread are excluded).
+    - drain: Seconds for 'read_port' to take N-line bursts out of the port.
+    - is_ready: Seconds per 'is_ready' call on the ready board.
+"""
+import time
+import threading
+
+from modules.serial_agent import SerialAgent
+from modules.virtual_bittle import VirtualBittle
+from benchmarks.report import summarize
+
+
+COMMANDS = 200
+
+BURST_LINES = 500
+
+BURSTS = 10
+
+IS_READY_CALLS = 10000
+
+SAMPLE_COMMAND = 'm8 15 9 0 13 30 9 38'
+
+SAMPLE_LINE = '1283 105 26 61'
+
+# Max seconds to drain a burst.
+DRAIN_TIMEOUT = 10
+
+# Seconds to wait before reading again, when nothing is read.
+DRAIN_POLL_INTERVAL = 0.0005
+
+
+def add_arguments(parser):
+    parser.add_argument('--baudrate', type=int, default=VirtualBittle.BAUDRATE)
+    parser.add_argument('--commands', type=int, default=COMMANDS,
+                        help='Number of the commands to send.')
+    parser.add_argument('--burst-lines', type=int, default=BURST_LINES,
+                        help='Number of the lines in a burst.')
+    parser.add_argument('--bursts', type=int, default=BURSTS,
+                        help='Number of the bursts to drain.')
+    parser.add_argument('--reader-thread', action='store_true',
+                        help='Receive on the background reader thread.')
+
+
+def bench_connect(bittle, **agent_kwargs):
+    started = time.perf_counter()
+    agent = SerialAgent(port=bittle.port, **agent_kwargs)
+    elapsed = time.perf_counter() - started
+
+    if not agent.is_ready():
+        raise RuntimeError('The virtual board is not ready.')
+
+    return agent, {'seconds': elapsed}
+
+
+def bench_commands(agent, amount):
+    latencies = []
+    cpu_started = time.thread_time()
+    started = time.perf_counter()
+    for _ in range(amount):
+        sent = time.perf_counter()
+        agent.write_command(SAMPLE_COMMAND, 1)
+        latencies.append(time.perf_counter() - sent)
+
+    elapsed = time.perf_counter() - started
+    cpu = time.thread_time() - cpu_started
+
+    return {
+        'per_second': amount / elapsed,
+        'latency_ms': summarize(latencies, scale=1000),
+        'cpu_us_per_command': cpu / amount * 1000000,
+    }
+
+
+def bench_drain(agent, bittle, lines, bursts):
+    """Seconds from the start of the burst until all lines are read.
+
+    The burst is sent without the throttle of the baud rate,
+    so it's mostly the time of the agent to take lines out of the port.
+
+    Raises:
+        RuntimeError: If a burst isn't drained within DRAIN_TIMEOUT.
+    """
+    drains = []
+    for _ in range(bursts):
+        emitter = threading.Thread(
+            target=bittle.emit, args=[SAMPLE_LINE] * lines, kwargs={'throttle': False})
+
+        started = time.perf_counter()
+        emitter.start()
+        received = 0
+        deadline = started + DRAIN_TIMEOUT
+        while received < lines:
+            read = len(agent.read_port())
+            received += read
+            if read:
+                continue
+            if time.perf_counter() >= deadline:
+                emitter.join()
+                raise RuntimeError(f'Drained {received} of {lines} lines in {DRAIN_TIMEOUT}sec.')
+            time.sleep(DRAIN_POLL_INTERVAL)
+        drains.append(time.perf_counter() - started)
+        emitter.join()
+
+    return {
+        'lines': lines,
+        'drain_ms': summarize(drains, scale=1000),
+    }
+
+
+def bench_is_ready(agent, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        agent.is_ready()
+    elapsed = time.perf_counter() - started
+
+    return {'us_per_call': elapsed / calls * 1000000}
+
+
+def run(args):
+    """Run the benchmark and returns the results as a dict."""
+    agent_kwargs = {
+        'ack_pacing': True,
+        'min_act_duration': 0,
+        'reader_thread': args.reader_thread,
+        'read_buffer_size': max(args.burst_lines, SerialAgent.MAX_READABLE_LINE),
+    }
+    results = {}
+
+    # No motion time, to measure the agent and the port.
+    with VirtualBittle(baudrate=args.baudrate, boot_time=0.1, time_scale=0) as bittle:
+        agent, results['connect'] = bench_connect(bittle, **agent_kwargs)
+        try:
+            results['commands'] = bench_commands(agent, args.commands)
+            results['drain'] = bench_drain(agent, bittle, args.burst_lines, args.bursts)
+            results['is_ready'] = bench_is_ready(agent, IS_READY_CALLS)
+        finally:
+            agent.stop_reader()
+            agent.close_port()
+
+    return results
@@ -0,0 +1,72 @@
+"""Helpers for summarizing and reporting the benchmark results."""
+import sys
+import json
+import time
+import platform
+
+
+def percentile(values, pct):
+    """Returns the percentile of the values with the linear interpolation.
+
+    Args:
+        values (list): Measured values.
+        pct (float): Percentile in the range 0 to 100.
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def summarize(values, scale=1.0):
+    """Returns the count, mean and percentiles (p50, p95, p99, max) of the values."""
+    if not values:
+        return {'count': 0}
+
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) * scale,
+        'p50': percentile(values, 50) * scale,
+        'p95': percentile(values, 95) * scale,
+        'p99': percentile(values, 99) * scale,
+        'max': max(values) * scale,
+    }
+
+
+def make_report(name, params, results):
+    """Wrap the results with the information of the run."""
+    return {
+        'benchmark': name,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+
+
+def write_json(report, path=None):
+    """Write the report as a json to the file, or to the stdout if the path is '-'."""
+    if path == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def print_results(results, indent=0):
+    """Print the (nested) results as a human readable list."""
+    for key, val in results.items():
+        if isinstance(val, dict):
+            print(f"{' ' * indent}{key}:")
+            print_results(val, indent + 2)
+        elif isinstance(val, float):
+            print(f"{' ' * indent}{key}: {val:.6g}")
+        else:
+            print(f"{' ' * indent}{key}: {val}")
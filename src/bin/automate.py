@@ -14,12 +14,13 @@ import traceback
 import time
 from configparser import ConfigParser, ExtendedInterpolation
 import logging
-import json
-from random import choice, randrange
+from random import randrange
 
 sys.path.insert(0, os.path.abspath('.'))
 
-from modules.serial_agent import CommandPack, make_serial_agent, terminate_serial_agent
+from modules.serial_agent import make_serial_agent, terminate_serial_agent
+from modules.posture import make_posture_tracker
+from modules.scenario import ScenarioLibrary, ScenarioError, perform_scenario
 
 
 CONF_FILE = 'settings.cfg'
@@ -27,6 +28,7 @@ CONF_FILE = 'settings.cfg'
 ACT_TIMES_DEFAULT = 3
 ACT_INTERVAL_RANGE_MIN = 3
 ACT_INTERVAL_RANGE_MAX = 5
+METRICS_INTERVAL_DEFAULT = 60
 
 def init_logger(log_conf):
     logging.basicConfig(
@@ -36,42 +38,62 @@ def init_logger(log_conf):
     )
 
 
+def idle(seconds, agent, metrics_file, metrics_interval):
+    """Sleep while refreshing the metrics file periodically."""
+    deadline = time.monotonic() + seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        time.sleep(min(remaining, metrics_interval) if metrics_file else remaining)
+        agent.metrics.try_dump_prometheus(metrics_file)
+
+
 if __name__ == '__main__':
     conf = ConfigParser(interpolation=ExtendedInterpolation())
     conf.read(CONF_FILE)
 
     init_logger(conf['Logging'])
 
+    # Load action scenario, validated and encoded once.
+    action_scenario = f"{conf.get('Path', 'resources')}/automate.json"
+    try:
+        library = ScenarioLibrary.load(action_scenario)
+    except FileNotFoundError as e:
+        sys.exit(f"Not found action scenario ({action_scenario})")
+    except ScenarioError as e:
+        sys.exit(f"Invalid action scenario ({action_scenario})\n{e}")
+    except ValueError as e:
+        sys.exit(f"Invalid action scenario ({action_scenario})")
+
     # Connect petoi
     try:
-        agent = make_serial_agent(conf.get('Petoi', 'port', fallback=None))
+        agent = make_serial_agent(
+            conf.get('Petoi', 'port', fallback=None),
+            ack_pacing=conf.getboolean('Petoi', 'ack_pacing', fallback=False),
+            posture_tracker=make_posture_tracker(conf))
     except:
         sys.exit(traceback.format_exc())
     else:
         if agent is None:
             sys.exit('Board is not ready. Please try again!')
 
-    # Load action scenario
-    action_scenario = f"{conf.get('Path', 'resources')}/automate.json"
-    try:
-        with open(action_scenario, 'r') as fp:
-            commands = json.load(fp)
-    except FileNotFoundError as e:
-        sys.exit(f"Not found action scenario ({action_scenario})")
+    metrics_file = conf.get('Metrics', 'prometheus_file', fallback=None)
+    metrics_interval = conf.getint('Metrics', 'prometheus_interval', fallback=METRICS_INTERVAL_DEFAULT)
 
     # Start action
     act_cnt = 0
     while True:
         act_cnt += 1
-        picked = choice(commands)
-        command_pack = CommandPack(picked['commands'])
+        scenario = library.choice()
 
-        logging.info("Act take %d [%s]", act_cnt, picked['name'])
-        for action in command_pack.items:
-            agent.write_command(action['cmd'], action['duration'])
+        logging.info("Act take %d [%s]", act_cnt, scenario.name)
+        perform_scenario(agent, scenario)
 
         agent.read_port()
         # print('\n'+'\n'.join(agent.read_port()))
+        agent.metrics.try_dump_prometheus(metrics_file)
 
         if act_cnt >= conf.getint('Automate', 'act_times', fallback=ACT_TIMES_DEFAULT):
             logging.info("Bye!")
@@ -88,7 +110,7 @@ if __name__ == '__main__':
             idlesleep = ACT_INTERVAL_RANGE_MAX
 
         logging.info("Idle sleep %dmin", idlesleep)
-        time.sleep(idlesleep*60)
+        idle(idlesleep*60, agent, metrics_file, metrics_interval)
 
     terminate_serial_agent(agent)
     sys.exit()
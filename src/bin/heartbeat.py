@@ -0,0 +1,114 @@
+"""Petoi heartbeat running
+
+Connect to petoi via serial agent.
+Petoi then performs the actions obtained from the API at the heartbeat interval.
+
+Usage:
+    1. Set the [Api] section in the settings.cfg
+    2. Move to the 'src' directory.
+    3. Run '{your python interpreter} ./bin/heartbeat.py'
+"""
+import sys
+import os
+import signal
+import threading
+import traceback
+from configparser import ConfigParser, ExtendedInterpolation
+import logging
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from modules.serial_agent import make_serial_agent, terminate_serial_agent
+from modules.posture import make_posture_tracker
+from modules.api_client import ApiClient
+from modules.scheduler import IntervalScheduler
+from modules.pipeline import ActionPipeline
+from modules.action_feed import ActionFeed
+
+
+CONF_FILE = 'settings.cfg'
+
+# The API suspends the access during 10 minutes if it's called more often.
+HEARTBEAT_INTERVAL_MIN = 180
+
+def init_logger(log_conf):
+    logging.basicConfig(
+        format=log_conf['format'],
+        datefmt=log_conf['datefmt'],
+        level=log_conf.get('loglevel_heartbeat', log_conf['loglevel'])
+    )
+
+
+def make_api_client(api_conf):
+    """Create an ApiClient from the [Api] section."""
+    kwargs = {
+        'end_point_token': api_conf.get('end_point_token'),
+        'end_point_action': api_conf.get('end_point_action'),
+        'refresh_margin': api_conf.getint('token_refresh_margin', fallback=ApiClient.REFRESH_MARGIN),
+        'timeout': (
+            api_conf.getfloat('connect_timeout', fallback=ApiClient.TIMEOUT[0]),
+            api_conf.getfloat('read_timeout', fallback=ApiClient.TIMEOUT[1])),
+        'retries': api_conf.getint('retries', fallback=ApiClient.RETRIES),
+        'stream_read_timeout': api_conf.getfloat(
+            'stream_read_timeout', fallback=ApiClient.STREAM_READ_TIMEOUT),
+    }
+    return ApiClient(api_conf.get('client_id'), api_conf.get('client_secret'), **kwargs)
+
+
+if __name__ == '__main__':
+    conf = ConfigParser(interpolation=ExtendedInterpolation())
+    conf.read(CONF_FILE)
+
+    init_logger(conf['Logging'])
+
+    if not conf.has_section('Api'):
+        sys.exit('The [Api] section is not found in the settings.')
+
+    heartbeat_interval = conf.getint('Api', 'heartbeat_interval', fallback=HEARTBEAT_INTERVAL_MIN)
+    metrics_file = conf.get('Metrics', 'prometheus_file', fallback=None)
+
+    # Connect petoi
+    try:
+        agent = make_serial_agent(
+            conf.get('Petoi', 'port', fallback=None),
+            ack_pacing=conf.getboolean('Petoi', 'ack_pacing', fallback=False),
+            posture_tracker=make_posture_tracker(conf))
+    except:
+        sys.exit(traceback.format_exc())
+    else:
+        if agent is None:
+            sys.exit('Board is not ready. Please try again!')
+
+    client = make_api_client(conf['Api'])
+    client.start_auto_refresh()
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stop_event.set())
+
+    # Start heartbeat, the next action is fetched while the petoi is acting.
+    scheduler = IntervalScheduler(heartbeat_interval, floor=HEARTBEAT_INTERVAL_MIN)
+    feed = None
+    if conf.get('Api', 'action_feed', fallback=ActionFeed.MODE_POLL) == ActionFeed.MODE_STREAM:
+        feed = ActionFeed(client, scheduler=scheduler)
+
+    ttl = conf.getfloat('Api', 'action_ttl', fallback=0)
+    pipeline = ActionPipeline(
+        client, agent,
+        scheduler=scheduler,
+        feed=feed,
+        depth=conf.getint('Api', 'prefetch_depth', fallback=ActionPipeline.DEPTH),
+        ttl=ttl if ttl > 0 else None,
+        drop_policy=conf.get('Api', 'drop_policy', fallback=ActionPipeline.DROP_OLDEST),
+        on_performed=lambda command_pack: agent.metrics.try_dump_prometheus(metrics_file))
+    pipeline.start()
+
+    while not stop_event.wait(1):
+        if not pipeline.is_running():
+            break
+
+    logging.info("Bye! (%r)", pipeline.stats)
+    pipeline.stop()
+    client.stop_auto_refresh()
+    terminate_serial_agent(agent)
+    sys.exit()
@@ -0,0 +1,52 @@
+"""Run a local mock of the API (the token and action end points).
+
+Point the [Api] end points to the printed urls instead of the API,
+for testing and load testing the agent without the API.
+
+Usage:
+    1. Move to the 'src' directory.
+    2. Run '{your python interpreter} ./bin/mock_api_server.py'
+    3. Set the printed urls to the 'end_point_token' and 'end_point_action' of the [Api] in the 'settings.cfg'.
+       (And set the 'OAUTHLIB_INSECURE_TRANSPORT=1' environment variable, it's served over the plain http.)
+"""
+import sys
+import os
+import argparse
+import logging
+import signal
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from modules.mock_api_server import MockApiServer
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds of the action responses.')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Ratio of the action requests answered with 503.')
+    parser.add_argument('--token-lifetime', type=int, default=MockApiServer.TOKEN_LIFETIME)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    server = MockApiServer(
+        args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+        token_lifetime=args.token_lifetime)
+    server.start()
+    print(f'Mock API is listening (Ctrl-C to quit)\n'
+          f'  end_point_token = {server.end_point_token}\n'
+          f'  end_point_action = {server.end_point_action}')
+
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        print('Bye!')
+    finally:
+        server.stop()
+
+    sys.exit()
@@ -0,0 +1,74 @@
+"""Preview the scenarios (or a CommandPack) offline
+
+Estimate the time of the run and replay the joint commands without the petoi,
+and print the duration, the travel and the peak velocity of the joints.
+
+Usage:
+    1. Move to the 'src' directory.
+    2. Run '{your python interpreter} ./bin/preview.py [file]'
+       The file is the scenarios (i.e. resources/automate.json) or the CommandPack json.
+"""
+import sys
+import os
+import json
+import argparse
+import logging
+import time
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from modules.serial_agent import SerialAgent, CommandPack, AGENT_MIN_ACT_DURATION
+from modules.scenario import ScenarioLibrary, ScenarioError
+from modules.preview import MotionPreview
+
+
+def load_timelines(preview, filepath):
+    """Returns the pairs of the name and the Timeline of the scenarios or the CommandPack in the file."""
+    with open(filepath, 'r') as fp:
+        data = json.load(fp)
+
+    if type(data) is dict:
+        return {'commandPack': preview.replay_pack(CommandPack(json.dumps(data)))}
+
+    return preview.replay_library(ScenarioLibrary.compile(data))
+
+
+def print_timeline(name, timeline):
+    summary = timeline.summary()
+    print(f"{name}: {summary['duration']:.1f}sec, {summary['commands']} commands")
+    for joint, values in summary['joints'].items():
+        print(f"  joint {joint:>2}: travel {values['travel']:.0f}deg, "
+              f"peak velocity {values['peak_velocity']:.0f}deg/sec")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('file', nargs='?', default='resources/automate.json')
+    parser.add_argument('--min-act-duration', type=int, default=AGENT_MIN_ACT_DURATION)
+    parser.add_argument('--start-up-waiting', type=float, default=SerialAgent.START_UP_WAITING)
+    parser.add_argument('--json', action='store_true', help='Print the summaries as a json.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    preview = MotionPreview(
+        min_act_duration=args.min_act_duration, start_up_waiting=args.start_up_waiting)
+    started = time.perf_counter()
+    try:
+        timelines = load_timelines(preview, args.file)
+    except FileNotFoundError:
+        sys.exit(f'Not found ({args.file})')
+    except ScenarioError as e:
+        sys.exit(f'Invalid scenarios ({args.file})\n{e}')
+    except ValueError:
+        sys.exit(f'Invalid json ({args.file})')
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps({name: timeline.summary() for name, timeline in timelines.items()}, indent=2))
+    else:
+        for name, timeline in timelines.items():
+            print_timeline(name, timeline)
+        print(f'Previewed {len(timelines)} in {elapsed * 1000:.1f}msec')
+
+    sys.exit()
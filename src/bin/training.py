@@ -16,6 +16,7 @@ import re
 sys.path.insert(0, os.path.abspath('.'))
 
 from modules.serial_agent import CommandPack, make_serial_agent, terminate_serial_agent
+from modules.posture import make_posture_tracker
 
 
 CONF_FILE = 'settings.cfg'
@@ -55,7 +56,10 @@ if __name__ == '__main__':
     # Connect petoi
     try:
         print('...Please wait for a while until connect to the petoi.')
-        agent = make_serial_agent(conf.get('Petoi', 'port', fallback=None))
+        agent = make_serial_agent(
+            conf.get('Petoi', 'port', fallback=None),
+            ack_pacing=conf.getboolean('Petoi', 'ack_pacing', fallback=False),
+            posture_tracker=make_posture_tracker(conf))
     except:
         sys.exit(traceback.format_exc())
     else:
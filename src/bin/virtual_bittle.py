@@ -0,0 +1,45 @@
+"""Run a virtual 'Bittle' board on a pseudo-terminal.
+
+Connect the agent to the printed port instead of the petoi,
+for testing and benchmarking without the hardware.
+
+Usage:
+    1. Move to the 'src' directory.
+    2. Run '{your python interpreter} ./bin/virtual_bittle.py'
+    3. Set the printed port to the 'port' of the [Petoi] in the 'settings.cfg'.
+"""
+import sys
+import os
+import argparse
+import logging
+import signal
+
+sys.path.insert(0, os.path.abspath('.'))
+
+from modules.virtual_bittle import VirtualBittle
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--baudrate', type=int, default=VirtualBittle.BAUDRATE)
+    parser.add_argument('--boot-time', type=float, default=VirtualBittle.BOOT_TIME)
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help='Multiplier of the boot time and the motion durations.')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    bittle = VirtualBittle(
+        baudrate=args.baudrate, boot_time=args.boot_time, time_scale=args.time_scale)
+    bittle.start()
+    print(f'Virtual Bittle is listening on {bittle.port} (Ctrl-C to quit)')
+
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        print('Bye!')
+    finally:
+        bittle.stop()
+
+    sys.exit()
@@ -0,0 +1,181 @@
+import time
+import threading
+import logging
+import requests
+from modules.scheduler import IntervalScheduler
+from modules.http_transport import RetryPolicy
+
+
+class ActionFeed:
+    """Source of the actions pushed via API, falling back to the interval polling.
+
+    In the 'stream' mode, it subscribes the action stream ('ApiClient.stream_actions')
+    and reconnects with the resume when the stream is lost.
+    After 'max_failures' failures in a row (or immediately if the server doesn't support it,
+    i.e. responds 404 or a plain JSON),
+    it polls the 'get_action' on the schedule for 'fallback_period' seconds,
+    then tries the stream again.
+
+    Examples:
+        feed = ActionFeed(client, scheduler=IntervalScheduler(180, floor=180))
+        for command_pack in feed.packs():
+            perform(command_pack)
+    """
+
+    MODE_STREAM = 'stream'
+
+    MODE_POLL = 'poll'
+
+    MODES = (MODE_STREAM, MODE_POLL)
+
+    MAX_FAILURES = 3
+
+    # Seconds of polling before trying the stream again.
+    FALLBACK_PERIOD = 600
+
+    # Seconds of waiting to reconnect, if the server doesn't specify it.
+    RECONNECT_DELAY = 1
+
+    # Status codes of the stream meaning that it's not supported.
+    NOT_SUPPORTED_STATUSES = (404, 405, 406, 501)
+
+    # Status codes of the 'get_action' to take the pack.
+    ACCEPT_STATUSES = (200, 304)
+
+    def __init__(self, client, **kwargs) -> None:
+        """Construct a new feed.
+
+        Args:
+            client (ApiClient): Source of the actions.
+            kwargs: Arbitrary keyword arguments.
+                - mode (str): 'stream' or 'poll'. Defaults to 'stream'.
+                - interval (float): Seconds between the polls. Defaults to 180.
+                - floor (float): Min seconds between the polls. Defaults to 0.
+                - scheduler (IntervalScheduler): Schedule of the polls, instead of the interval and floor.
+                - max_failures (int): Failures of the stream in a row to fall back. Defaults to MAX_FAILURES.
+                - fallback_period (float): Seconds of polling before trying the stream again.
+                  Defaults to FALLBACK_PERIOD.
+                - reconnect_delay (float): Seconds of the first backoff of reconnecting. Defaults to RECONNECT_DELAY.
+        """
+        mode = kwargs.get('mode', self.MODE_STREAM)
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown feed mode [{mode}]')
+
+        self.client = client
+        self.preferred_mode = mode
+        self.mode = mode
+        self.scheduler = kwargs.get('scheduler') or IntervalScheduler(
+            kwargs.get('interval', 180), floor=kwargs.get('floor', 0))
+        self.max_failures = kwargs.get('max_failures', self.MAX_FAILURES)
+        self.fallback_period = kwargs.get('fallback_period', self.FALLBACK_PERIOD)
+        self.reconnect_delay = kwargs.get('reconnect_delay', self.RECONNECT_DELAY)
+        self._backoff = RetryPolicy(backoff_base=self.reconnect_delay, backoff_max=60)
+
+        self.stats = {
+            'events': 0,
+            'polls': 0,
+            'reconnects': 0,
+            'fallbacks': 0,
+        }
+
+        self._failures = 0
+        self._fallback_until = 0.0
+        self._stop_event = threading.Event()
+
+    def packs(self):
+        """Yields the CommandPack which has any commands, until stopped."""
+        self._stop_event.clear()
+        while not self._stop_event.is_set():
+            if self.mode == self.MODE_POLL:
+                # Polled at least once before trying the stream again.
+                yield from self._poll()
+                if self.preferred_mode == self.MODE_STREAM and time.monotonic() >= self._fallback_until:
+                    logging.info('Try the action stream again.')
+                    self.mode = self.MODE_STREAM
+                    self._failures = 0
+            else:
+                yield from self._stream()
+
+    def stop(self):
+        """Stop the feed, the current stream is closed."""
+        self._stop_event.set()
+        self.client.close_stream()
+
+    def _poll(self):
+        if not self.scheduler.wait(self._stop_event):
+            return
+
+        try:
+            status, command_pack = self.client.get_action()
+        except Exception:
+            # Already logged in the 'get_action', try again at the next schedule.
+            return
+
+        self.stats['polls'] += 1
+        if status in self.ACCEPT_STATUSES and command_pack.items:
+            yield command_pack
+
+    def _stream(self):
+        try:
+            for command_pack in self.client.stream_actions():
+                self._failures = 0
+                self.stats['events'] += 1
+                if command_pack.items:
+                    yield command_pack
+                if self._stop_event.is_set():
+                    return
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status in self.NOT_SUPPORTED_STATUSES:
+                logging.warning('The action stream is not supported (status %s).', status)
+                self._fall_back()
+                return
+            if status == 401:
+                self._refresh_token()
+            self._failures += 1
+        except requests.RequestException as e:
+            if self._stop_event.is_set():
+                return
+            logging.warning('The action stream is lost (%r)', e)
+            self._failures += 1
+        else:
+            if self.client.stream_supported is False:
+                # Not to request the plain JSON over and over, regardless of the schedule.
+                logging.warning('The action stream is not supported (responded a JSON).')
+                self._fall_back()
+                return
+
+            # Closed by the server.
+            self._failures = 0
+
+        if self._failures >= self.max_failures:
+            self._fall_back()
+            return
+
+        delay = self.client.stream_retry or self.reconnect_delay
+        if self._failures:
+            delay = max(delay, self._backoff.backoff(self._failures))
+
+        self.stats['reconnects'] += 1
+        logging.debug('Reconnect the action stream in %.1fsec (from id %s)', delay, self.client.last_event_id)
+        self._stop_event.wait(delay)
+
+    def _fall_back(self):
+        logging.warning('Fall back to polling for %dsec.', self.fallback_period)
+        self.stats['fallbacks'] += 1
+        self.mode = self.MODE_POLL
+        self._fallback_until = time.monotonic() + self.fallback_period
+
+    def _refresh_token(self):
+        try:
+            self.client.refresh_token()
+        except Exception:
+            # Already logged in the 'fetch_token'.
+            pass
+
+    def __repr__(self) -> str:
+        return 'ActionFeed'
+
+
+if __name__ == '__main__':
+    pass
@@ -2,11 +2,18 @@ import os
 import re
 import json
 import time
+import socket
 import traceback
 import logging
+import threading
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
 from requests_oauthlib import OAuth2Session
 from oauthlib.oauth2 import BackendApplicationClient
 from modules.serial_agent import CommandPack
+from modules.event_stream import EventStreamParser
+from modules.command_stream import iter_commands
+from modules.http_transport import RequestStats, RetryPolicy, mount_timed_adapter, recording
 
 
 class ApiClient:
@@ -14,6 +21,31 @@ class ApiClient:
 
     CACHE_DIR = f"{os.path.dirname(os.path.abspath(__file__))}/../cache"
 
+    # Seconds before the 'expires_at' to refresh the token in the auto refresh mode.
+    REFRESH_MARGIN = 60
+
+    # Seconds of waiting for retry when the auto refresh is failed.
+    REFRESH_RETRY_INTERVAL = 10
+
+    # Seconds of the (connect, read) timeouts.
+    TIMEOUT = (5, 30)
+
+    # Max connections kept alive.
+    POOL_MAXSIZE = 4
+
+    # Max number of the attempts of a request.
+    RETRIES = 3
+
+    # Seconds of the read timeout of the action stream.
+    # (The server is expected to send a comment as keep-alive more often.)
+    STREAM_READ_TIMEOUT = 90
+
+    # Max bytes of a single read from the action stream.
+    STREAM_CHUNK_SIZE = 4096
+
+    # Types of the events in the action stream to parse into the CommandPack.
+    STREAM_ACTION_EVENTS = ('message', 'action')
+
     def __init__(self, client_id: str, client_secret: str, **kwargs) -> None:
         """Construct a new client.
 
@@ -21,6 +53,18 @@ class ApiClient:
             client_id (str):
             client_secret (str):
             kwargs: Arbitrary keyword arguments.
+                - end_point_token (str): Url of the token end point.
+                - end_point_action (str): Url of the action end point.
+                - cache_dir (str): Directory for storing token files. Defaults to CACHE_DIR.
+                - refresh_margin (int): Seconds before the expiry to refresh the token
+                  in the auto refresh mode. Defaults to REFRESH_MARGIN.
+                - timeout (tuple): Seconds of the (connect, read) timeouts. Defaults to TIMEOUT.
+                - pool_maxsize (int): Max connections kept alive. Defaults to POOL_MAXSIZE.
+                - retries (int): Max number of the attempts of a request. Defaults to RETRIES.
+                - backoff_base (float): Seconds of the first backoff of the retries. Defaults to 0.5.
+                - backoff_max (float): Max seconds of the backoff of the retries. Defaults to 10.
+                - stream_read_timeout (float): Seconds of the read timeout of the action stream.
+                  Defaults to STREAM_READ_TIMEOUT.
         """
         self.client_id = client_id
         self.client_secret = client_secret
@@ -31,21 +75,62 @@ class ApiClient:
         client = BackendApplicationClient(client_id=self.client_id)
         self._oauth2sess = OAuth2Session(client=client)
 
+        self.timeout = kwargs.get('timeout', self.TIMEOUT)
+        mount_timed_adapter(
+            self._oauth2sess, pool_maxsize=kwargs.get('pool_maxsize', self.POOL_MAXSIZE))
+        self._retry = RetryPolicy(
+            attempts=kwargs.get('retries', self.RETRIES),
+            backoff_base=kwargs.get('backoff_base', 0.5),
+            backoff_max=kwargs.get('backoff_max', 10.0))
+
+        # The timing of the last requests, i.e) for the heartbeat loop.
+        self.last_request_stats = None
+        self.last_token_stats = None
+
+        # The validators and the parsed action of the last response per client_id,
+        # i.e) {client_id: (etag, last_modified, CommandPack)}
+        self._action_cache = {}
+
+        # The action stream, resumed from the id of the last received event.
+        self.stream_read_timeout = kwargs.get('stream_read_timeout', self.STREAM_READ_TIMEOUT)
+        self.last_event_id = None
+        # Seconds of the reconnection time specified by the server, 'None' if not.
+        self.stream_retry = None
+        # Whether the last response was the event stream, 'False' if a JSON (the stream is not supported).
+        self.stream_supported = None
+        self._stream = None
+
         self._cache_dir = kwargs.get('cache_dir', self.CACHE_DIR)
 
+        # The disk cache is read only here, and written when a new token is fetched.
+        self._set_token(self._load_cached_token())
+
+        self.refresh_margin = kwargs.get('refresh_margin', self.REFRESH_MARGIN)
+        self._refresh_lock = threading.Lock()
+        self._refreshing = None
+        self._refresher = None
+        self._refresher_wakeup = threading.Event()
+        self._refresher_stop = threading.Event()
+
     def fetch_token(self, do_cache: bool = True, **kwargs):
         """Request a new client token via the API.
 
+        It's retried on the connection errors and timeouts,
+        a client credentials grant is safe to request again.
+
         Args:
             do_cache (bool, optional): Whether to save the obtained token in a file. Defaults to True.
         """
+        kwargs.setdefault('timeout', self.timeout)
+        stats = self.last_token_stats = RequestStats()
         try:
-            res = self._oauth2sess.fetch_token(
-                token_url=self.end_point_token,
-                client_id=self.client_id,
-                client_secret=self.client_secret,
-                **kwargs
-            )
+            with recording(stats):
+                res = self._retry.call(lambda: self._oauth2sess.fetch_token(
+                    token_url=self.end_point_token,
+                    client_id=self.client_id,
+                    client_secret=self.client_secret,
+                    **kwargs
+                ), stats)
         except:
             logging.error('Failed to get token (%s)', traceback.format_exc())
             raise
@@ -53,29 +138,228 @@ class ApiClient:
             if (do_cache):
                 self._cache_token(res)
 
+    def refresh_token(self, wait: bool = True, timeout=None, **kwargs):
+        """Request a new client token, single-flight.
+
+        While a request is in flight, the other callers never request again,
+        they wait for it (or return immediately).
+
+        Args:
+            wait (bool, optional): Whether to wait for the request by other caller. Defaults to True.
+            timeout (float, optional): Max seconds of the waiting.
+            kwargs: Arbitrary keyword arguments for the 'fetch_token'.
+
+        Returns:
+            bool: 'True' if an available token is held.
+        """
+        with self._refresh_lock:
+            in_flight = self._refreshing
+            if in_flight is None:
+                self._refreshing = threading.Event()
+
+        if in_flight is not None:
+            if wait:
+                in_flight.wait(timeout)
+            return self.has_cached_token()
+
+        try:
+            self.fetch_token(**kwargs)
+        finally:
+            with self._refresh_lock:
+                done, self._refreshing = self._refreshing, None
+            done.set()
+
+        return self.has_cached_token()
+
+    def start_auto_refresh(self, **kwargs):
+        """Start refreshing the token on a background thread.
+
+        A new token is fetched 'refresh_margin' seconds before the 'expires_at',
+        so the 'get_action' never blocks on the token acquisition.
+
+        Args:
+            kwargs: Arbitrary keyword arguments for the 'fetch_token'.
+        """
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+
+        self._refresher_stop.clear()
+        self._refresher = threading.Thread(
+            target=self._auto_refresh, kwargs=kwargs, name='TokenRefresher', daemon=True)
+        self._refresher.start()
+
+    def stop_auto_refresh(self, timeout=None):
+        """Stop the background token refresh."""
+        if self._refresher is None:
+            return
+
+        self._refresher_stop.set()
+        self._refresher_wakeup.set()
+        self._refresher.join(timeout)
+        self._refresher = None
+
     def get_action(self, **kwargs):
         """Get an action via API.
 
-        If the available token is cached, use it.
+        If the available token is cached (in memory), use it.
+        In the auto refresh mode, the missing or expired token wakes up the refresher
+        instead of waiting for a new one.
+
+        The request is conditional with the 'ETag' and 'Last-Modified' of the last response,
+        on '304 Not Modified' the last CommandPack is returned without parsing.
 
         Returns:
             int: The status code of the response.
             CommandPack: The instance of the CommandPack class.
+                (The same instance as the last one if the status is 304.)
         """
 
-        cached_token = self._get_cached_token()
-        logging.debug(cached_token)
-        if cached_token:
-            self._oauth2sess.token = cached_token
+        self._use_cached_token()
 
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs['headers'] = self._make_conditional_headers(kwargs.get('headers'))
+        stats = self.last_request_stats = RequestStats()
         try:
             url_query = f'{self.end_point_action}/{self.client_id}'
-            res = self._oauth2sess.get(url=url_query, **kwargs)
+            with recording(stats):
+                res = self._retry.call(
+                    lambda: self._oauth2sess.get(url=url_query, **kwargs), stats)
         except:
             logging.error('Failed to get action (%s)', traceback.format_exc())
             raise
         else:
-            return res.status_code, CommandPack(res.text)
+            logging.debug('Get action (%r)', stats)
+            return res.status_code, self._make_command_pack(res)
+
+    def stream_actions(self, **kwargs):
+        """Subscribe the actions pushed via API (Server-Sent Events).
+
+        The action end point is requested for the 'text/event-stream',
+        and every event is parsed into a CommandPack as soon as it's received.
+        The stream resumes from the 'last_event_id' (sent as the 'Last-Event-ID').
+        If the server responds a JSON instead, it's the only action of the stream
+        and the 'stream_supported' is set 'False'.
+
+        Yields:
+            CommandPack: The action of the each event.
+
+        Raises:
+            requests.HTTPError: If the status is not 200 (i.e. 401, or 404 if not supported).
+            requests.ConnectionError, requests.Timeout: If the stream is lost or idle over the read timeout.
+
+        Notes:
+            - It's not retried, the reconnection is up to the caller (see 'ActionFeed').
+        """
+        self._use_cached_token()
+
+        headers = {
+            'Accept': 'text/event-stream, application/json',
+            'Cache-Control': 'no-cache',
+            # Not compressed, the stream is read without decoding (see '_read_stream').
+            'Accept-Encoding': 'identity',
+            **(kwargs.pop('headers', None) or {}),
+        }
+        if self.last_event_id is not None:
+            headers['Last-Event-ID'] = self.last_event_id
+        kwargs.setdefault('timeout', (self.timeout[0], self.stream_read_timeout))
+
+        url_query = f'{self.end_point_action}/{self.client_id}'
+        res = self._oauth2sess.get(url=url_query, headers=headers, stream=True, **kwargs)
+        self._stream = res
+        try:
+            res.raise_for_status()
+            self.stream_supported = res.headers.get('Content-Type', '').startswith('text/event-stream')
+            if not self.stream_supported:
+                logging.debug('Not a stream, action status[%d]', res.status_code)
+                yield CommandPack(res.text)
+                return
+
+            parser = EventStreamParser(self.last_event_id)
+            while True:
+                chunk = self._read_stream(res)
+                if not chunk:
+                    logging.debug('The action stream is closed by the server.')
+                    return
+
+                for event in parser.feed(chunk):
+                    self.last_event_id = event.id
+                    if event.event not in self.STREAM_ACTION_EVENTS:
+                        logging.debug('Ignored the event (%r)', event)
+                        continue
+
+                    try:
+                        command_pack = CommandPack(event.data)
+                    except ValueError:
+                        # Already logged in the CommandPack.
+                        continue
+                    yield command_pack
+
+                # The id-only events update it too.
+                self.last_event_id = parser.last_event_id
+                if parser.retry is not None:
+                    self.stream_retry = parser.retry / 1000
+        finally:
+            self._stream = None
+            res.close()
+
+    def iter_action(self, **kwargs):
+        """Get an action via API, yielding the commands while it's downloading.
+
+        Unlike the 'get_action', the response is not buffered in full,
+        each command is yielded as soon as its element of the 'commandPack' is received.
+        So a large action can be performed before the rest of it arrives.
+
+        Yields:
+            dict: The valid commands, i.e) {'cmd': 'ksit', 'duration': 5}
+
+        Raises:
+            requests.HTTPError: If the status is not 200.
+            requests.ConnectionError, requests.Timeout: If the response is lost.
+            ValueError: If the response is not the CommandPack json.
+
+        Notes:
+            - It's neither conditional nor retried, and the action is not cached.
+        """
+        self._use_cached_token()
+
+        kwargs.setdefault('timeout', self.timeout)
+        # Not compressed, the response is read without decoding (see '_read_stream').
+        headers = {'Accept-Encoding': 'identity', **(kwargs.pop('headers', None) or {})}
+        url_query = f'{self.end_point_action}/{self.client_id}'
+        res = self._oauth2sess.get(url=url_query, headers=headers, stream=True, **kwargs)
+        self._stream = res
+        try:
+            res.raise_for_status()
+            yield from iter_commands(iter(lambda: self._read_stream(res), b''))
+        finally:
+            self._stream = None
+            res.close()
+
+    def close_stream(self):
+        """Close the action stream from other thread, the reading ends by the error.
+
+        Notes:
+            - Only the socket is shut down, the response is closed by the reading thread.
+              Closing it while reading breaks the 'http.client' (AttributeError).
+        """
+        stream = self._stream
+        if stream is None:
+            return
+
+        # Closing the response doesn't wake up the blocking read, shutting down the socket does.
+        sock = self._stream_socket(stream)
+        if sock is None:
+            logging.debug('The socket of the action stream is not found, so it ends by the read timeout.')
+            return
+
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def clear_action_cache(self):
+        """Forget the last action, so the next 'get_action' downloads it in full."""
+        self._action_cache.pop(self.client_id, None)
 
     def cleanup_cache_dir(self, leave_latest: bool = True):
         """Clean up the directory for storing token files.
@@ -87,14 +371,14 @@ class ApiClient:
             The base name of the latest token cache file.
             Returns 'None' if the file is not found.
         """
-        files = os.listdir(self._cache_dir)
+        files = [f for f in os.listdir(self._cache_dir) if f.startswith('token.')]
         if not files:
             return
 
         files.sort()
 
         latest = files.pop(-1)
-        expires_at = re.sub('token\.', '', latest)
+        expires_at = re.sub(r'token\.', '', latest)
         if time.time() > float(expires_at) or not leave_latest:
             os.remove(f"{self._cache_dir}/{latest}")
             latest = None
@@ -125,6 +409,7 @@ class ApiClient:
             logging.warning(f'Invalid parameter! {token!r}')
             return
 
+        self._set_token(token)
         self.cleanup_cache_dir(leave_latest=False)
 
         filepath = f'{self._cache_dir}/token.{token.get("expires_at")}'
@@ -137,6 +422,142 @@ class ApiClient:
             raise
 
     def _get_cached_token(self):
+        """Get token details from the memory if it's not expired.
+
+        Returns:
+            dict:
+        """
+        if time.time() >= self._token_expires_at:
+            return None
+
+        return self._token
+
+    def _stream_socket(self, res):
+        """Returns the socket of the streaming response, 'None' if not found.
+
+        It's held by the connection, or only by the response if the connection will be closed.
+        """
+        sock = getattr(res.raw.connection, 'sock', None)
+        if sock is None:
+            fp = getattr(getattr(res.raw, '_fp', None), 'fp', None)
+            sock = getattr(getattr(fp, 'raw', None), '_sock', None)
+        return sock
+
+    def _read_stream(self, res):
+        """Returns the bytes received from the stream so far (at least one byte unless closed).
+
+        The errors of the urllib3 are raised as the ones of the requests, same as 'iter_content'.
+
+        Notes:
+            - The 'read' of the urllib3 blocks until the whole amount arrives,
+              and the 'read1' is only in the urllib3 2.x.
+              So the 'http.client' response under it is read with the 'urllib3<2' (i.e. the pinned one),
+              the content is not decoded (the 'identity' is requested).
+        """
+        try:
+            read1 = getattr(res.raw, 'read1', None)
+            if read1 is None:
+                read1 = res.raw._fp.read1
+            return read1(self.STREAM_CHUNK_SIZE)
+        except ReadTimeoutError as e:
+            raise requests.ReadTimeout(e)
+        except (ProtocolError, OSError, ValueError) as e:
+            # OSError: Shut down by 'close_stream' while reading, ValueError: Already closed.
+            raise requests.ConnectionError(e)
+
+    def _use_cached_token(self):
+        """Set the cached token to the session, or wake up the refresher if it's not available."""
+        cached_token = self._get_cached_token()
+        logging.debug(cached_token)
+        if cached_token:
+            self._oauth2sess.token = cached_token
+        elif self._refresher is not None:
+            self._refresher_wakeup.set()
+
+    def _make_conditional_headers(self, headers=None):
+        """Returns the request headers with the validators of the last action.
+
+        Args:
+            headers (dict, optional): The headers specified by the caller, they take precedence.
+        """
+        headers = dict(headers or {})
+        cached = self._action_cache.get(self.client_id)
+        if cached is None:
+            return headers
+
+        etag, last_modified, _ = cached
+        if etag:
+            headers.setdefault('If-None-Match', etag)
+        if last_modified:
+            headers.setdefault('If-Modified-Since', last_modified)
+        return headers
+
+    def _make_command_pack(self, res):
+        """Parse the response of the action, or reuse the last one if not modified.
+
+        Args:
+            res (requests.Response):
+
+        Returns:
+            CommandPack:
+        """
+        cached = self._action_cache.get(self.client_id)
+        if res.status_code == 304:
+            if cached is None:
+                logging.warning('Not modified, but no action is cached.')
+                return CommandPack()
+            return cached[2]
+
+        pack = CommandPack(res.text)
+        etag = res.headers.get('ETag')
+        last_modified = res.headers.get('Last-Modified')
+        if res.status_code == 200 and (etag or last_modified):
+            self._action_cache[self.client_id] = (etag, last_modified, pack)
+        elif cached is not None:
+            self._action_cache.pop(self.client_id)
+
+        return pack
+
+    def _auto_refresh(self, **kwargs):
+        """Loop of the background token refresh."""
+        while not self._refresher_stop.is_set():
+            wait = self._refresh_wait()
+            if wait > 0 and self._refresher_wakeup.wait(wait):
+                self._refresher_wakeup.clear()
+                if self.has_cached_token() or self._refresher_stop.is_set():
+                    continue
+
+            try:
+                self.refresh_token(**kwargs)
+            except Exception:
+                # Already logged in the 'fetch_token'.
+                pass
+
+            if self._refresh_wait() <= 0:
+                # No token with a valid expiry (i.e. failed, or the response without 'expires_in'),
+                # not to request it over and over.
+                self._refresher_stop.wait(self.REFRESH_RETRY_INTERVAL)
+
+    def _refresh_wait(self):
+        """Returns the seconds until the next refresh of the token held."""
+        # Not to refresh over and over, if the lifetime is shorter than the margin.
+        margin = self.refresh_margin
+        if self._token_lifetime > 0:
+            margin = min(margin, self._token_lifetime / 2)
+
+        return self._token_expires_at - margin - time.time()
+
+    def _set_token(self, token):
+        """Hold the token details in memory with its expiry.
+
+        Args:
+            token (dict): The token details, 'None' to clear.
+        """
+        self._token = token
+        self._token_expires_at = float(token.get('expires_at', 0)) if token else 0.0
+        self._token_lifetime = float(token.get('expires_in', 0)) if token else 0.0
+
+    def _load_cached_token(self):
         """Get token details from cached file.
 
         Returns:
@@ -154,6 +575,8 @@ class ApiClient:
                           traceback.format_exc())
             return None
         else:
+            # The file name has the expiry, i.e)'token.{expires_at}'
+            token.setdefault('expires_at', float(re.sub(r'token\.', '', available_cache)))
             return token
 
     def __repr__(self) -> str:
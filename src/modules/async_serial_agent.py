@@ -0,0 +1,359 @@
+import os
+import asyncio
+import traceback
+import time
+import logging
+from collections import deque
+import serial
+from modules.serial_agent import SerialAgent, LineBuffer, AGENT_MIN_ACT_DURATION
+
+
+class AsyncSerialAgent:
+    """Asyncio agent class for communicating with 'Petoi' via serial port.
+
+    It has the same surface as the SerialAgent, but the operations are awaitable.
+    The receive side is the non-blocking file descriptor of the port
+    registered with the event loop, so nothing blocks the calling thread.
+
+    Notes:
+        - Create the instance within a running event loop.
+        - Only for the POSIX platforms (the port must have a file descriptor).
+    """
+
+    BAUNDRATE = SerialAgent.BAUNDRATE
+
+    START_UP_WAITING = SerialAgent.START_UP_WAITING
+
+    MAX_READABLE_LINE = SerialAgent.MAX_READABLE_LINE
+
+    MIN_ACT_DURATION = SerialAgent.MIN_ACT_DURATION
+
+    BOARD_INIT_MESSAGES = SerialAgent.BOARD_INIT_MESSAGES
+
+    BOARD_ERROR_MESSAGES = SerialAgent.BOARD_ERROR_MESSAGES
+
+    CONTINUOUS_SKILLS = SerialAgent.CONTINUOUS_SKILLS
+
+    # Max bytes of a single read from the port.
+    READ_CHUNK_SIZE = 4096
+
+    is_continuous_skill = SerialAgent.is_continuous_skill
+
+    is_ack = SerialAgent.is_ack
+
+    def __init__(self, port, serial_api=None, **kwargs) -> None:
+        """Set or create serial api instance and register the port with the event loop.
+
+        Args:
+            port (str): name of the target port
+            serial_api (Any, optional): Instance of serial api class. Defaults to PySerial.
+            kwargs: Arbitrary keyword arguments. Same as the SerialAgent.
+        """
+        self.min_act_duration = kwargs.get(
+            'min_act_duration', self.MIN_ACT_DURATION)
+        self.start_up_waiting = kwargs.get(
+            'start_up_waiting', self.START_UP_WAITING)
+        self.ack_pacing = kwargs.get('ack_pacing', False)
+
+        self.is_board_ready = False
+        self._has_error = False
+
+        self._loop = asyncio.get_running_loop()
+        self._rx = LineBuffer()
+        self._lines = deque(maxlen=kwargs.get(
+            'read_buffer_size', self.MAX_READABLE_LINE))
+        self._received = asyncio.Event()
+        self._fd = None
+
+        if serial_api is None:
+            self._ser = serial.Serial(
+                port=port,
+                baudrate=self.BAUNDRATE,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                bytesize=serial.EIGHTBITS,
+                timeout=0
+            )
+        else:
+            self._ser = serial_api
+
+        if (not self._ser.is_open):
+            logging.warning('Port [%s] is not opened.', port)
+            return
+
+        self._attach()
+
+    async def open_port(self, attempt=1, retry_interval=5):
+        """If the board is not ready, it will try to open and close the serial port.
+
+        Args:
+            attempt (int, optional): Number of trials. Defaults to 1.
+            retry_interval (int, optional): Seconds for retry interval. Defaults to 5.
+
+        Returns:
+            bool:
+        """
+        if await self.is_ready():
+            return True
+
+        attempt_count = 0
+        while True:
+            attempt_count += 1
+            try:
+                logging.debug(
+                    'Try reopen port [%d/%d]', attempt_count, attempt)
+                await self.close_port()
+                self._ser.open()
+                self._attach()
+            except:
+                logging.error('Fails to open port (%s)',
+                              traceback.format_exc())
+                raise
+
+            if attempt == 1:
+                await self.wait_until_ready()
+            else:
+                await self.wait_until_ready(retry_interval)
+
+            if await self.is_ready():
+                break
+
+            if attempt_count >= attempt:
+                break
+
+        return self._ser.is_open
+
+    async def close_port(self):
+        """Close the serial port"""
+
+        if (not self._ser.is_open):
+            logging.debug('Port is already closed.')
+            return True
+
+        # The board is reset when the port is opened again.
+        self._detach()
+        self.is_board_ready = False
+        self._rx.clear()
+        self._lines.clear()
+        self._received.clear()
+
+        self._ser.close()
+        return self._ser.is_open
+
+    async def write_command(self, cmd: str, duration: int):
+        """Send a command and sleep specified duration without blocking the event loop.
+
+        Args:
+            cmd (str): String of **correct** command (if empty is just sleep)
+            duration (int): Seconds of sleep time after sending a command
+
+        Returns:
+            bool:
+
+        Notes:
+            - See 'SerialAgent.write_command'.
+        """
+        if not self._ser.is_open:
+            self._ser.open()
+            self._attach()
+            await self.wait_until_ready()
+
+        write_len = 0
+        if (cmd != '' and duration < self.min_act_duration):
+            duration = self.min_act_duration
+
+        logging.debug('Act cmd[%s], duration[%d]', cmd, duration)
+        if cmd != '':
+            if self.ack_pacing:
+                await self._discard_pending()
+            try:
+                # Write and wait for the transmission on other thread (both may block).
+                write_len = await self._loop.run_in_executor(
+                    None, self._write, str(cmd).encode('utf-8'))
+            except:
+                logging.error(
+                    'Fails to write command cmd[%s] duration[%d] (%s)', cmd, duration, traceback.format_exc())
+                raise
+
+        if self.ack_pacing and cmd != '' and not self.is_continuous_skill(cmd):
+            await self._wait_for_ack(cmd, duration)
+        else:
+            await asyncio.sleep(duration)
+
+        return not cmd or write_len > 0
+
+    async def read_port(self):
+        """Returns all in the receive buffer as a string list"""
+        lines = list(self._lines)
+        self._lines.clear()
+        self._received.clear()
+        return lines
+
+    async def is_ready(self):
+        """Checks the serial port is open and board is initialized.
+
+            **For the 'Bittle' on 'NyBoard_V1_0'**
+        """
+        if not self._ser.is_open:
+            return False
+
+        if self.is_board_ready:
+            return True
+
+        messages = await self.read_port()
+        self.is_board_ready = any(msg for msg in messages if msg in self.BOARD_INIT_MESSAGES)
+        return self.is_board_ready
+
+    async def wait_until_ready(self, timeout=None):
+        """Wait until the board sends one of the BOARD_INIT_MESSAGES.
+
+        Args:
+            timeout (int, optional): Max seconds of waiting. Defaults to 'start_up_waiting'.
+
+        Returns:
+            bool: 'False' if timed out.
+        """
+        if not self._ser.is_open:
+            return False
+
+        if self.is_board_ready:
+            return True
+
+        if timeout is None:
+            timeout = self.start_up_waiting
+
+        matched = await self._wait_for_line(
+            lambda msg: msg in self.BOARD_INIT_MESSAGES, timeout)
+        self.is_board_ready = matched is not None
+        return self.is_board_ready
+
+    async def has_error_response(self):
+        """Return 'True' if the board buffer contains error msg."""
+        has_error = self._has_error
+        self._has_error = False
+
+        messages = await self.read_port()
+        return has_error or any(msg for msg in messages if msg in self.BOARD_ERROR_MESSAGES)
+
+    async def _discard_pending(self):
+        """Discard the received lines before a command, see 'SerialAgent._discard_pending'."""
+        if any(msg in self.BOARD_ERROR_MESSAGES for msg in await self.read_port()):
+            # Keep it for the 'has_error_response'.
+            self._has_error = True
+
+    async def _wait_for_ack(self, cmd, timeout):
+        """Wait for the acknowledgement or error message of the command.
+
+        Returns:
+            bool: 'False' if timed out.
+        """
+        started = time.monotonic()
+        msg = await self._wait_for_line(
+            lambda msg: self.is_ack(cmd, msg) or msg in self.BOARD_ERROR_MESSAGES, timeout)
+
+        if msg in self.BOARD_ERROR_MESSAGES:
+            self._has_error = True
+
+        logging.debug('Ack cmd[%s] response[%s] in %.3fsec',
+                      cmd, msg, time.monotonic() - started)
+        return msg is not None
+
+    async def _wait_for_line(self, predicate, timeout):
+        """Consume the received lines until one of them matches the predicate.
+
+        Returns:
+            str: The matched line, 'None' if timed out.
+        """
+        deadline = self._loop.time() + timeout
+        while True:
+            for msg in await self.read_port():
+                if predicate(msg):
+                    return msg
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return None
+
+            try:
+                await asyncio.wait_for(self._received.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def _write(self, data):
+        """Write the data and wait for the transmission, blocks the calling thread."""
+        write_len = self._ser.write(data)
+        self._ser.flush()
+        return write_len
+
+    def _attach(self):
+        """Register the file descriptor of the port with the event loop."""
+        if self._fd is not None:
+            return
+
+        self._fd = self._ser.fileno()
+        self._loop.add_reader(self._fd, self._on_readable)
+
+    def _detach(self):
+        """Unregister the file descriptor of the port from the event loop."""
+        if self._fd is None:
+            return
+
+        self._loop.remove_reader(self._fd)
+        self._fd = None
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, self.READ_CHUNK_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            logging.debug('Fails to read port (%s)', traceback.format_exc())
+            self._detach()
+            return
+
+        if not data:
+            # The other end has hung up.
+            self._detach()
+            return
+
+        lines = self._rx.feed(data)
+        if lines:
+            self._lines.extend(lines)
+            self._received.set()
+
+    def __repr__(self) -> str:
+        return 'AsyncSerialAgent'
+
+
+async def make_async_serial_agent(port, **kwargs):
+    """Create an AsyncSerialAgent instance and try to open it with the board ready
+
+    Args:
+        port (str): name of the target port
+        kwargs: Arbitrary keyword arguments for the AsyncSerialAgent.
+            The 'min_act_duration' defaults to AGENT_MIN_ACT_DURATION.
+    """
+    agent = AsyncSerialAgent(port, **{'min_act_duration': AGENT_MIN_ACT_DURATION, **kwargs})
+
+    if not await agent.wait_until_ready():
+        logging.info(
+            'The board is not ready, so i try open the port again.')
+        await agent.open_port(attempt=3, retry_interval=10)
+
+    if not await agent.is_ready():
+        return None
+
+    return agent
+
+
+async def terminate_async_serial_agent(agent, act_down=True):
+    """Send a command of 'down' and close the port"""
+    if act_down:
+        await agent.write_command('d', 3)
+
+    await agent.read_port()
+    await agent.close_port()
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,201 @@
+import re
+import json
+import codecs
+import logging
+from modules.serial_agent import CommandPack
+
+
+class CommandPackParser:
+    """Incremental parser of the CommandPack json i.e) {"commandPack": [{"cmd": "ksit", "duration": 5}, ...]}
+
+    The payload is fed in any size of chunks, and each command is returned (validated)
+    as soon as its element of the 'commandPack' is completed.
+    Only the element in progress is buffered, the other values are skipped as they are scanned.
+
+    Examples:
+        parser = CommandPackParser()
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                agent.write_command(item['cmd'], item['duration'])
+        parser.close()
+
+    Notes:
+        - Same rules as the CommandPack, the invalid items are skipped.
+    """
+
+    # Max characters of an element of the 'commandPack'.
+    MAX_ITEM_SIZE = 65536
+
+    KEY = 'commandPack'
+
+    _TOKEN = re.compile(r'[{}\[\],:"]')
+
+    _STRING_END = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+    def __init__(self, max_item_size: int = MAX_ITEM_SIZE) -> None:
+        self.max_item_size = max_item_size
+
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        # Only for the validation rules.
+        self._validator = CommandPack()
+
+        self._buf = ''
+        # Position in the buffer to resume the scan from.
+        self._pos = 0
+        self._stack = []
+        self._expect_key = False
+        self._last_key = None
+        self._in_pack = False
+        self._item_start = None
+        self._started = False
+
+    def feed(self, data):
+        """Feed the received chunk (bytes or str).
+
+        Returns:
+            list: The valid commands completed in this chunk, i.e) [{'cmd': 'ksit', 'duration': 5}]
+
+        Raises:
+            ValueError: If the payload is not the CommandPack json or an element is too large.
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = self._decoder.decode(bytes(data))
+        self._buf += data
+
+        items = []
+        pos = self._scan(items)
+
+        # Drop the scanned text, except the element in progress.
+        keep = pos if self._item_start is None else self._item_start
+        if len(self._buf) - keep > self.max_item_size:
+            raise ValueError(f'An element of the {self.KEY} is over {self.max_item_size} characters.')
+        self._buf = self._buf[keep:]
+        self._pos = pos - keep
+        if self._item_start is not None:
+            self._item_start -= keep
+
+        return items
+
+    def close(self):
+        """Check the payload has completed.
+
+        Raises:
+            ValueError: If the payload is incomplete.
+        """
+        rest = self._decoder.decode(b'', final=True)
+        if rest.strip() or self._stack or not self._started or self._buf.strip():
+            raise ValueError('The CommandPack json is incomplete.')
+
+    def _scan(self, items):
+        """Scan the buffer and returns the position to resume from."""
+        buf = self._buf
+        stack = self._stack
+        pos = self._pos
+        while True:
+            match = self._TOKEN.search(buf, pos)
+            until = len(buf) if match is None else match.start()
+            if buf[pos:until].strip() and (not self._started or not stack):
+                raise ValueError('The CommandPack json must be an object.')
+            if match is None:
+                return len(buf)
+
+            token = match.group()
+            start = match.start()
+            if not self._started:
+                if token != '{':
+                    raise ValueError('The CommandPack json must be an object.')
+                self._started = True
+            elif not stack:
+                raise ValueError('The CommandPack json has extra data.')
+
+            if token == '"':
+                end = self._STRING_END.match(buf, start + 1)
+                if end is None:
+                    # The rest of the string is in the next chunk.
+                    return start
+                if len(stack) == 1 and self._expect_key:
+                    self._last_key = json.loads(buf[start:end.end()])
+                pos = end.end()
+                continue
+
+            pos = start + 1
+            if token in '{[':
+                if self._in_pack and len(stack) == 2 and self._item_start is None:
+                    self._item_start = start
+                if len(stack) == 1 and token == '[' and self._last_key == self.KEY:
+                    self._in_pack = True
+                stack.append(token)
+                self._expect_key = token == '{' and len(stack) == 1
+            elif token in '}]':
+                if not stack or stack.pop() != ('{' if token == '}' else '['):
+                    raise ValueError('The CommandPack json is malformed.')
+                if self._in_pack and len(stack) == 2 and self._item_start is not None:
+                    self._append(buf[self._item_start:pos], items)
+                    self._item_start = None
+                elif self._in_pack and len(stack) == 1:
+                    self._in_pack = False
+            elif token == ',':
+                self._expect_key = len(stack) == 1
+            elif token == ':':
+                if len(stack) == 1:
+                    self._expect_key = False
+
+    def _append(self, text, items):
+        try:
+            item = json.loads(text)
+        except ValueError:
+            logging.debug('Invalid item (%r).', text)
+            return
+
+        if type(item) is not dict:
+            logging.debug('Invalid item (%r).', item)
+            return
+
+        duration = item.get('duration', 0)
+        if not self._validator.is_valid_duration(duration):
+            return
+
+        cmd = item.get('cmd', '')
+        if not self._validator.is_valid_cmd(cmd):
+            return
+
+        items.append({'cmd': cmd, 'duration': int(duration)})
+
+    def __repr__(self) -> str:
+        return 'CommandPackParser'
+
+
+def iter_commands(source, chunk_size: int = 8192, **kwargs):
+    """Yields the valid commands of the CommandPack json as they are received.
+
+    Args:
+        source (Any): A file-like object (has 'read'), or an iterable of the chunks (bytes or str).
+        chunk_size (int, optional): Size of a read from the file-like object. Defaults to 8192.
+        kwargs: Arbitrary keyword arguments for the CommandPackParser.
+
+    Yields:
+        dict: i.e) {'cmd': 'ksit', 'duration': 5}
+
+    Raises:
+        ValueError: If the payload is not the CommandPack json.
+    """
+    chunks = source
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), source.read(0))
+
+    parser = CommandPackParser(**kwargs)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+def load_command_pack(source, **kwargs):
+    """Build a CommandPack from the file-like object or the chunks, without buffering the whole payload."""
+    command_pack = CommandPack()
+    for item in iter_commands(source, **kwargs):
+        command_pack.set_item(item['cmd'], item['duration'])
+    return command_pack
+
+
+if __name__ == '__main__':
+    pass
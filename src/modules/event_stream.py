@@ -0,0 +1,147 @@
+import logging
+
+
+class ServerEvent:
+    """An event of the Server-Sent Events.
+
+    Attributes:
+        id (str): The last event id at the dispatch, 'None' if not specified yet.
+        event (str): The event type. Defaults to 'message'.
+        data (str): The data lines joined with '\\n'.
+    """
+
+    __slots__ = ('id', 'event', 'data')
+
+    def __init__(self, id=None, event='message', data='') -> None:
+        self.id = id
+        self.event = event
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f'ServerEvent(id={self.id!r}, event={self.event!r}, data={self.data!r})'
+
+
+class EventStreamParser:
+    """Incremental parser of the 'text/event-stream'.
+
+    The received bytes are fed in any size of chunks, and the events are returned
+    as soon as their terminating blank line is received.
+
+    Examples:
+        parser = EventStreamParser()
+        for chunk in chunks:
+            for event in parser.feed(chunk):
+                handle(event)
+
+    Notes:
+        - See https://html.spec.whatwg.org/multipage/server-sent-events.html#event-stream-interpretation
+    """
+
+    def __init__(self, last_event_id=None) -> None:
+        """Construct a new parser.
+
+        Args:
+            last_event_id (str, optional): The id to resume from, it's kept until the stream updates it.
+        """
+        # Updated when an event is dispatched (even without data), the id to resume from.
+        self.last_event_id = last_event_id
+        # Milliseconds of the reconnection time specified by the server, 'None' if not.
+        self.retry = None
+
+        self._buf = bytearray()
+        self._id = last_event_id
+        self._event = ''
+        self._data = []
+        self._pending_cr = False
+
+    def feed(self, data: bytes):
+        """Feed the received bytes.
+
+        Returns:
+            list: The completed ServerEvent instances.
+        """
+        if self._pending_cr and data[:1] == b'\n':
+            # The rest of the CRLF split by the chunks.
+            data = data[1:]
+        self._pending_cr = False
+
+        self._buf += data
+        events = []
+        start = 0
+        buf = self._buf
+        size = len(buf)
+        while start < size:
+            cr = buf.find(b'\r', start)
+            lf = buf.find(b'\n', start)
+            if cr < 0 and lf < 0:
+                break
+
+            if cr < 0 or (0 <= lf < cr):
+                end, next_start = lf, lf + 1
+            elif cr + 1 < size:
+                end = cr
+                next_start = cr + 2 if buf[cr + 1] == 0x0a else cr + 1
+            else:
+                # CR at the end, LF may follow in the next chunk.
+                end, next_start = cr, cr + 1
+                self._pending_cr = True
+
+            event = self._process_line(bytes(buf[start:end]).decode('utf-8', 'replace'))
+            if event is not None:
+                events.append(event)
+            start = next_start
+
+        del self._buf[:start]
+        return events
+
+    def reset(self):
+        """Discard the incomplete event, i.e) when the connection is lost."""
+        self._buf.clear()
+        self._id = self.last_event_id
+        self._event = ''
+        self._data = []
+        self._pending_cr = False
+
+    def _process_line(self, line: str):
+        if line == '':
+            return self._dispatch()
+
+        if line.startswith(':'):
+            # Comment, i.e) keep-alive.
+            return None
+
+        field, sep, value = line.partition(':')
+        if sep and value.startswith(' '):
+            value = value[1:]
+
+        if field == 'data':
+            self._data.append(value)
+        elif field == 'event':
+            self._event = value
+        elif field == 'id':
+            if '\0' not in value:
+                self._id = value
+        elif field == 'retry':
+            if value.isdigit():
+                self.retry = int(value)
+        else:
+            logging.debug('Ignored the field of the event stream [%s]', field)
+
+        return None
+
+    def _dispatch(self):
+        self.last_event_id = self._id
+        data, event = self._data, self._event
+        self._data = []
+        self._event = ''
+        if not data:
+            return None
+
+        return ServerEvent(id=self.last_event_id, event=event or 'message', data='\n'.join(data))
+
+    def __repr__(self) -> str:
+        return 'EventStreamParser'
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,226 @@
+import threading
+import logging
+from collections import OrderedDict
+from typing import NamedTuple
+import numpy as np
+from modules.serial_agent import CommandPack
+from modules.joint_validator import JointValidator
+
+
+class GaitParams(NamedTuple):
+    """Parameters of the foot trajectory of a gait (millimeters).
+
+    Attributes:
+        stride (float): Length of a step, the foot moves from +stride/2 to -stride/2 on the ground.
+        lift (float): Height of the foot at the middle of the swing.
+        height (float): Height of the shoulders from the ground.
+        steps (int): Frames per cycle.
+        duty (float): Ratio of the cycle on the ground (0 to 1).
+        phases (tuple): Phase offsets (0 to 1) of the legs, in the order of the LEGS.
+    """
+    stride: float = 30.0
+    lift: float = 10.0
+    height: float = 80.0
+    steps: int = 24
+    duty: float = 0.5
+    phases: tuple = (0.0, 0.5, 0.0, 0.5)
+
+
+class GaitTable(NamedTuple):
+    """Solved angles of a gait cycle.
+
+    Attributes:
+        params (GaitParams):
+        joints (numpy.ndarray): The joint indexes of the columns.
+        angles (numpy.ndarray): Degrees of the frames x joints (int, read-only).
+    """
+    params: GaitParams
+    joints: np.ndarray
+    angles: np.ndarray
+
+    def frames(self, cycles: int = 1):
+        """Encode the cycles into the joint commands, i.e) for the 'SerialAgent.stream_frames'.
+
+        Returns:
+            list: i.e) [b'i8 40 9 41 ...', ...]
+        """
+        encoded = [
+            ('i' + ' '.join(f'{joint} {angle}' for joint, angle in zip(self.joints, row))).encode('utf-8')
+            for row in self.angles
+        ]
+        return encoded * cycles
+
+    def command_pack(self, cycles: int = 1, duration: int = 0):
+        """Returns the cycles as a CommandPack, each frame with the duration."""
+        command_pack = CommandPack()
+        for frame in self.frames(cycles):
+            command_pack.set_item(frame.decode('utf-8'), duration)
+        return command_pack
+
+
+class GaitGenerator:
+    """Gaits of the 'Bittle' solved by the inverse kinematics of the legs.
+
+    The feet follow the trajectory of the GaitParams (a line on the ground and an arc in the air),
+    and the angles of the all frames and legs are solved at once.
+    The solved tables are cached per parameters, the least recently used one is evicted.
+
+    Examples:
+        generator = GaitGenerator()
+        table = generator.table(stride=40, lift=12)
+        agent.stream_frames(table.frames(cycles=4), 24)
+
+    Notes:
+        - **The leg lengths and the directions are approximate, not measured ones.**
+          **Try adjusting to match your petoi.**
+        - The shoulder angle is 0 when the leg is vertical and positive to the front,
+          and the knee angle is 0 when the leg is straight.
+    """
+
+    LEGS = ('left_front', 'right_front', 'right_back', 'left_back')
+
+    SHOULDERS = (8, 9, 10, 11)
+
+    KNEES = (12, 13, 14, 15)
+
+    # Millimeters from the shoulder to the knee, and from the knee to the foot.
+    UPPER_LEG = 46.0
+    LOWER_LEG = 46.0
+
+    # Directions of the (shoulder, knee) angles of the each leg, to the ones of the commands.
+    DIRECTIONS = ((1, 1), (1, 1), (1, 1), (1, 1))
+
+    CACHE_SIZE = 32
+
+    def __init__(self, **kwargs) -> None:
+        """Construct a new generator.
+
+        Args:
+            kwargs: Arbitrary keyword arguments.
+                - cache_size (int): Max number of the cached tables. Defaults to CACHE_SIZE.
+                - upper_leg (float): Defaults to UPPER_LEG.
+                - lower_leg (float): Defaults to LOWER_LEG.
+                - directions (tuple): Defaults to DIRECTIONS.
+                - joint_validator (JointValidator): Limits of the solved angles.
+                  Defaults to the one with the default limits.
+        """
+        self.cache_size = kwargs.get('cache_size', self.CACHE_SIZE)
+        self.upper_leg = kwargs.get('upper_leg', self.UPPER_LEG)
+        self.lower_leg = kwargs.get('lower_leg', self.LOWER_LEG)
+        self.directions = np.array(kwargs.get('directions', self.DIRECTIONS), dtype=float)
+        self.joint_validator = kwargs.get('joint_validator') or JointValidator()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def table(self, params: GaitParams = None, **kwargs):
+        """Returns the solved table of the gait, from the cache if it's solved already.
+
+        Args:
+            params (GaitParams, optional): Defaults to the GaitParams with the kwargs.
+            kwargs: Fields of the GaitParams, i.e) stride=50
+
+        Raises:
+            ValueError: If the parameters are invalid, or any foot is out of reach or the limits of the joints.
+        """
+        if params is None:
+            params = GaitParams(**kwargs)
+        params = params._replace(phases=tuple(float(phase) for phase in params.phases))
+
+        with self._lock:
+            table = self._cache.get(params)
+            if table is not None:
+                self._cache.move_to_end(params)
+                self.stats['hits'] += 1
+                return table
+            self.stats['misses'] += 1
+
+        table = self.solve(params)
+
+        with self._lock:
+            self._cache[params] = table
+            self._cache.move_to_end(params)
+            while len(self._cache) > self.cache_size:
+                evicted, _ = self._cache.popitem(last=False)
+                self.stats['evictions'] += 1
+                logging.debug('Evicted the gait table (%r)', evicted)
+        return table
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def solve(self, params: GaitParams):
+        """Solve the angles of the gait (not cached)."""
+        x, z = self.foot_positions(params)
+        shoulders, knees = self.solve_ik(x, z)
+
+        shoulders *= self.directions[:, 0]
+        knees *= self.directions[:, 1]
+
+        angles = np.rint(np.concatenate([shoulders, knees], axis=1)).astype(int)
+        angles.setflags(write=False)
+        table = GaitTable(params, np.array(self.SHOULDERS + self.KNEES), angles)
+
+        errors = self.joint_validator.validate(frame.decode('utf-8') for frame in table.frames())
+        if errors:
+            raise ValueError(f'The gait is out of the limits at the frame {errors[0].position}: {errors[0].message}')
+        return table
+
+    def foot_positions(self, params: GaitParams):
+        """Returns the positions of the feet from the shoulders.
+
+        Returns:
+            tuple: The x (forward) and the z (downward) as the arrays of the frames x legs.
+        """
+        if params.steps < 1:
+            raise ValueError('The steps must be positive.')
+        if not 0 < params.duty < 1:
+            raise ValueError('The duty must be between 0 and 1.')
+        if len(params.phases) != len(self.LEGS):
+            raise ValueError(f'The phases must be {len(self.LEGS)} values.')
+
+        phases = (np.arange(params.steps)[:, None] / params.steps + np.array(params.phases)) % 1.0
+        on_ground = phases < params.duty
+
+        # On the ground: from the front to the back. In the air: back to the front on an arc.
+        stance = phases / params.duty
+        swing = (phases - params.duty) / (1 - params.duty)
+        x = np.where(on_ground, 0.5 - stance, swing - 0.5) * params.stride
+        z = params.height - np.where(on_ground, 0.0, np.sin(np.pi * swing) * params.lift)
+        return x, z
+
+    def solve_ik(self, x, z):
+        """Solve the angles of the two-link legs for the foot positions.
+
+        Returns:
+            tuple: Degrees of the shoulders and the knees, the arrays of the same shape as the positions.
+
+        Raises:
+            ValueError: If any position is out of reach.
+        """
+        upper, lower = self.upper_leg, self.lower_leg
+        distance = np.hypot(x, z)
+        if np.any(distance > upper + lower) or np.any(distance < abs(upper - lower)):
+            raise ValueError('The foot is out of reach of the leg.')
+
+        # Law of cosines, the interior angles at the knee and at the shoulder.
+        knee_inner = np.arccos(np.clip((upper ** 2 + lower ** 2 - distance ** 2) / (2 * upper * lower), -1, 1))
+        shoulder_inner = np.arccos(np.clip((upper ** 2 + distance ** 2 - lower ** 2) / (2 * upper * distance), -1, 1))
+
+        shoulders = np.degrees(np.arctan2(x, z) + shoulder_inner)
+        knees = np.degrees(np.pi - knee_inner)
+        return shoulders, knees
+
+    def __repr__(self) -> str:
+        return 'GaitGenerator'
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,239 @@
+import time
+import random
+import socket
+import threading
+import logging
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# The timing of the request in progress on the current thread.
+_current = threading.local()
+
+
+class RequestStats:
+    """Timing of a request (in seconds).
+
+    Attributes:
+        dns (float): Name resolution, 0 if the pooled connection is reused.
+        connect (float): TCP connection, 0 if the pooled connection is reused.
+        ttfb (float): Until the response headers are received (including dns, connect and TLS).
+        total (float): Until the whole response is received, including the retries.
+        attempts (int): Number of the attempts.
+        reused (bool): Whether the pooled connection is reused.
+        status (int): Status code of the last attempt, 'None' if failed to connect.
+    """
+
+    __slots__ = ('dns', 'connect', 'ttfb', 'total', 'attempts', 'reused', 'status')
+
+    def __init__(self) -> None:
+        self.dns = 0.0
+        self.connect = 0.0
+        self.ttfb = None
+        self.total = None
+        self.attempts = 0
+        self.reused = True
+        self.status = None
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __repr__(self) -> str:
+        return ' '.join(f'{key}={getattr(self, key)}' for key in self.__slots__)
+
+
+class RetryPolicy:
+    """Retries with the jittered exponential backoff.
+
+    Only the idempotent requests are retried, on the connection errors,
+    the timeouts and the statuses in 'RETRY_STATUSES'.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, attempts: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 10.0, jitter: float = 0.5) -> None:
+        """Construct a new policy.
+
+        Args:
+            attempts (int, optional): Max number of the attempts (1 is no retry). Defaults to 3.
+            backoff_base (float, optional): Seconds of the first backoff. Defaults to 0.5.
+            backoff_max (float, optional): Max seconds of the backoff. Defaults to 10.
+            jitter (float, optional): Ratio of the backoff randomized (0 to 1). Defaults to 0.5.
+        """
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+    def backoff(self, attempt: int):
+        """Returns the seconds of waiting after the attempt (counts from 1)."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def call(self, request, stats: RequestStats = None, idempotent: bool = True):
+        """Call the request with the retries.
+
+        Args:
+            request (Callable): Sends a request and returns the 'requests.Response'
+                (or any other result which is never retried).
+            stats (RequestStats, optional): Counts the attempts.
+            idempotent (bool, optional): Whether the request is safe to retry. Defaults to True.
+
+        Returns:
+            requests.Response: The response of the last attempt.
+
+        Raises:
+            requests.ConnectionError, requests.Timeout: If the last attempt is failed.
+        """
+        attempts = self.attempts if idempotent else 1
+        attempt = 0
+        while True:
+            attempt += 1
+            if stats is not None:
+                stats.attempts = attempt
+
+            try:
+                res = request()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= attempts:
+                    raise
+                logging.warning('Retry the request [%d/%d] (%r)', attempt, attempts, e)
+                time.sleep(self.backoff(attempt))
+                continue
+
+            status = getattr(res, 'status_code', None)
+            if stats is not None:
+                stats.status = status
+            if status not in self.RETRY_STATUSES or attempt >= attempts:
+                return res
+
+            logging.warning('Retry the request [%d/%d] (status %d)', attempt, attempts, res.status_code)
+            time.sleep(max(self.backoff(attempt), self._retry_after(res)))
+
+    def _retry_after(self, res):
+        """Returns the seconds of the 'Retry-After' header (capped by the backoff_max)."""
+        try:
+            return min(float(res.headers.get('Retry-After', 0)), self.backoff_max)
+        except ValueError:
+            return 0
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTP connection recording the time of the name resolution and the connection."""
+
+    def _new_conn(self):
+        return _timed_new_conn(self, super()._new_conn)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection recording the time of the name resolution and the connection."""
+
+    def _new_conn(self):
+        return _timed_new_conn(self, super()._new_conn)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Pooled keep-alive adapter recording the timing of the requests.
+
+    Examples:
+        stats = RequestStats()
+        with recording(stats):
+            session.get(url)
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        stats = getattr(_current, 'stats', None)
+        started = time.perf_counter()
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            if stats is not None:
+                stats.ttfb = time.perf_counter() - started
+
+
+@contextmanager
+def recording(stats: RequestStats):
+    """Record the timing of the requests on the current thread into the stats."""
+    _current.stats = stats
+    started = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.total = time.perf_counter() - started
+        _current.stats = None
+
+
+def _timed_new_conn(conn, new_conn):
+    """Resolve the host (timed) and connect to the resolved addresses in order (timed)."""
+    stats = getattr(_current, 'stats', None)
+    if stats is None:
+        return new_conn()
+
+    host = conn._dns_host
+    started = time.perf_counter()
+    try:
+        addresses = list(dict.fromkeys(
+            info[4][0] for info in socket.getaddrinfo(host, conn.port, 0, socket.SOCK_STREAM)))
+    except OSError:
+        # Let the urllib3 report the error of the resolution.
+        addresses = [host]
+    resolved = time.perf_counter()
+
+    try:
+        for i, address in enumerate(addresses):
+            conn._dns_host = address
+            try:
+                sock = new_conn()
+                break
+            except Exception:
+                if i == len(addresses) - 1:
+                    raise
+    finally:
+        conn._dns_host = host
+
+    stats.dns = resolved - started
+    stats.connect = time.perf_counter() - resolved
+    stats.reused = False
+    return sock
+
+
+def mount_timed_adapter(session: requests.Session, pool_connections: int = 1, pool_maxsize: int = 4):
+    """Mount the pooled keep-alive adapter to the session for both http and https.
+
+    Args:
+        session (requests.Session): The session to mount.
+        pool_connections (int, optional): Number of the pools (hosts) to cache. Defaults to 1.
+        pool_maxsize (int, optional): Max connections kept alive per host. Defaults to 4.
+
+    Returns:
+        TimedHTTPAdapter: The mounted adapter.
+    """
+    # Retries are handled by the RetryPolicy, to retry the idempotent requests only.
+    adapter = TimedHTTPAdapter(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+
+if __name__ == '__main__':
+    pass
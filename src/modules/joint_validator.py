@@ -0,0 +1,150 @@
+import re
+from typing import NamedTuple
+import numpy as np
+
+
+class JointError(NamedTuple):
+    """An invalid joint command.
+
+    Attributes:
+        position (Any): Where the command is, i.e) the index in the pack.
+        cmd (str): The command.
+        message (str): What is invalid.
+    """
+    position: object
+    cmd: str
+    message: str
+
+
+class JointValidator:
+    """Validator of the joint commands ('m' and 'i') for the 'Bittle'.
+
+    The commands are parsed into the arrays of (joint index, angle) all at once,
+    and the joint indexes and the angle limits of the all pairs are checked in one pass.
+
+    Examples:
+        errors = JointValidator().validate(['m8 30 9 -30', 'm1 30', 'm0 120'])
+        # => [JointError(position=1, ...), JointError(position=2, ...)]
+
+    Notes:
+        - **The limits are the safe ones for the commands, not the physical ones of the servos.**
+          **Try adjusting to match your petoi.**
+        - The other commands (i.e. 'ksit') are not checked.
+    """
+
+    TOKENS = ('m', 'i')
+
+    # Number of the joint indexes of the firmware.
+    JOINTS = 16
+
+    # Min and max degrees of the each joint of the 'Bittle', the others are not available.
+    # 0: head, 8-11: shoulders, 12-15: knees
+    LIMITS = {
+        0: (-90, 90),
+        8: (-90, 90), 9: (-90, 90), 10: (-90, 90), 11: (-90, 90),
+        12: (-90, 90), 13: (-90, 90), 14: (-90, 90), 15: (-90, 90),
+    }
+
+    # The arguments of a joint command, the pairs of (joint index, angle).
+    _ARGUMENTS = re.compile(r'\s*-?\d{1,4}\s+-?\d{1,4}(?:\s+-?\d{1,4}\s+-?\d{1,4})*\s*')
+
+    def __init__(self, limits: dict = None) -> None:
+        """Construct a new validator.
+
+        Args:
+            limits (dict, optional): Pairs of the joint index and (min, max) degrees. Defaults to LIMITS.
+        """
+        limits = self.LIMITS if limits is None else limits
+
+        self._available = np.zeros(self.JOINTS, dtype=bool)
+        self._lower = np.zeros(self.JOINTS, dtype=np.int64)
+        self._upper = np.zeros(self.JOINTS, dtype=np.int64)
+        for joint, (lower, upper) in limits.items():
+            self._available[joint] = True
+            self._lower[joint] = lower
+            self._upper[joint] = upper
+
+    @classmethod
+    def is_joint_command(cls, cmd):
+        return type(cmd) is str and cmd[:1] in cls.TOKENS
+
+    def validate(self, commands, positions=None):
+        """Validate the all joint commands.
+
+        Args:
+            commands (Iterable): The command strings, the others than the joint commands are ignored.
+            positions (Iterable, optional): Positions of the commands to report. Defaults to the indexes.
+
+        Returns:
+            list: The JointError of the all invalid commands in order (a command may have some errors).
+        """
+        commands = list(commands)
+        positions = range(len(commands)) if positions is None else list(positions)
+
+        owners, joints, angles, malformed = self.parse(commands)
+        errors = [
+            (i, JointError(positions[i], commands[i], 'The arguments must be pairs of (joint, angle).'))
+            for i in malformed
+        ]
+
+        if len(owners):
+            in_range = (joints >= 0) & (joints < self.JOINTS)
+            indexes = np.where(in_range, joints, 0)
+            available = in_range & self._available[indexes]
+            in_limits = (angles >= self._lower[indexes]) & (angles <= self._upper[indexes])
+
+            for k in np.flatnonzero(~available):
+                i = int(owners[k])
+                errors.append((i, JointError(
+                    positions[i], commands[i], f'Unavailable joint ({int(joints[k])}).')))
+            for k in np.flatnonzero(available & ~in_limits):
+                i = int(owners[k])
+                joint = int(joints[k])
+                errors.append((i, JointError(
+                    positions[i], commands[i],
+                    f'Angle {int(angles[k])} of the joint {joint} is out of '
+                    f'{int(self._lower[joint])} to {int(self._upper[joint])}.')))
+
+        # Stable, so the errors of a command keep the order of the checks.
+        errors.sort(key=lambda error: error[0])
+        return [error for _, error in errors]
+
+    @classmethod
+    def parse(cls, commands):
+        """Parse the all joint commands into the arrays of the pairs.
+
+        Args:
+            commands (Sequence): The command strings, the others than the joint commands are ignored.
+
+        Returns:
+            tuple: The arrays of the pairs (owners, joints, angles), the owner is the index of the command,
+                and the list of the indexes of the malformed joint commands.
+        """
+        malformed = []
+        owners = []
+        values = []
+        for i, cmd in enumerate(commands):
+            if not cls.is_joint_command(cmd):
+                continue
+
+            if cls._ARGUMENTS.fullmatch(cmd, 1) is None:
+                malformed.append(i)
+                continue
+
+            args = cmd[1:].split()
+            owners += [i] * (len(args) // 2)
+            values += args
+
+        pairs = np.array(values, dtype=np.int64).reshape(-1, 2)
+        return np.array(owners, dtype=np.int64), pairs[:, 0], pairs[:, 1], malformed
+
+    def validate_pack(self, command_pack):
+        """Validate the joint commands of the CommandPack, the positions are the indexes of the items."""
+        return self.validate(item['cmd'] for item in command_pack.items)
+
+    def __repr__(self) -> str:
+        return 'JointValidator'
+
+
+if __name__ == '__main__':
+    pass
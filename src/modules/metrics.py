@@ -0,0 +1,189 @@
+import os
+import traceback
+import logging
+from bisect import bisect_left
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    __slots__ = ('name', 'help', 'value')
+
+    def __init__(self, name: str, help: str = '') -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Histogram:
+    """Histogram with the fixed upper bounds of the buckets (in seconds).
+
+    Notes:
+        - The observation is one bisect and a few additions, no lock.
+          Each histogram is expected to be observed by a single thread.
+    """
+
+    __slots__ = ('name', 'help', 'buckets', 'counts', 'sum', 'count')
+
+    DEFAULT_BUCKETS = (
+        0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+        0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+    )
+
+    def __init__(self, name: str, help: str = '', buckets=DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # The last one is for '+Inf'.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Returns the pairs of the upper bound and the cumulative count, ending with '+Inf'."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class AgentMetrics:
+    """Instruments of the SerialAgent.
+
+    Histograms (seconds):
+        - write: Writing a command to the port.
+        - flush: Waiting for the transmission of the written command.
+        - wait: Sleeping or waiting for the acknowledgement after a command.
+        - reopen: Reopening the port until the board is ready.
+        - read_drain: Taking the received lines out of the port (or the reader thread).
+        - frame_lateness: Sending a streamed frame after its deadline.
+
+    Counters:
+        - bytes_out, bytes_in, lines_read, board_errors, reconnects, frames_missed, commands_collapsed
+    """
+
+    HISTOGRAMS = {
+        'write': 'Seconds of writing a command to the port.',
+        'flush': 'Seconds of waiting for the transmission of a command.',
+        'wait': 'Seconds of sleeping or waiting for the acknowledgement after a command.',
+        'reopen': 'Seconds of reopening the port until the board is ready.',
+        'read_drain': 'Seconds of taking the received lines out of the port.',
+        'frame_lateness': 'Seconds of sending a streamed frame after its deadline.',
+    }
+
+    COUNTERS = {
+        'bytes_out': 'Bytes written to the port.',
+        'bytes_in': 'Bytes read from the port.',
+        'lines_read': 'Lines read from the port.',
+        'board_errors': 'Error messages received from the board.',
+        'reconnects': 'Times the port has been reopened.',
+        'frames_missed': 'Streamed frames sent (or dropped) after the deadline of the next one.',
+        'commands_collapsed': 'Commands skipped or shortened for not changing the posture.',
+    }
+
+    def __init__(self, prefix: str = 'petoi_serial') -> None:
+        self.prefix = prefix
+        self.histograms = {
+            name: Histogram(name, help) for name, help in self.HISTOGRAMS.items()}
+        self.counters = {
+            name: Counter(name, help) for name, help in self.COUNTERS.items()}
+
+    def observe(self, name: str, value: float):
+        self.histograms[name].observe(value)
+
+    def inc(self, name: str, amount=1):
+        self.counters[name].inc(amount)
+
+    def add_counter(self, name: str, help: str = ''):
+        """Add a counter if it does not exist yet, and returns it."""
+        if name not in self.counters:
+            self.counters[name] = Counter(name, help)
+        return self.counters[name]
+
+    def snapshot(self):
+        """Returns the current values as a dict.
+
+        Returns:
+            dict: i.e) {'counters': {'bytes_out': 12, ...},
+                        'histograms': {'write': {'count': 3, 'sum': 0.01, 'buckets': [[0.0001, 0], ...]}, ...}}
+        """
+        return {
+            'counters': {name: c.value for name, c in self.counters.items()},
+            'histograms': {
+                name: {
+                    'count': h.count,
+                    'sum': h.sum,
+                    'buckets': [[bound, count] for bound, count in h.cumulative_counts()],
+                } for name, h in self.histograms.items()
+            },
+        }
+
+    def to_prometheus(self):
+        """Returns the current values in the Prometheus text format."""
+        lines = []
+        for name, counter in self.counters.items():
+            metric = f'{self.prefix}_{name}_total'
+            lines.append(f'# HELP {metric} {counter.help}')
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {counter.value}')
+
+        for name, hist in self.histograms.items():
+            metric = f'{self.prefix}_{name}_seconds'
+            lines.append(f'# HELP {metric} {hist.help}')
+            lines.append(f'# TYPE {metric} histogram')
+            for bound, count in hist.cumulative_counts():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{metric}_bucket{{le="{le}"}} {count}')
+            lines.append(f'{metric}_sum {hist.sum!r}')
+            lines.append(f'{metric}_count {hist.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def dump_prometheus(self, filepath: str):
+        """Write the current values to the file in the Prometheus text format.
+
+        The file is replaced atomically, for the collectors (i.e. node_exporter textfile).
+        """
+        tmp_path = f'{filepath}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, filepath)
+        except:
+            logging.error('Failed to dump metrics (%s)', traceback.format_exc())
+            raise
+
+    def try_dump_prometheus(self, filepath: str):
+        """Same as the 'dump_prometheus', but only if the file is configured and never raises.
+
+        For the entry points to refresh the metrics file between the actions.
+
+        Returns:
+            bool: 'False' if not configured or failed.
+        """
+        if not filepath:
+            return False
+
+        try:
+            self.dump_prometheus(filepath)
+        except OSError:
+            logging.warning('Skipped dumping metrics to %s', filepath)
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        return 'AgentMetrics'
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,287 @@
+import re
+import json
+import time
+import base64
+import random
+import secrets
+import hashlib
+import threading
+import logging
+from email.utils import formatdate
+from urllib.parse import parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockApiServer:
+    """Local stand-in of the token and action end points of the API.
+
+    It speaks the same protocol as the API, so 'ApiClient' works unchanged against it:
+    the client credentials grant on the token end point, and the action of the client
+    as a JSON with the 'ETag' (and '304 Not Modified') on the action end point.
+
+    - latency: Seconds added to every action response, a float or a range (min, max).
+    - error_rate: Ratio of the action requests answered with the 'error_status'.
+    - not_modified: Whether to answer '304' to the matched 'If-None-Match'.
+
+    Examples:
+        with MockApiServer(latency=(0.01, 0.05), error_rate=0.1) as server:
+            client = ApiClient('id', 'secret',
+                               end_point_token=server.end_point_token,
+                               end_point_action=server.end_point_action)
+
+    Notes:
+        - It's served over the plain http,
+          set the 'OAUTHLIB_INSECURE_TRANSPORT' environment variable for the client.
+    """
+
+    TOKEN_PATH = '/robots/connect'
+
+    ACTION_PATH = '/action'
+
+    TOKEN_LIFETIME = 3600
+
+    DEFAULT_ACTION = {
+        'commandPack': [
+            {'cmd': 'ksit', 'duration': 3},
+            {'cmd': 'kbalance', 'duration': 2},
+        ],
+    }
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **kwargs) -> None:
+        """Bind the server (not served until 'start').
+
+        Args:
+            host (str, optional): Defaults to '127.0.0.1'.
+            port (int, optional): 0 to pick a free port. Defaults to 0.
+            kwargs: Arbitrary keyword arguments.
+                - latency (float|tuple): Seconds of the action responses. Defaults to 0.
+                - token_latency (float|tuple): Seconds of the token responses. Defaults to 0.
+                - error_rate (float): Ratio of the errors of the action requests (0 to 1). Defaults to 0.
+                - error_status (int): Status code of the errors. Defaults to 503.
+                - token_lifetime (int): Seconds of the 'expires_in' of the tokens. Defaults to TOKEN_LIFETIME.
+                - not_modified (bool): Whether to answer 304 to the conditional requests. Defaults to True.
+                - clients (dict): Pairs of the client id and secret to accept, any if not specified.
+                - action (dict): The action for all clients. Defaults to DEFAULT_ACTION.
+                - seed (int): Seed of the random of the latency and errors.
+        """
+        self.latency = kwargs.get('latency', 0)
+        self.token_latency = kwargs.get('token_latency', 0)
+        self.error_rate = kwargs.get('error_rate', 0)
+        self.error_status = kwargs.get('error_status', 503)
+        self.token_lifetime = kwargs.get('token_lifetime', self.TOKEN_LIFETIME)
+        self.not_modified = kwargs.get('not_modified', True)
+        self.clients = kwargs.get('clients')
+
+        self._random = random.Random(kwargs.get('seed'))
+        self._lock = threading.Lock()
+        # Pairs of the access token and (client_id, expires_at).
+        self._tokens = {}
+        # Pairs of the client id (None for all) and (body, etag, last_modified).
+        self._actions = {}
+        self.set_action(kwargs.get('action', self.DEFAULT_ACTION))
+        self.reset_stats()
+
+        self._httpd = ThreadingHTTPServer((host, port), _MockApiHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.api = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def end_point_token(self):
+        return f'{self.url}{self.TOKEN_PATH}'
+
+    @property
+    def end_point_action(self):
+        return f'{self.url}{self.ACTION_PATH}'
+
+    def start(self):
+        """Serve on a background thread."""
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05},
+            name='MockApiServer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def set_action(self, action: dict, client_id: str = None):
+        """Replace the action, the new one gets a new 'ETag'.
+
+        Args:
+            action (dict): i.e) {'commandPack': [{'cmd': 'ksit', 'duration': 3}]}
+            client_id (str, optional): The client to serve, all clients if 'None'.
+        """
+        body = json.dumps(action).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        with self._lock:
+            self._actions[client_id] = (body, etag, formatdate(usegmt=True))
+
+    def revoke_tokens(self):
+        """Invalidate all issued tokens, the clients get 401 until they fetch a new one."""
+        with self._lock:
+            self._tokens.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                'token_requests': 0,
+                'action_requests': 0,
+                'statuses': {},
+            }
+
+    def _issue_token(self, client_id, client_secret):
+        if self.clients is not None and self.clients.get(client_id) != client_secret:
+            return None
+
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._tokens[token] = (client_id, time.time() + self.token_lifetime)
+        return {
+            'access_token': token,
+            'token_type': 'Bearer',
+            'expires_in': self.token_lifetime,
+        }
+
+    def _authorize(self, authorization, client_id):
+        """Returns whether the bearer token is valid for the client."""
+        match = re.match(r'Bearer\s+(\S+)', authorization or '', re.IGNORECASE)
+        if match is None:
+            return False
+
+        with self._lock:
+            issued = self._tokens.get(match.group(1))
+        return issued is not None and issued[0] == client_id and time.time() < issued[1]
+
+    def _get_action(self, client_id):
+        with self._lock:
+            return self._actions.get(client_id) or self._actions[None]
+
+    def _count(self, key, status):
+        with self._lock:
+            self.stats[key] += 1
+            self.stats['statuses'][status] = self.stats['statuses'].get(status, 0) + 1
+
+    def _delay(self, latency):
+        if isinstance(latency, (tuple, list)):
+            with self._lock:
+                latency = self._random.uniform(*latency)
+        if latency > 0:
+            time.sleep(latency)
+
+    def _is_error(self):
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    def __repr__(self) -> str:
+        return 'MockApiServer'
+
+
+class _MockApiHandler(BaseHTTPRequestHandler):
+
+    # Keep-alive, the responses always have the Content-Length.
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        api = self.server.api
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.split('?')[0].rstrip('/') != api.TOKEN_PATH:
+            return self._send_json(404, {'error': 'not_found'})
+
+        api._delay(api.token_latency)
+        params = {k: v[0] for k, v in parse_qs(body.decode('utf-8')).items()}
+        client_id, client_secret = self._basic_auth()
+        client_id = params.get('client_id', client_id)
+        client_secret = params.get('client_secret', client_secret)
+
+        token = None
+        if params.get('grant_type') == 'client_credentials':
+            token = api._issue_token(client_id, client_secret)
+
+        if token is None:
+            api._count('token_requests', 401)
+            return self._send_json(401, {'error': 'invalid_client'})
+
+        api._count('token_requests', 200)
+        self._send_json(200, token)
+
+    def do_GET(self):
+        api = self.server.api
+        prefix = f'{api.ACTION_PATH}/'
+        path = self.path.split('?')[0]
+        if not path.startswith(prefix):
+            return self._send_json(404, {'error': 'not_found'})
+
+        client_id = unquote(path[len(prefix):].rstrip('/'))
+        api._delay(api.latency)
+
+        if not api._authorize(self.headers.get('Authorization'), client_id):
+            api._count('action_requests', 401)
+            return self._send_json(401, {'error': 'invalid_token'})
+
+        if api._is_error():
+            api._count('action_requests', api.error_status)
+            return self._send_json(api.error_status, {'error': 'unavailable'})
+
+        body, etag, last_modified = api._get_action(client_id)
+        if api.not_modified and self.headers.get('If-None-Match') == etag:
+            api._count('action_requests', 304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        api._count('action_requests', 200)
+        self._send(200, body, {'ETag': etag, 'Last-Modified': last_modified})
+
+    def _basic_auth(self):
+        match = re.match(r'Basic\s+(\S+)', self.headers.get('Authorization', ''), re.IGNORECASE)
+        if match is None:
+            return None, None
+
+        try:
+            client_id, _, client_secret = base64.b64decode(match.group(1)).decode('utf-8').partition(':')
+        except ValueError:
+            return None, None
+        return unquote(client_id), unquote(client_secret)
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data).encode('utf-8'))
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug('MockApiServer: %s', format % args)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,267 @@
+import time
+import threading
+import traceback
+import logging
+from collections import deque
+from modules.scheduler import IntervalScheduler
+from modules.serial_agent import CommandPack
+from modules.joint_validator import JointValidator
+
+
+class ActionPipeline:
+    """Two-stage pipeline of fetching the actions and performing them.
+
+    The fetcher thread polls the 'ApiClient' on the schedule and puts the CommandPack
+    into the bounded queue, and the actor thread performs the queued packs on the 'SerialAgent'.
+    So the next action is fetched while the robot is still moving, and vice versa.
+
+    - depth: Max number of the packs waiting in the queue.
+    - ttl: Seconds a fetched pack is valid, the older one is dropped as stale when it's taken.
+    - drop_policy: Which pack to drop when the queue is full,
+      'oldest' (the head of the queue) or 'newest' (the fetched one).
+
+    The invalid joint commands of the fetched pack are rejected (see 'JointValidator') before it's queued.
+
+    Examples:
+        pipeline = ActionPipeline(client, agent, interval=180, floor=180, ttl=600)
+        pipeline.start()
+        ...
+        pipeline.stop()
+    """
+
+    DROP_OLDEST = 'oldest'
+
+    DROP_NEWEST = 'newest'
+
+    DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+    DEPTH = 1
+
+    # Status codes of the 'get_action' to perform the pack.
+    ACCEPT_STATUSES = (200, 304)
+
+    def __init__(self, client, agent, **kwargs) -> None:
+        """Construct a new pipeline.
+
+        Args:
+            client (ApiClient): Source of the actions.
+            agent (SerialAgent): Performer of the actions.
+            kwargs: Arbitrary keyword arguments.
+                - interval (float): Seconds between the fetches. Defaults to 180.
+                - floor (float): Min seconds between the fetches. Defaults to 0.
+                - scheduler (IntervalScheduler): Schedule of the fetches, instead of the interval and floor.
+                - feed (ActionFeed): Source of the pushed actions, instead of polling the client on the schedule.
+                - depth (int): Max number of the packs in the queue. Defaults to DEPTH.
+                - ttl (float): Seconds until a fetched pack gets stale. Defaults to 'None' (never).
+                - drop_policy (str): 'oldest' or 'newest'. Defaults to 'oldest'.
+                - on_performed (Callable): Called with the pack after it's performed (on the actor thread).
+                - joint_validator (JointValidator): Defaults to the one with the default limits.
+        """
+        drop_policy = kwargs.get('drop_policy', self.DROP_OLDEST)
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f'Unknown drop policy [{drop_policy}]')
+
+        self.client = client
+        self.agent = agent
+        self.depth = max(1, kwargs.get('depth', self.DEPTH))
+        self.ttl = kwargs.get('ttl')
+        self.drop_policy = drop_policy
+        self.on_performed = kwargs.get('on_performed')
+        self.feed = kwargs.get('feed')
+        self.joint_validator = kwargs.get('joint_validator') or JointValidator()
+        self.scheduler = kwargs.get('scheduler') or IntervalScheduler(
+            kwargs.get('interval', 180), floor=kwargs.get('floor', 0))
+
+        self.stats = {
+            'fetched': 0,
+            'fetch_errors': 0,
+            'performed': 0,
+            'dropped_full': 0,
+            'dropped_stale': 0,
+            'rejected_commands': 0,
+        }
+
+        # Pairs of (fetched_at, CommandPack).
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the fetcher and the actor threads."""
+        if self._threads:
+            return
+
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._run_fetcher, name='ActionFetcher', daemon=True),
+            threading.Thread(target=self._run_actor, name='ActionActor', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the threads, the pack being performed is finished but the queued ones are dropped."""
+        self._stop_event.set()
+        if self.feed is not None:
+            self.feed.stop()
+        with self._cond:
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+        with self._cond:
+            self._queue.clear()
+
+    def is_running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def qsize(self):
+        with self._cond:
+            return len(self._queue)
+
+    def put(self, command_pack):
+        """Queue the pack according to the drop policy.
+
+        Returns:
+            bool: 'False' if the pack is dropped.
+        """
+        with self._cond:
+            if len(self._queue) >= self.depth:
+                self.stats['dropped_full'] += 1
+                if self.drop_policy == self.DROP_NEWEST:
+                    logging.warning('The queue is full, dropped the fetched action.')
+                    return False
+
+                logging.warning('The queue is full, dropped the oldest action.')
+                self._queue.popleft()
+
+            self._queue.append((time.monotonic(), command_pack))
+            self._cond.notify()
+            return True
+
+    def take(self, timeout=None):
+        """Take the next pack which is not stale.
+
+        Returns:
+            CommandPack: 'None' if timed out or stopped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._stop_event.is_set():
+                while self._queue:
+                    fetched_at, command_pack = self._queue.popleft()
+                    if self.ttl is None or time.monotonic() - fetched_at <= self.ttl:
+                        return command_pack
+
+                    self.stats['dropped_stale'] += 1
+                    logging.warning('Dropped the stale action (fetched %.1fsec ago).',
+                                    time.monotonic() - fetched_at)
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+        return None
+
+    def fetch(self):
+        """Get the action from the API and queue it."""
+        try:
+            status, command_pack = self.client.get_action()
+        except Exception:
+            # Already logged in the 'get_action', try again at the next schedule.
+            self.stats['fetch_errors'] += 1
+            return False
+
+        self.stats['fetched'] += 1
+        logging.info('Fetched status[%d] commands[%d] (%r)',
+                     status, len(command_pack.items), self.client.last_request_stats)
+        if status not in self.ACCEPT_STATUSES or not command_pack.items:
+            return False
+
+        command_pack = self.screen(command_pack)
+        if not command_pack.items:
+            return False
+
+        return self.put(command_pack)
+
+    def screen(self, command_pack):
+        """Reject the invalid joint commands of the pack.
+
+        Returns:
+            CommandPack: The same instance if all commands are valid, otherwise a new one without the invalid ones.
+        """
+        errors = self.joint_validator.validate_pack(command_pack)
+        if not errors:
+            return command_pack
+
+        rejected = set()
+        for error in errors:
+            logging.warning('Rejected the command %d %r: %s', error.position, error.cmd, error.message)
+            rejected.add(error.position)
+        self.stats['rejected_commands'] += len(rejected)
+
+        screened = CommandPack()
+        for i, item in enumerate(command_pack.items):
+            if i not in rejected:
+                screened.set_item(item['cmd'], item['duration'])
+        return screened
+
+    def perform(self, command_pack):
+        """Perform the pack on the agent."""
+        try:
+            for action in command_pack.items:
+                if self._stop_event.is_set():
+                    break
+                self.agent.write_command(action['cmd'], action['duration'])
+
+            if self.agent.has_error_response():
+                logging.warning('The board replied an error')
+        except Exception:
+            logging.error('Failed to perform (%s)', traceback.format_exc())
+
+        self.stats['performed'] += 1
+        if self.on_performed is not None:
+            self.on_performed(command_pack)
+
+    def _run_fetcher(self):
+        try:
+            self._fetch_loop()
+        except Exception:
+            # Not to keep only the actor running without the actions.
+            logging.error('The fetcher is stopped, so the pipeline is stopping (%s)', traceback.format_exc())
+            self.stats['fetch_errors'] += 1
+            self._stop_event.set()
+            with self._cond:
+                self._cond.notify_all()
+
+    def _fetch_loop(self):
+        if self.feed is None:
+            while self.scheduler.wait(self._stop_event):
+                self.fetch()
+            return
+
+        for command_pack in self.feed.packs():
+            if self._stop_event.is_set():
+                break
+            self.stats['fetched'] += 1
+            command_pack = self.screen(command_pack)
+            if command_pack.items:
+                self.put(command_pack)
+
+    def _run_actor(self):
+        while not self._stop_event.is_set():
+            command_pack = self.take()
+            if command_pack is None:
+                continue
+            self.perform(command_pack)
+
+    def __repr__(self) -> str:
+        return 'ActionPipeline'
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,185 @@
+import re
+
+
+class PostureTracker:
+    """Last known state of the petoi, from the sent commands.
+
+    It knows the posture after a posture skill (i.e. 'kbalance') or the rest ('d'),
+    and the angles of the joints set by the joint commands ('m' and 'i') after it.
+    A command which doesn't change the known state is redundant,
+    and it's collapsed according to the policy of the command.
+
+    Policies:
+        - send: Send it as usual.
+        - skip: Neither send nor wait.
+        - shorten: Don't send, but wait the duration of the command
+          (not raised to the 'min_act_duration'). With the 'ack_pacing' of the agent,
+          it doesn't wait at all, the sent one would return at the acknowledgement.
+
+    Examples:
+        tracker = PostureTracker(policies={'d': 'skip'})
+        agent = SerialAgent(port, posture_tracker=tracker)
+
+    Notes:
+        - The state is forgotten after any other command (i.e. a behavior or a gait),
+          a reconnection or an error response of the board.
+    """
+
+    SEND = 'send'
+
+    SKIP = 'skip'
+
+    SHORTEN = 'shorten'
+
+    POLICIES = (SEND, SKIP, SHORTEN)
+
+    DEFAULT_POLICY = SHORTEN
+
+    # Skills which end in a still posture, (same as the VirtualBittle).
+    POSTURES = (
+        'balance', 'buttUp', 'calib', 'dropped', 'lifted', 'rest', 'sit', 'str', 'zero',
+    )
+
+    # The rest command, the same posture as the 'krest'.
+    REST = 'd'
+
+    JOINT_TOKENS = ('m', 'i')
+
+    _PAIRS = re.compile(r'\s*-?\d+\s+-?\d+(?:\s+-?\d+\s+-?\d+)*\s*')
+
+    def __init__(self, **kwargs) -> None:
+        """Construct a new tracker.
+
+        Args:
+            kwargs: Arbitrary keyword arguments.
+                - policies (dict): Pairs of the command (i.e. 'kbalance') or its token (i.e. 'k', 'm')
+                  and the policy, the command takes precedence.
+                - default_policy (str): Policy of the others. Defaults to DEFAULT_POLICY.
+
+        Raises:
+            ValueError: If any policy is unknown.
+        """
+        self.policies = dict(kwargs.get('policies', {}))
+        self.default_policy = kwargs.get('default_policy', self.DEFAULT_POLICY)
+        for policy in list(self.policies.values()) + [self.default_policy]:
+            if policy not in self.POLICIES:
+                raise ValueError(f'Unknown policy [{policy}]')
+
+        self.stats = {
+            'skipped': 0,
+            'shortened': 0,
+        }
+        self.reset()
+
+    @classmethod
+    def parse_policies(cls, text: str):
+        """Parse the policies written in the settings.
+
+        Args:
+            text (str): Pairs of the command or the token and the policy, i.e) 'd:skip, kbalance:send'
+
+        Returns:
+            dict: i.e) {'d': 'skip', 'kbalance': 'send'}
+
+        Raises:
+            ValueError: If any pair is malformed.
+        """
+        policies = {}
+        for pair in (text or '').split(','):
+            if not pair.strip():
+                continue
+
+            cmd, sep, policy = pair.partition(':')
+            if not sep or not cmd.strip() or not policy.strip():
+                raise ValueError(f'Malformed policy [{pair.strip()}]')
+            policies[cmd.strip()] = policy.strip()
+        return policies
+
+    def reset(self):
+        """Forget the state."""
+        self.posture = None
+        self.joints = {}
+
+    def policy_of(self, cmd: str):
+        """Returns the policy of the command if it's redundant, otherwise 'send'."""
+        if not self.is_redundant(cmd):
+            return self.SEND
+        return self.policies.get(cmd, self.policies.get(cmd[:1], self.default_policy))
+
+    def is_redundant(self, cmd: str):
+        """Checks the command doesn't change the known state."""
+        posture = self._posture_of(cmd)
+        if posture is not None:
+            return posture == self.posture and not self.joints
+
+        pairs = self._pairs_of(cmd)
+        if pairs is None:
+            return False
+        return all(self.joints.get(joint) == angle for joint, angle in pairs)
+
+    def collapse(self, cmd: str):
+        """Returns the policy of the command, and counts it if it's collapsed."""
+        policy = self.policy_of(cmd)
+        if policy == self.SKIP:
+            self.stats['skipped'] += 1
+        elif policy == self.SHORTEN:
+            self.stats['shortened'] += 1
+        return policy
+
+    def update(self, cmd: str):
+        """Update the state by the sent command."""
+        posture = self._posture_of(cmd)
+        if posture is not None:
+            self.posture = posture
+            self.joints = {}
+            return
+
+        pairs = self._pairs_of(cmd)
+        if pairs is None:
+            self.reset()
+            return
+
+        # The joints of a posture are unknown, so the posture is known only with the joints set after it.
+        for joint, angle in pairs:
+            self.joints[joint] = angle
+
+    def _posture_of(self, cmd):
+        if cmd == self.REST:
+            return 'rest'
+        if cmd.startswith('k') and cmd[1:] in self.POSTURES:
+            return cmd[1:]
+        return None
+
+    def _pairs_of(self, cmd):
+        """Returns the pairs of (joint, angle) of the joint command, 'None' if it's not."""
+        if cmd[:1] not in self.JOINT_TOKENS or self._PAIRS.fullmatch(cmd, 1) is None:
+            return None
+
+        values = [int(value) for value in cmd[1:].split()]
+        return list(zip(values[0::2], values[1::2]))
+
+    def __repr__(self) -> str:
+        return 'PostureTracker'
+
+
+def make_posture_tracker(conf):
+    """Create a PostureTracker from the [Petoi] section of the settings
+
+    Args:
+        conf (ConfigParser): The settings, see the 'elide_redundant' and 'elide_policies'.
+
+    Returns:
+        PostureTracker: 'None' if the 'elide_redundant' is off.
+
+    Raises:
+        ValueError: If the policies are malformed or unknown.
+    """
+    if not conf.getboolean('Petoi', 'elide_redundant', fallback=False):
+        return None
+
+    return PostureTracker(
+        policies=PostureTracker.parse_policies(conf.get('Petoi', 'elide_policies', fallback='')))
+
+
+if __name__ == '__main__':
+    pass
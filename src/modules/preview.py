@@ -0,0 +1,196 @@
+from typing import NamedTuple
+import numpy as np
+from modules.serial_agent import SerialAgent, AGENT_MIN_ACT_DURATION
+from modules.joint_validator import JointValidator
+
+
+class Timeline(NamedTuple):
+    """Joint states replayed from the commands.
+
+    Attributes:
+        times (numpy.ndarray): Seconds from the start to sending each command (commands).
+        angles (numpy.ndarray): Degrees of the joints after each command (commands x joints),
+            'NaN' while it's unknown (i.e. after a skill).
+        duration (float): Seconds of the whole run, including the start up.
+        travel (numpy.ndarray): Total degrees each joint moves (joints).
+        peak_velocity (numpy.ndarray): Max degrees per second of each joint (joints).
+    """
+    times: np.ndarray
+    angles: np.ndarray
+    duration: float
+    travel: np.ndarray
+    peak_velocity: np.ndarray
+
+    def summary(self):
+        """Returns the report as a dict, only with the joints which have moved.
+
+        Returns:
+            dict: i.e) {'duration': 26.0, 'commands': 5, 'joints': {8: {'travel': 30.0, 'peak_velocity': 100.0}}}
+        """
+        return {
+            'duration': self.duration,
+            'commands': len(self.times),
+            'joints': {
+                int(joint): {
+                    'travel': float(self.travel[joint]),
+                    'peak_velocity': float(self.peak_velocity[joint]),
+                } for joint in np.flatnonzero(self.travel > 0)
+            },
+        }
+
+
+class MotionPreview:
+    """Offline replay of the commands, without the petoi.
+
+    The time of the run is estimated same as the 'SerialAgent' (the start up waiting,
+    and the sleep of each command raised to the 'min_act_duration'),
+    and the joint commands ('m' and 'i') are replayed into the states of the joints.
+
+    Examples:
+        preview = MotionPreview()
+        for name, timeline in preview.replay_library(ScenarioLibrary.load('resources/automate.json')).items():
+            print(name, timeline.summary())
+
+    Notes:
+        - The joints move in the 'MOTION_SECONDS' of each command (or its sleep if shorter),
+          the velocity is the average one of the motion.
+        - The joints are unknown after a skill ('k') or the rest ('d'), until they're commanded.
+        - A joint commanded twice in a 'm' moves to the angles in sequence (a sub-step per angle,
+          each one takes the motion seconds), in a 'i' it moves to the last angle.
+        - The 'ack_pacing' is not estimated, the time is the upper bound of it.
+    """
+
+    JOINTS = JointValidator.JOINTS
+
+    # Seconds of the motion of a joint command (same as the VirtualBittle).
+    MOTION_SECONDS = {
+        'm': 0.3,
+        'i': 0.3,
+    }
+
+    # Tokens of the commands which move the joints to the unknown states.
+    POSTURE_TOKENS = ('k', 'd')
+
+    def __init__(self, **kwargs) -> None:
+        """Construct a new preview.
+
+        Args:
+            kwargs: Arbitrary keyword arguments.
+                - min_act_duration (int): Defaults to AGENT_MIN_ACT_DURATION (same as the entry points).
+                - start_up_waiting (float): Seconds before the first command. Defaults to SerialAgent.START_UP_WAITING.
+                - motion_seconds (dict): Seconds of the motion per token. Defaults to MOTION_SECONDS.
+                - initial (dict): Pairs of the joint index and the degrees at the start, unknown if not specified.
+        """
+        self.min_act_duration = kwargs.get('min_act_duration', AGENT_MIN_ACT_DURATION)
+        self.start_up_waiting = kwargs.get('start_up_waiting', SerialAgent.START_UP_WAITING)
+        self.motion_seconds = {**self.MOTION_SECONDS, **kwargs.get('motion_seconds', {})}
+        self.initial = np.full(self.JOINTS, np.nan)
+        for joint, angle in kwargs.get('initial', {}).items():
+            self.initial[joint] = angle
+
+    def replay(self, commands):
+        """Replay the commands.
+
+        Args:
+            commands (Iterable): Pairs of the command string (empty if just sleep) and the duration.
+
+        Returns:
+            Timeline:
+        """
+        commands = list(commands)
+        cmds = [cmd for cmd, _ in commands]
+        count = len(cmds)
+
+        durations = np.array([duration for _, duration in commands], dtype=float)
+        has_cmd = np.array([bool(cmd) for cmd in cmds], dtype=bool)
+        durations = np.where(has_cmd, np.maximum(durations, self.min_act_duration), durations)
+        ends = np.cumsum(durations)
+        times = self.start_up_waiting + ends - durations
+        duration = float(self.start_up_waiting + (ends[-1] if count else 0))
+
+        owners, joints, angles, _ = JointValidator.parse(cmds)
+        available = (joints >= 0) & (joints < self.JOINTS)
+        owners, joints, angles = owners[available], joints[available], angles[available]
+        owners, joints, angles, steps = self._expand_steps(cmds, owners, joints, angles)
+
+        # Rows of the sub-steps of each command, the initial state at the top.
+        counts = np.ones(count, dtype=np.int64)
+        np.maximum.at(counts, owners, steps + 1)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        states = np.full((offsets[-1] + 1, self.JOINTS), np.nan)
+        states[0] = self.initial
+        is_set = np.zeros(states.shape, dtype=bool)
+        is_set[0] = True
+
+        resets = np.array([cmd[:1] in self.POSTURE_TOKENS for cmd in cmds], dtype=bool)
+        is_set[offsets[:-1][resets] + 1] = True
+
+        rows = offsets[owners] + steps + 1
+        states[rows, joints] = angles
+        is_set[rows, joints] = True
+
+        # Forward fill, from the last sub-step which has set the joint.
+        filled = np.where(is_set, np.arange(len(states))[:, None], 0)
+        filled = np.maximum.accumulate(filled, axis=0)
+        states = states[filled, np.arange(self.JOINTS)]
+
+        moves = np.nan_to_num(np.abs(np.diff(states, axis=0)))
+        # Seconds of the motion of each sub-step, the sub-steps are squeezed into the sleep if shorter.
+        motion = np.array([self.motion_seconds.get(cmd[:1], 0) for cmd in cmds], dtype=float)
+        motion = np.where((durations > 0) & (durations < motion * counts), durations / counts, motion)
+        motion = np.repeat(motion, counts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            velocities = np.where(motion[:, None] > 0, moves / motion[:, None], 0)
+
+        return Timeline(
+            times=times,
+            angles=states[offsets[1:]],
+            duration=duration,
+            travel=moves.sum(axis=0),
+            peak_velocity=velocities.max(axis=0) if count else np.zeros(self.JOINTS),
+        )
+
+    def _expand_steps(self, cmds, owners, joints, angles):
+        """Returns the pairs with the sub-step of each one in its command.
+
+        The 'm' moves the joints in sequence, so the n-th pair of a joint in a command is at the n-th sub-step.
+        The 'i' moves them simultaneously, so only the last pair of a joint is kept at the first sub-step.
+        """
+        # Sorted by the command and the joint, the pairs in the order of the command.
+        order = np.lexsort((np.arange(len(owners)), joints, owners))
+        owners, joints, angles = owners[order], joints[order], angles[order]
+
+        starts = np.ones(len(owners), dtype=bool)
+        starts[1:] = (owners[1:] != owners[:-1]) | (joints[1:] != joints[:-1])
+        ends = np.append(starts[1:], True)
+        group_starts = np.maximum.accumulate(np.where(starts, np.arange(len(owners)), 0))
+        steps = np.arange(len(owners)) - group_starts
+
+        sequential = np.array([cmd[:1] == 'm' for cmd in cmds], dtype=bool)[owners]
+        keep = sequential | ends
+        steps = np.where(sequential, steps, 0)
+        return owners[keep], joints[keep], angles[keep], steps[keep]
+
+    def replay_pack(self, command_pack):
+        """Replay the commands of the CommandPack."""
+        return self.replay((item['cmd'], item['duration']) for item in command_pack.items)
+
+    def replay_scenario(self, scenario):
+        """Replay the frames of the Scenario (see 'modules.scenario')."""
+        return self.replay((frame.data.decode('utf-8'), frame.duration) for frame in scenario.frames)
+
+    def replay_library(self, library):
+        """Replay the all scenarios of the ScenarioLibrary.
+
+        Returns:
+            dict: Pairs of the scenario name and the Timeline.
+        """
+        return {scenario.name: self.replay_scenario(scenario) for scenario in library}
+
+    def __repr__(self) -> str:
+        return 'MotionPreview'
+
+
+if __name__ == '__main__':
+    pass
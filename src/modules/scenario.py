@@ -0,0 +1,195 @@
+import json
+import random
+import traceback
+import logging
+from typing import NamedTuple
+from modules.serial_agent import SerialAgent, CommandPack
+from modules.joint_validator import JointValidator
+
+
+class Frame(NamedTuple):
+    """A command encoded to send as it is.
+
+    Attributes:
+        data (bytes): The encoded command, empty if just sleep.
+        duration (int): Seconds of sleep time after sending the command.
+        continuous (bool): Whether the command is one of the CONTINUOUS_SKILLS.
+    """
+    data: bytes
+    duration: int
+    continuous: bool
+
+
+class Scenario(NamedTuple):
+    """A named sequence of the frames.
+
+    Attributes:
+        name (str):
+        frames (tuple): The Frame instances.
+    """
+    name: str
+    frames: tuple
+
+    @property
+    def duration(self):
+        """Seconds of the sleep time in total (before the min_act_duration is applied)."""
+        return sum(frame.duration for frame in self.frames)
+
+
+class ScenarioError(ValueError):
+    """The scenarios have invalid items.
+
+    Attributes:
+        errors (list): Messages of the all invalid items with their positions.
+    """
+
+    def __init__(self, errors) -> None:
+        self.errors = list(errors)
+        super().__init__(f'{len(self.errors)} invalid item(s) in the scenarios:\n' + '\n'.join(self.errors))
+
+
+class ScenarioLibrary:
+    """Scenarios compiled once and sent as they are.
+
+    All commands are validated when it's compiled (not skipped like the CommandPack),
+    including the joints and the angles of the joint commands (see 'JointValidator'),
+    and encoded into the immutable frames. So the loop of performing a scenario
+    is just writing the bytes and sleeping.
+
+    Examples:
+        library = ScenarioLibrary.load('resources/automate.json')
+        scenario = library.choice()
+        perform_scenario(agent, scenario)
+    """
+
+    def __init__(self, scenarios) -> None:
+        """Construct a new library.
+
+        Args:
+            scenarios (Iterable): The Scenario instances.
+        """
+        self.scenarios = tuple(scenarios)
+        self._by_name = {scenario.name: scenario for scenario in self.scenarios}
+
+    @classmethod
+    def load(cls, filepath: str, joint_validator: JointValidator = None):
+        """Compile the scenario file.
+
+        Args:
+            filepath (str): The json file of the scenarios (i.e. 'resources/automate.json')
+            joint_validator (JointValidator, optional): Defaults to the one with the default limits.
+
+        Raises:
+            FileNotFoundError:
+            ValueError: If the file is not a json.
+            ScenarioError: If any item is invalid.
+        """
+        try:
+            with open(filepath, 'r') as fp:
+                data = json.load(fp)
+        except ValueError:
+            logging.error('Fails to load json. (%s)', traceback.format_exc())
+            raise
+
+        return cls.compile(data, joint_validator)
+
+    @classmethod
+    def compile(cls, data, joint_validator: JointValidator = None):
+        """Validate and encode the scenarios.
+
+        Args:
+            data (list): i.e) [{'name': 'sit', 'commands': [{'cmd': 'ksit', 'duration': 5}]}]
+            joint_validator (JointValidator, optional): Defaults to the one with the default limits.
+
+        Raises:
+            ScenarioError: If any item is invalid, with the all errors.
+        """
+        if type(data) is not list:
+            raise ScenarioError(['The scenarios must be a list.'])
+
+        # Only for the validation rules.
+        validator = CommandPack()
+        joint_validator = joint_validator or JointValidator()
+
+        scenarios = []
+        errors = []
+        # The joint commands are validated all at once, with the positions to report.
+        joint_commands = []
+        joint_positions = []
+        for i, item in enumerate(data):
+            if type(item) is not dict:
+                errors.append(f'[{i}] The scenario must be a dict ({item!r}).')
+                continue
+
+            name = item.get('name', f'#{i}')
+            commands = item.get('commands')
+            if type(commands) is not list or not commands:
+                errors.append(f"[{i}] '{name}': The commands must be a non-empty list.")
+                continue
+
+            frames = []
+            for j, command in enumerate(commands):
+                if type(command) is not dict:
+                    errors.append(f"[{i}] '{name}' command {j}: The command must be a dict ({command!r}).")
+                    continue
+
+                cmd = command.get('cmd', '')
+                duration = command.get('duration', 0)
+                if not validator.is_valid_cmd(cmd):
+                    errors.append(f"[{i}] '{name}' command {j}: Invalid cmd ({cmd!r}).")
+                    continue
+                if type(duration) is bool or not validator.is_valid_duration(duration):
+                    errors.append(f"[{i}] '{name}' command {j}: Invalid duration ({duration!r}).")
+                    continue
+
+                if joint_validator.is_joint_command(cmd):
+                    joint_commands.append(cmd)
+                    joint_positions.append(f"[{i}] '{name}' command {j}")
+
+                frames.append(Frame(
+                    cmd.encode('utf-8'), int(duration), SerialAgent.is_continuous_skill(cmd)))
+
+            scenarios.append(Scenario(name, tuple(frames)))
+
+        for error in joint_validator.validate(joint_commands, joint_positions):
+            errors.append(f'{error.position}: {error.message} ({error.cmd!r})')
+
+        if errors:
+            raise ScenarioError(errors)
+
+        return cls(scenarios)
+
+    def names(self):
+        return [scenario.name for scenario in self.scenarios]
+
+    def choice(self, rng=random):
+        """Returns a scenario at random."""
+        return rng.choice(self.scenarios)
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def __iter__(self):
+        return iter(self.scenarios)
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def __repr__(self) -> str:
+        return f'ScenarioLibrary({len(self.scenarios)} scenarios)'
+
+
+def perform_scenario(agent, scenario: Scenario):
+    """Send the all frames of the scenario to the agent.
+
+    Returns:
+        bool: 'False' if any frame is not written.
+    """
+    written = True
+    for frame in scenario.frames:
+        written = agent.write_frame(*frame) and written
+    return written
+
+
+if __name__ == '__main__':
+    pass
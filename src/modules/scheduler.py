@@ -0,0 +1,98 @@
+import time
+import threading
+import logging
+
+
+class IntervalScheduler:
+    """Fires at the fixed interval on the monotonic clock, without drift.
+
+    The ticks are scheduled from the first one (t0 + n * interval), not from the end
+    of the work, so the time spent in the work never pushes the next tick back.
+    If the work overran the ticks, the missed ones are skipped (never fired in a burst),
+    and any two ticks are at least 'floor' seconds apart.
+
+    Examples:
+        scheduler = IntervalScheduler(180, floor=180)
+        while scheduler.wait(stop_event):
+            poll()
+    """
+
+    def __init__(self, interval: float, floor: float = 0, clock=time.monotonic) -> None:
+        """Construct a new scheduler.
+
+        Args:
+            interval (float): Seconds between the ticks, raised to the floor if it's less.
+            floor (float, optional): Min seconds between the ticks. Defaults to 0.
+            clock (Callable, optional): Monotonic clock in seconds. Defaults to time.monotonic.
+        """
+        if interval < floor:
+            logging.warning('The interval %ss is raised to the minimum %ss', interval, floor)
+
+        self.interval = max(interval, floor)
+        self.floor = floor
+        self._clock = clock
+
+        self.ticks = 0
+        self.skipped = 0
+        self.last_fired_at = None
+        self._next_at = None
+
+    def start(self, delay: float = 0):
+        """Schedule the first tick 'delay' seconds later (the 'wait' starts it if not yet)."""
+        self._next_at = self._clock() + delay
+
+    def time_until_next(self):
+        """Returns the seconds until the next tick (0 if due)."""
+        if self._next_at is None:
+            return 0
+        return max(0, self._next_at - self._clock())
+
+    def wait(self, stop_event: threading.Event = None):
+        """Block until the next tick.
+
+        Args:
+            stop_event (threading.Event, optional): Interrupts the waiting when it's set.
+
+        Returns:
+            bool: 'False' if interrupted by the stop_event.
+        """
+        if self._next_at is None:
+            self.start()
+
+        while True:
+            remaining = self._next_at - self._clock()
+            if remaining <= 0:
+                break
+            if stop_event is None:
+                time.sleep(remaining)
+            elif stop_event.wait(remaining):
+                return False
+
+        if stop_event is not None and stop_event.is_set():
+            return False
+
+        self._fire()
+        return True
+
+    def _fire(self):
+        now = self._clock()
+        self.ticks += 1
+        self.last_fired_at = now
+
+        next_at = self._next_at + self.interval
+        if next_at <= now:
+            # Overran, skip the missed ticks and keep on the grid.
+            missed = int((now - self._next_at) // self.interval)
+            self.skipped += missed
+            next_at = self._next_at + (missed + 1) * self.interval
+            logging.warning('Skipped %d tick(s) of the schedule', missed)
+
+        # Never closer than the floor to the actual tick, even if this one was late.
+        self._next_at = max(next_at, now + self.floor)
+
+    def __repr__(self) -> str:
+        return 'IntervalScheduler'
+
+
+if __name__ == '__main__':
+    pass
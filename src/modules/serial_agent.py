@@ -1,9 +1,13 @@
 import traceback
 import time
 import logging
-import re
 import json
+import threading
+from array import array
+from collections import deque
+from collections.abc import Sequence
 import serial
+from modules.metrics import AgentMetrics
 
 
 class SerialAgent:
@@ -12,21 +16,24 @@ class SerialAgent:
     # Baud rate
     BAUNDRATE = 115200
 
-    # The seconds of waiting for the board initialized
+    # The max seconds of waiting for the board initialized
     # when connect the serial port.
     START_UP_WAITING: int = 10
 
-    # The max number of loop count for receive buffer reads,
-    # to prevent port blocking.
-    # https://pyserial.readthedocs.io/en/latest/shortintro.html#readline
+    # The max number of lines held by the background reader thread.
     MAX_READABLE_LINE = 500
 
-    # Delay to down the reading receive buffer read speed.
+    # Seconds between polls of the receive buffer while waiting for a message,
+    # and of waiting while the port is closed in the background reader thread.
     REPEAT_READ_DELAY: float = 0.01
 
     # The min seconds of sleep time after sending a command.
     MIN_ACT_DURATION: int = 5
 
+    # Seconds before the deadline of a streamed frame to stop sleeping and spin,
+    # the sleep of the OS may overshoot by a millisecond or more.
+    SPIN_WAIT: float = 0.002
+
     # **Below messages are from the 'Bittle' on 'NyBoard_V1_0'**
     BOARD_INIT_MESSAGES = (
         # * Start *
@@ -45,12 +52,30 @@ class SerialAgent:
         'wrong key!',
     )
 
+    # Skills which keep moving until the next command (i.e. gaits),
+    # the board acknowledges them at the start of the motion.
+    # The direction suffix (F, L, R) is ignored, i.e. 'kwkF' is 'wk'.
+    CONTINUOUS_SKILLS = (
+        'bd', 'bk', 'cr', 'ly', 'rn', 'tr', 'vt', 'wk',
+    )
+
     def __init__(self, port, serial_api=None, **kwargs) -> None:
         """Set or create serial api instance.
 
         Args:
             port (str): name of the target port 
             serial_api (Any, optional): Instance of serial api class. Defaults to PySerial.
+            kwargs: Arbitrary keyword arguments.
+                - min_act_duration (int): The min seconds of sleep time after sending a command.
+                - start_up_waiting (int): The max seconds of waiting for the board initialized.
+                  Defaults to START_UP_WAITING.
+                - reader_thread (bool): Receive on a background thread. Defaults to False.
+                - read_buffer_size (int): Max lines held by the reader thread. Defaults to MAX_READABLE_LINE.
+                - ack_pacing (bool): Go to the next command as soon as the board
+                  acknowledges the current one. Defaults to False.
+                - metrics (AgentMetrics): Instruments to record to. Defaults to a new one.
+                - posture_tracker (PostureTracker): Skip or shorten the commands which don't change
+                  the posture (see 'modules.posture'). Defaults to None (always send).
 
         See also:
             https://pyserial.readthedocs.io/en/latest/index.html
@@ -58,8 +83,14 @@ class SerialAgent:
 
         self.min_act_duration = kwargs.get(
             'min_act_duration', self.MIN_ACT_DURATION)
+        self.start_up_waiting = kwargs.get(
+            'start_up_waiting', self.START_UP_WAITING)
+        self.ack_pacing = kwargs.get('ack_pacing', False)
+        self.metrics = kwargs.get('metrics') or AgentMetrics()
+        self.posture_tracker = kwargs.get('posture_tracker')
 
         self.is_board_ready = False
+        self._has_error = False
 
         if serial_api is None:
             self._ser = serial.Serial(
@@ -73,10 +104,16 @@ class SerialAgent:
         else:
             self._ser = serial_api
 
-        time.sleep(self.START_UP_WAITING)
+        self._rx = LineBuffer()
+        self._reader = None
+        if kwargs.get('reader_thread', False):
+            self.start_reader(kwargs.get('read_buffer_size', self.MAX_READABLE_LINE))
 
         if (not self._ser.is_open):
             logging.warning('Port [%s] is not opened.', port)
+            return
+
+        self.wait_until_ready()
 
     def open_port(self, attempt=1, retry_interval=5):
         """If the board is not ready, it will try to open and close the serial port.
@@ -97,13 +134,16 @@ class SerialAgent:
             try:
                 logging.debug(
                     'Try reopen port [%d/%d]', attempt_count, attempt)
+                started = time.perf_counter()
                 self.close_port()
                 self._ser.open()
+                self.metrics.inc('reconnects')
 
                 if attempt == 1:
-                    time.sleep(self.START_UP_WAITING)
+                    self.wait_until_ready()
                 else:
-                    time.sleep(retry_interval)
+                    self.wait_until_ready(retry_interval)
+                self.metrics.observe('reopen', time.perf_counter() - started)
             except:
                 logging.error('Fails to open port (%s)',
                               traceback.format_exc())
@@ -124,6 +164,13 @@ class SerialAgent:
             logging.debug('Port is already closed.')
             return True
 
+        # The board is reset when the port is opened again.
+        self.is_board_ready = False
+        self._rx.clear()
+        if self._reader is not None:
+            self._reader.clear()
+        self._reset_posture()
+
         self._ser.close()
         return self._ser.is_open
 
@@ -143,52 +190,239 @@ class SerialAgent:
 
             - If the duration is less then the minimum duration(default is 5sec), 
               it will be set to the default.
+
+            - With the 'ack_pacing', it returns as soon as the board acknowledges
+              the command and the duration is the upper bound of waiting.
+              Except for the CONTINUOUS_SKILLS which always take the duration.
+
+            - With the 'posture_tracker', the command which doesn't change the posture
+              is skipped or shortened (not sent), and counted as 'commands_collapsed'.
         """
-        if not self._ser.is_open:
-            self._ser.open()
-            time.sleep(self.START_UP_WAITING)
+        return self.write_frame(
+            str(cmd).encode('utf-8'), duration, continuous=self.is_continuous_skill(cmd))
+
+    def write_frame(self, frame: bytes, duration: int, continuous: bool = False):
+        """Send a pre-encoded command and sleep specified duration
+
+        Same as the 'write_command', but the command is already encoded,
+        i.e) the frames compiled from a scenario (see 'modules.scenario').
+
+        Args:
+            frame (bytes): Encoded **correct** command (if empty is just sleep)
+            duration (int): Seconds of sleep time after sending a command
+            continuous (bool, optional): Whether the command is one of the CONTINUOUS_SKILLS.
+
+        Returns:
+            bool:
+        """
+        self._reopen_if_closed()
+
+        if frame and self.posture_tracker is not None:
+            policy = self.posture_tracker.collapse(frame.decode('utf-8'))
+            if policy != self.posture_tracker.SEND:
+                self.metrics.inc('commands_collapsed')
+                logging.debug('Collapsed cmd[%r], policy[%s]', frame, policy)
+                # With the 'ack_pacing', the sent one would return at the acknowledgement.
+                if policy == self.posture_tracker.SHORTEN and not self.ack_pacing:
+                    started = time.perf_counter()
+                    time.sleep(duration)
+                    self.metrics.observe('wait', time.perf_counter() - started)
+                return True
 
         write_len = 0
-        if (cmd != '' and duration < self.min_act_duration):
+        if (frame and duration < self.min_act_duration):
             duration = self.min_act_duration
 
-        logging.debug('Act cmd[%s], duration[%d]', cmd, duration)
-        if cmd != '':
-            try:
-                write_len = self._ser.write(str(cmd).encode('utf-8'))
-            except:
-                logging.error(
-                    'Fails to write command cmd[%s] duration[%d] (%s)', cmd, duration, traceback.format_exc())
-                raise
-            else:
-                self._ser.flush()
+        logging.debug('Act cmd[%r], duration[%d]', frame, duration)
+        if frame:
+            if self.ack_pacing:
+                self._discard_pending()
+            write_len = self._write(frame)
 
-        time.sleep(duration)
-        return not cmd or write_len > 0
+        started = time.perf_counter()
+        if self.ack_pacing and frame and not continuous:
+            self._wait_for_ack(chr(frame[0]), duration)
+        else:
+            time.sleep(duration)
+        self.metrics.observe('wait', time.perf_counter() - started)
 
-    def read_port(self):
-        """Returns all in the receive buffer as a string list"""
+        return not frame or write_len > 0
 
-        if (not self._ser.is_open or self._ser.in_waiting == 0):
-            logging.debug(
-                'Nothing in input buffer (port is open ? [%s])',
-                self._ser.is_open)
-            return []
+    def send_frame(self, frame: bytes):
+        """Send a pre-encoded command without sleep
 
-        msg = []
-        repeat_counter = 0
-        while True:
-            time.sleep(self.REPEAT_READ_DELAY)
-            repeat_counter += 1
-            if (self._ser.in_waiting == 0 or repeat_counter > self.MAX_READABLE_LINE):
+        For the frames sent at a fixed rate (i.e. a trajectory, see 'modules.trajectory'),
+        the caller paces them. Neither the 'min_act_duration' nor the 'ack_pacing' is applied.
+
+        Args:
+            frame (bytes): Encoded **correct** command
+
+        Returns:
+            bool:
+        """
+        self._reopen_if_closed()
+        return self._write(frame) > 0
+
+    def stream_frames(self, frames, hz: float, **kwargs):
+        """Send the frames at the fixed frequency, on the deadlines of the monotonic clock
+
+        The n-th frame is due at 'started + n / hz', not at 'the previous one + 1 / hz',
+        so the lateness of a frame never accumulates (the following ones catch up to the schedule).
+        A frame sent after the deadline of the next one is counted as missed,
+        and dropped if the 'drop_late' (except the last frame, to reach the final state).
+
+        Args:
+            frames (Iterable): Encoded **correct** commands (bytes), the empty one just holds its period.
+            hz (float): Frames per second, i.e) 50 for the period of 20 msec.
+            kwargs: Arbitrary keyword arguments.
+                - drop_late (bool): Drop the missed frames instead of sending them late. Defaults to False.
+                - stop_event (threading.Event): Interrupts the streaming when it's set.
+                - clock (Callable): Monotonic clock in seconds. Defaults to time.monotonic.
+
+        Returns:
+            dict: i.e) {'hz': 50, 'frames': 100, 'sent': 97, 'missed': 2, 'dropped': 0, 'failed': 0,
+                        'jitter_mean': 0.0003, 'jitter_max': 0.021}
+                The jitter is the seconds of sending after the deadline, of the sent frames.
+
+        Notes:
+            - Neither the 'min_act_duration' nor the 'ack_pacing' is applied,
+              the frames should be the ones the board can act in the period.
+        """
+        if hz <= 0:
+            raise ValueError('The frequency must be positive.')
+
+        period = 1 / hz
+        drop_late = kwargs.get('drop_late', False)
+        stop_event = kwargs.get('stop_event')
+        clock = kwargs.get('clock', time.monotonic)
+
+        stats = {'hz': hz, 'frames': 0, 'sent': 0, 'missed': 0, 'dropped': 0, 'failed': 0}
+        jitter_sum = 0.0
+        jitter_max = 0.0
+
+        frames = iter(frames)
+        frame = next(frames, None)
+        started = clock()
+        n = 0
+        while frame is not None:
+            following = next(frames, None)
+            deadline = started + n * period
+            n += 1
+            if not self._wait_until(deadline, stop_event, clock):
                 break
 
-            buff = self._ser.readline()
-            if type(buff) == bytes:
-                msg.append(re.sub(
-                    '\n|\r\n', '', buff.decode('utf-8', 'ignore')))
-                # logging.debug('<<< %s', re.sub(
-                #    '\n|\r\n', '', buff.decode('utf-8', 'ignore')))
+            stats['frames'] += 1
+
+            lateness = clock() - deadline
+            if lateness >= period:
+                stats['missed'] += 1
+                self.metrics.inc('frames_missed')
+                if drop_late and following is not None:
+                    stats['dropped'] += 1
+                    frame = following
+                    continue
+
+            if frame:
+                self.metrics.observe('frame_lateness', lateness)
+                jitter_sum += lateness
+                jitter_max = max(jitter_max, lateness)
+                if self.send_frame(frame if type(frame) is bytes else str(frame).encode('utf-8')):
+                    stats['sent'] += 1
+                else:
+                    stats['failed'] += 1
+
+            frame = following
+
+        if stats['missed']:
+            logging.warning('Missed %d deadline(s) of %d frames at %.1fHz', stats['missed'], stats['frames'], hz)
+
+        sent = stats['sent'] + stats['failed']
+        stats['jitter_mean'] = jitter_sum / sent if sent else 0.0
+        stats['jitter_max'] = jitter_max
+        return stats
+
+    def serial_throughput(self):
+        """Returns the bytes per second measured by the writes so far.
+
+        Returns:
+            float: Defaults to the baud rate (10 bits per byte) if nothing has been written.
+        """
+        seconds = self.metrics.histograms['write'].sum + self.metrics.histograms['flush'].sum
+        written = self.metrics.counters['bytes_out'].value
+        if written <= 0 or seconds <= 0:
+            return self.BAUNDRATE / 10
+        return written / seconds
+
+    @classmethod
+    def is_continuous_skill(cls, cmd: str):
+        """Checks the command is one of the CONTINUOUS_SKILLS."""
+        return cmd.startswith('k') and cmd[1:].rstrip('FLR') in cls.CONTINUOUS_SKILLS
+
+    def is_ack(self, cmd: str, msg: str):
+        """Checks the message is the acknowledgement of the command.
+
+            **For the 'Bittle' on 'NyBoard_V1_0'**
+            The board echoes the token (first character of the command)
+            when it has finished the command.
+        """
+        return msg == cmd[0]
+
+    def start_reader(self, buffer_size=MAX_READABLE_LINE):
+        """Start the background thread that owns the receive side of the port.
+
+        Once started, the received lines are consumed from its buffer
+        by 'read_port', 'is_ready' and 'has_error_response'.
+
+        Args:
+            buffer_size (int, optional): Max number of lines to hold. Defaults to MAX_READABLE_LINE.
+        """
+        if self._reader is not None and self._reader.is_alive():
+            return
+
+        self._reader = PortReader(
+            self._ser, buffer_size, idle_wait=self.REPEAT_READ_DELAY, metrics=self.metrics)
+        self._reader.start()
+
+    def stop_reader(self):
+        """Stop the background reader thread if it is running."""
+        if self._reader is None:
+            return
+
+        self._reader.stop()
+        self._reader = None
+
+    def read_port(self):
+        """Returns all in the receive buffer as a string list
+
+            Reads everything waiting in one call, a partial trailing line
+            is kept until the rest of it arrives.
+        """
+
+        started = time.perf_counter()
+        if self._reader is not None:
+            msg = self._reader.drain()
+        else:
+            if (not self._ser.is_open or self._ser.in_waiting == 0):
+                logging.debug(
+                    'Nothing in input buffer (port is open ? [%s])',
+                    self._ser.is_open)
+                return []
+
+            buff = self._ser.read(self._ser.in_waiting)
+            if type(buff) != bytes:
+                return []
+
+            self.metrics.inc('bytes_in', len(buff))
+            msg = self._rx.feed(buff)
+
+        if msg:
+            self.metrics.observe('read_drain', time.perf_counter() - started)
+            self.metrics.inc('lines_read', len(msg))
+            board_errors = sum(1 for m in msg if m in self.BOARD_ERROR_MESSAGES)
+            self.metrics.inc('board_errors', board_errors)
+            if board_errors:
+                # The last command may not have been done.
+                self._reset_posture()
 
         return msg
 
@@ -207,26 +441,307 @@ class SerialAgent:
         self.is_board_ready = any(msg for msg in messages if msg in self.BOARD_INIT_MESSAGES)
         return self.is_board_ready
 
+    def wait_until_ready(self, timeout=None):
+        """Wait until the board sends one of the BOARD_INIT_MESSAGES.
+
+        Returns as soon as the message arrives instead of sleeping the worst case.
+
+        Args:
+            timeout (int, optional): Max seconds of waiting. Defaults to 'start_up_waiting'.
+
+        Returns:
+            bool: 'False' if timed out.
+        """
+        if not self._ser.is_open:
+            return False
+
+        if self.is_board_ready:
+            return True
+
+        if timeout is None:
+            timeout = self.start_up_waiting
+
+        started = time.monotonic()
+        matched = self._wait_for_line(
+            lambda msg: msg in self.BOARD_INIT_MESSAGES, timeout)
+        self.is_board_ready = matched is not None
+
+        logging.debug('Board ready [%s] in %.3fsec',
+                      self.is_board_ready, time.monotonic() - started)
+        return self.is_board_ready
+
     def has_error_response(self):
         """Return 'True' if the board buffer contains error msg."""
+        has_error = self._has_error
+        self._has_error = False
+
         messages = self.read_port()
         if len(messages) == 0:
-            return False
+            return has_error
         
-        return any(msg for msg in messages if msg in self.BOARD_ERROR_MESSAGES)
+        return has_error or any(msg for msg in messages if msg in self.BOARD_ERROR_MESSAGES)
+
+    def _reopen_if_closed(self):
+        if self._ser.is_open:
+            return
+
+        started = time.perf_counter()
+        self._ser.open()
+        self._reset_posture()
+        self.metrics.inc('reconnects')
+        self.wait_until_ready()
+        self.metrics.observe('reopen', time.perf_counter() - started)
+
+    def _wait_until(self, deadline, stop_event, clock):
+        """Sleep until the deadline, and spin for the last 'SPIN_WAIT' seconds.
+
+        Returns:
+            bool: 'False' if interrupted by the stop_event.
+        """
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return False
+
+            remaining = deadline - clock()
+            if remaining <= 0:
+                return True
+            if remaining > self.SPIN_WAIT:
+                if stop_event is None:
+                    time.sleep(remaining - self.SPIN_WAIT)
+                else:
+                    stop_event.wait(remaining - self.SPIN_WAIT)
+
+    def _write(self, frame: bytes):
+        """Write and flush the frame, returns the written length."""
+        try:
+            started = time.perf_counter()
+            write_len = self._ser.write(frame)
+            written = time.perf_counter()
+        except:
+            logging.error(
+                'Fails to write command cmd[%r] (%s)', frame, traceback.format_exc())
+            raise
+
+        self._ser.flush()
+        flushed = time.perf_counter()
+        self.metrics.observe('write', written - started)
+        self.metrics.observe('flush', flushed - written)
+        self.metrics.inc('bytes_out', write_len or 0)
+        if write_len and self.posture_tracker is not None:
+            self.posture_tracker.update(frame.decode('utf-8'))
+        return write_len or 0
+
+    def _reset_posture(self):
+        if self.posture_tracker is not None:
+            self.posture_tracker.reset()
+
+    def _discard_pending(self):
+        """Discard the received lines before a command.
+
+        The acknowledgements left behind (i.e. of the CONTINUOUS_SKILLS or a timed out command)
+        would be taken as the one of the next command with the same token.
+        """
+        if any(msg in self.BOARD_ERROR_MESSAGES for msg in self.read_port()):
+            # Keep it for the 'has_error_response'.
+            self._has_error = True
+
+    def _wait_for_ack(self, cmd, timeout):
+        """Wait for the acknowledgement or error message of the command.
+
+        Returns:
+            bool: 'False' if timed out.
+        """
+        started = time.monotonic()
+        msg = self._wait_for_line(
+            lambda msg: self.is_ack(cmd, msg) or msg in self.BOARD_ERROR_MESSAGES, timeout)
+
+        if msg in self.BOARD_ERROR_MESSAGES:
+            # Keep it for the 'has_error_response'.
+            self._has_error = True
+
+        logging.debug('Ack cmd[%s] response[%s] in %.3fsec',
+                      cmd, msg, time.monotonic() - started)
+        return msg is not None
+
+    def _wait_for_line(self, predicate, timeout):
+        """Consume the received lines until one of them matches the predicate.
+
+        Args:
+            predicate (Callable): Returns 'True' for the line to wait for.
+            timeout (float): Max seconds of waiting.
+
+        Returns:
+            str: The matched line, 'None' if timed out.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            for msg in self.read_port():
+                if predicate(msg):
+                    return msg
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            if self._reader is not None:
+                self._reader.wait(remaining)
+                continue
+
+            time.sleep(min(self.REPEAT_READ_DELAY, remaining))
 
     def __repr__(self) -> str:
         # default type is <class 'src.serial_agent.SerialAgent'>
         return 'SerialAgent'
 
 
+class PortReader(threading.Thread):
+    """Background thread that reads the serial port into a bounded line buffer."""
+
+    def __init__(self, ser, maxlen, idle_wait=0.01, metrics=None) -> None:
+        """Construct a new reader.
+
+        Args:
+            ser (Any): Instance of serial api class.
+            maxlen (int): Max number of lines to hold, the oldest line is dropped when exceeded.
+            idle_wait (float, optional): Seconds to wait while the port is closed. Defaults to 0.01.
+            metrics (AgentMetrics, optional): Instruments to count the bytes read.
+        """
+        super().__init__(name='PortReader', daemon=True)
+        self._ser = ser
+        self._metrics = metrics
+        self._idle_wait = idle_wait
+        self._lines = deque(maxlen=maxlen)
+        self._rx = LineBuffer()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+
+        self.dropped = 0
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if not self._ser.is_open:
+                self._stop_event.wait(self._idle_wait)
+                continue
+
+            try:
+                # Blocks until a byte arrives or the port timeout,
+                # then takes the rest of the waiting bytes at once.
+                buff = self._ser.read(max(1, self._ser.in_waiting))
+            except Exception:
+                # The port may be closed by other thread while reading.
+                logging.debug('Fails to read port (%s)', traceback.format_exc())
+                self._stop_event.wait(self._idle_wait)
+                continue
+
+            if type(buff) == bytes and len(buff) > 0:
+                if self._metrics is not None:
+                    self._metrics.inc('bytes_in', len(buff))
+                # Under the lock, not to be mixed up with the 'clear'.
+                with self._cond:
+                    self._push(self._rx.feed(buff))
+
+    def drain(self):
+        """Returns all buffered lines as a string list and clear them."""
+        with self._cond:
+            lines = list(self._lines)
+            self._lines.clear()
+        return lines
+
+    def clear(self):
+        """Discard the buffered lines and the partial line, i.e. when the board is reset."""
+        with self._cond:
+            self._lines.clear()
+            self._rx.clear()
+
+    def wait(self, timeout=None):
+        """Block until any line is buffered or timeout.
+
+        Returns:
+            bool: 'False' if timed out.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: len(self._lines) > 0 or self._stop_event.is_set(), timeout)
+
+    def stop(self, timeout=None):
+        """Stop the thread and wait until it exits."""
+        self._stop_event.set()
+        if hasattr(self._ser, 'cancel_read'):
+            try:
+                self._ser.cancel_read()
+            except Exception:
+                pass
+        self.join(timeout)
+
+    def _push(self, lines):
+        with self._cond:
+            overflow = len(self._lines) + len(lines) - self._lines.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+            self._lines.extend(lines)
+            self._cond.notify_all()
+
+
+class LineBuffer:
+    """Splits received bytes into lines, keeping a partial trailing line."""
+
+    def __init__(self) -> None:
+        self._buff = bytearray()
+
+    def feed(self, data):
+        """Append received bytes and returns the completed lines as a string list.
+
+        Args:
+            data (bytes): Received bytes.
+
+        Returns:
+            list: Decoded lines without the line terminator ('\\n' or '\\r\\n').
+        """
+        self._buff += data
+
+        lines = []
+        start = 0
+        with memoryview(self._buff) as view:
+            while True:
+                end = self._buff.find(b'\n', start)
+                if end < 0:
+                    break
+
+                stop = end
+                if stop > start and self._buff[stop - 1] == 0x0D:
+                    stop -= 1
+
+                lines.append(str(view[start:stop], 'utf-8', 'ignore'))
+                start = end + 1
+
+        if start > 0:
+            del self._buff[:start]
+
+        return lines
+
+    def clear(self):
+        """Discard the partial line."""
+        self._buff.clear()
+
+
 class CommandPack():
-    """Model class for the 'Petoi' command."""
+    """Model class for the 'Petoi' command.
+
+    The commands are held compactly, not as a dict per command.
+    The encoded commands are concatenated in a buffer with their end offsets,
+    and the durations are in an array of unsigned short ('MAX_DURATION' fits in).
+    The 'items' is a read-only view of them as the list of dicts
+    i.e) [{'cmd': 'ksit', 'duration': 5}, ...]
+    """
+
+    __slots__ = ('_buf', '_ends', '_durations')
 
     MAX_DURATION = 300
 
     def __init__(self, data=None) -> None:
-        self.items = []
+        self._buf = bytearray()
+        self._ends = array('I')
+        self._durations = array('H')
 
         if data is None:
             return
@@ -243,6 +758,22 @@ class CommandPack():
         else:
             self._set_items(tmp.get('commandPack', []))
 
+    @property
+    def items(self):
+        """Read-only view of the commands as the dicts of 'cmd' and 'duration'."""
+        return CommandItems(self)
+
+    def frames(self):
+        """Yields the pairs of the encoded command and the duration, without decoding.
+
+        i.e) for frame, duration in command_pack.frames(): agent.write_frame(frame, duration)
+        """
+        buf = self._buf
+        start = 0
+        for end, duration in zip(self._ends, self._durations):
+            yield bytes(buf[start:end]), duration
+            start = end
+
     def set_item(self, cmd, duration):
         """Validate parameter and append to the list."""
         if not self.is_valid_cmd(cmd):
@@ -250,7 +781,7 @@ class CommandPack():
         if not self.is_valid_duration(duration):
             return False
 
-        self.items.append({'cmd': cmd, 'duration': int(duration)})
+        self._append(cmd, int(duration))
         return True
 
     def is_valid_cmd(self, cmd):
@@ -275,7 +806,7 @@ class CommandPack():
         """
         try:
             duration = int(duration)
-        except ValueError:
+        except (ValueError, TypeError):
             logging.debug("Duration must be an integer value (%r).", duration)
             return False
 
@@ -288,7 +819,18 @@ class CommandPack():
 
     def clear_items(self):
         """Clear the command list"""
-        self.items = []
+        self._buf = bytearray()
+        self._ends = array('I')
+        self._durations = array('H')
+
+    def _append(self, cmd: str, duration: int):
+        self._buf += cmd.encode('utf-8')
+        self._ends.append(len(self._buf))
+        self._durations.append(duration)
+
+    def _get(self, index: int):
+        start = self._ends[index - 1] if index > 0 else 0
+        return self._buf[start:self._ends[index]].decode('utf-8'), self._durations[index]
 
     def _set_items(self, src_items):
         """Append valid command dict to the list.
@@ -313,18 +855,68 @@ class CommandPack():
             if not self.is_valid_cmd(cmd):
                 continue
 
-            self.items.append({'cmd': cmd, 'duration': int(duration)})
+            self._append(cmd, int(duration))
 
     def __repr__(self) -> str:
-        if len(self.items) == 0:
+        if len(self._durations) == 0:
             return 'Empty'
 
         return '\n'.join([f"cmd:{item['cmd']}, duration:{item['duration']}" for item in self.items])
 
 
-def make_serial_agent(port):
-    """Create a SerialAgent instance and try to open it with the board ready"""
-    agent = SerialAgent(port, min_act_duration=1)
+class CommandItems(Sequence):
+    """Read-only list-like view of the commands of a CommandPack.
+
+    Each item is a new dict i.e) {'cmd': 'ksit', 'duration': 5},
+    changing it doesn't change the CommandPack (use 'set_item' and 'clear_items').
+    """
+
+    __slots__ = ('_pack',)
+
+    def __init__(self, pack: CommandPack) -> None:
+        self._pack = pack
+
+    def __len__(self):
+        return len(self._pack._durations)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('CommandItems index out of range')
+
+        cmd, duration = self._pack._get(index)
+        return {'cmd': cmd, 'duration': duration}
+
+    def __iter__(self):
+        for frame, duration in self._pack.frames():
+            yield {'cmd': frame.decode('utf-8'), 'duration': duration}
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, CommandItems)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+# The min seconds of sleep time after sending a command, of the agents for the entry points.
+AGENT_MIN_ACT_DURATION: int = 1
+
+
+def make_serial_agent(port, **kwargs):
+    """Create a SerialAgent instance and try to open it with the board ready
+
+    Args:
+        port (str): name of the target port
+        kwargs: Arbitrary keyword arguments for the SerialAgent.
+            The 'min_act_duration' defaults to AGENT_MIN_ACT_DURATION.
+    """
+    agent = SerialAgent(port, **{'min_act_duration': AGENT_MIN_ACT_DURATION, **kwargs})
 
     if not agent.is_ready():
         logging.info(
@@ -343,6 +935,7 @@ def terminate_serial_agent(agent, act_down=True):
         agent.write_command('d', 3)
 
     agent.read_port()
+    agent.stop_reader()
     agent.close_port()
 
 
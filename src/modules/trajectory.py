@@ -0,0 +1,224 @@
+import logging
+from typing import NamedTuple
+import numpy as np
+
+
+class Keyframe(NamedTuple):
+    """Angles of the joints at a time.
+
+    Attributes:
+        time (float): Seconds from the start of the trajectory.
+        angles (dict): Pairs of the joint index and the degrees, i.e) {8: 30, 9: -30}
+    """
+    time: float
+    angles: dict
+
+
+class Trajectory:
+    """Smooth motion of the joints interpolated between the keyframes.
+
+    The angles of the all frames are computed at once as an array of (frames x joints),
+    and encoded into the joint commands to stream at the fixed rate (see 'play').
+
+    Profiles:
+        - linear: Constant velocity between the keyframes (the velocity jumps at each keyframe).
+        - cubic: Cubic Hermite spline through the keyframes (Catmull-Rom),
+          the velocity is continuous and zero at the first and the last keyframes.
+        - min-jerk: Minimum jerk between the keyframes,
+          the velocity and the acceleration are zero at each keyframe.
+
+    Examples:
+        trajectory = Trajectory([
+            Keyframe(0, {8: 0, 9: 0}),
+            Keyframe(0.5, {8: 45}),
+            Keyframe(1.0, {8: 0, 9: 30}),
+        ], profile='min-jerk')
+        play(agent, trajectory, rate=20)
+
+    Notes:
+        - A joint missing in a keyframe holds the previous angle
+          (or the first specified one before it).
+    """
+
+    PROFILE_LINEAR = 'linear'
+
+    PROFILE_CUBIC = 'cubic'
+
+    PROFILE_MIN_JERK = 'min-jerk'
+
+    PROFILES = (PROFILE_LINEAR, PROFILE_CUBIC, PROFILE_MIN_JERK)
+
+    # Token of the encoded frames, moves the joints simultaneously.
+    TOKEN = 'i'
+
+    def __init__(self, keyframes, profile: str = PROFILE_MIN_JERK) -> None:
+        """Construct a new trajectory.
+
+        Args:
+            keyframes (Iterable): The Keyframe instances (or pairs of time and angles), at least one.
+            profile (str, optional): 'linear', 'cubic' or 'min-jerk'. Defaults to 'min-jerk'.
+
+        Raises:
+            ValueError: If the profile is unknown, the keyframes are empty or the times don't increase.
+        """
+        if profile not in self.PROFILES:
+            raise ValueError(f'Unknown profile [{profile}]')
+
+        keyframes = [Keyframe(float(time), dict(angles)) for time, angles in keyframes]
+        if not keyframes:
+            raise ValueError('The keyframes are empty.')
+
+        self.profile = profile
+        self.times = np.array([keyframe.time for keyframe in keyframes])
+        if np.any(np.diff(self.times) <= 0):
+            raise ValueError('The times of the keyframes must be increasing.')
+
+        self.joints = np.array(sorted({joint for keyframe in keyframes for joint in keyframe.angles}), dtype=int)
+        # Angles of the keyframes x joints, the missing ones hold the previous angle.
+        self.angles = np.full((len(keyframes), len(self.joints)), np.nan)
+        for i, keyframe in enumerate(keyframes):
+            for joint, angle in keyframe.angles.items():
+                self.angles[i, np.searchsorted(self.joints, joint)] = angle
+        self._fill_holds()
+
+    @property
+    def duration(self):
+        return float(self.times[-1] - self.times[0])
+
+    def sample(self, rate: float):
+        """Interpolate the angles at the fixed rate.
+
+        Args:
+            rate (float): Frames per second.
+
+        Returns:
+            tuple: The times (frames) and the angles (frames x joints), both are numpy arrays.
+                The last frame is at the last keyframe.
+        """
+        if rate <= 0:
+            raise ValueError('The rate must be positive.')
+
+        count = int(np.floor(self.duration * rate + 1e-9)) + 1
+        times = self.times[0] + np.arange(count) / rate
+        if times[-1] < self.times[-1]:
+            times = np.append(times, self.times[-1])
+
+        if len(self.times) == 1:
+            return times, np.repeat(self.angles, len(times), axis=0)
+
+        # Segment of each frame, and the position in it (0 to 1).
+        segments = np.clip(np.searchsorted(self.times, times, side='right') - 1, 0, len(self.times) - 2)
+        spans = self.times[segments + 1] - self.times[segments]
+        u = ((times - self.times[segments]) / spans)[:, None]
+        start = self.angles[segments]
+        end = self.angles[segments + 1]
+
+        if self.profile == self.PROFILE_LINEAR:
+            angles = start + (end - start) * u
+        elif self.profile == self.PROFILE_MIN_JERK:
+            angles = start + (end - start) * (u ** 3 * (10 - 15 * u + 6 * u ** 2))
+        else:
+            tangents = self._tangents()
+            h00 = 2 * u ** 3 - 3 * u ** 2 + 1
+            h10 = u ** 3 - 2 * u ** 2 + u
+            h01 = -2 * u ** 3 + 3 * u ** 2
+            h11 = u ** 3 - u ** 2
+            spans = spans[:, None]
+            angles = (h00 * start + h10 * spans * tangents[segments]
+                      + h01 * end + h11 * spans * tangents[segments + 1])
+
+        return times, angles
+
+    def frames(self, rate: float, changed_only: bool = True):
+        """Encode the interpolated angles into the joint commands.
+
+        Args:
+            rate (float): Frames per second.
+            changed_only (bool, optional): Only the joints whose (rounded) angle has changed
+                since the previous frame, the frame is empty if nothing has changed. Defaults to True.
+
+        Returns:
+            list: The encoded frames (bytes) at the rate, i.e) b'i8 30 9 -30'
+        """
+        _, angles = self.sample(rate)
+        angles = np.rint(angles).astype(int)
+
+        changed = np.ones(angles.shape, dtype=bool)
+        if changed_only:
+            changed[1:] = angles[1:] != angles[:-1]
+
+        frames = []
+        for row, mask in zip(angles, changed):
+            pairs = ' '.join(f'{joint} {angle}' for joint, angle in zip(self.joints[mask], row[mask]))
+            frames.append(f'{self.TOKEN}{pairs}'.encode('utf-8') if pairs else b'')
+        return frames
+
+    def _fill_holds(self):
+        """Fill the missing angles by the previous ones (or the first specified one)."""
+        for j in range(self.angles.shape[1]):
+            column = self.angles[:, j]
+            specified = np.flatnonzero(~np.isnan(column))
+            # Index of the last specified keyframe at or before each keyframe.
+            holds = specified[np.clip(np.searchsorted(specified, np.arange(len(column)), side='right') - 1, 0, None)]
+            self.angles[:, j] = column[holds]
+
+    def _tangents(self):
+        """Degrees per second at the keyframes (Catmull-Rom), zero at the both ends."""
+        tangents = np.zeros_like(self.angles)
+        if len(self.times) > 2:
+            tangents[1:-1] = ((self.angles[2:] - self.angles[:-2])
+                              / (self.times[2:] - self.times[:-2])[:, None])
+        return tangents
+
+    def __repr__(self) -> str:
+        return 'Trajectory'
+
+
+def max_frame_rate(agent, frames, utilization: float = 0.8):
+    """Returns the max frames per second which the serial port can carry.
+
+    Args:
+        agent (SerialAgent): Its measured throughput is used (see 'SerialAgent.serial_throughput').
+        frames (list): The encoded frames to send.
+        utilization (float, optional): Ratio of the throughput to use. Defaults to 0.8.
+    """
+    sizes = [len(frame) for frame in frames if frame]
+    if not sizes:
+        return float('inf')
+    return agent.serial_throughput() * utilization / max(sizes)
+
+
+def play(agent, trajectory, rate: float, stop_event=None):
+    """Send the frames of the trajectory at the fixed rate, limited by the throughput of the serial port.
+
+    The frames are streamed on the deadlines (see 'SerialAgent.stream_frames'),
+    and the late ones are dropped to keep the timing of the motion (the last one is always sent).
+
+    Args:
+        agent (SerialAgent):
+        trajectory (Trajectory): The frames are sampled at the rate actually used.
+        rate (float): Target frames per second.
+        stop_event (threading.Event, optional): Interrupts the playing when it's set.
+
+    Returns:
+        dict: The stats of the 'stream_frames' with the 'rate' actually used.
+
+    Notes:
+        - The limited rate is sampled again (not the frames of the target rate sent slowly),
+          so the motion takes the duration of the trajectory at any rate.
+    """
+    frames = trajectory.frames(rate)
+    limit = max_frame_rate(agent, frames)
+    if rate > limit:
+        logging.warning('The rate %.1f/s is limited to %.1f/s by the serial throughput.', rate, limit)
+    # A frame at the lower rate may carry more joints, so it's limited again until it fits.
+    while rate > limit:
+        rate = limit
+        frames = trajectory.frames(rate)
+        limit = max_frame_rate(agent, frames)
+
+    stats = agent.stream_frames(frames, rate, drop_late=True, stop_event=stop_event)
+    return {'rate': rate, **stats}
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,258 @@
+import os
+import re
+import fcntl
+import termios
+import struct
+import select
+import threading
+import traceback
+import logging
+
+
+class VirtualBittle:
+    """Emulator of the 'Bittle' on 'NyBoard_V1_0' on a pseudo-terminal.
+
+    It behaves like the board at the other end of the serial port,
+    so 'SerialAgent(port=VirtualBittle().port)' works unchanged without the hardware.
+
+    - Prints the boot sequence ending in 'DMP ready!' every time the port is opened.
+      (The board is reset when the port is opened.)
+      The opening is detected as the flush of the input buffer by the PySerial.
+    - Parses the 'k*', 'm*', 'i*' and 'd' commands and echoes the token
+      when the motion has finished, unknown skills reply 'wrong key!'.
+    - Simulates the throughput of the baud rate and the duration of the motions.
+
+    Examples:
+        with VirtualBittle(time_scale=0.1) as bittle:
+            agent = SerialAgent(port=bittle.port)
+
+    Notes:
+        - Only for the POSIX platforms.
+    """
+
+    BAUDRATE = 115200
+
+    # The seconds from the port opened until 'DMP ready!'.
+    BOOT_TIME: float = 2.0
+
+    BOOT_MESSAGES = (
+        '* Start *',
+        'Initialize I2C',
+        'Connect MPU6050',
+        'Test connection',
+        'MPU successful',
+        'Initialize DMP',
+        '1283 105 26 61',
+        'Enable DMP',
+        'Enable interrupt',
+        'DMP ready!',
+    )
+
+    ERROR_MESSAGE = 'wrong key!'
+
+    # The seconds of the motion for each token.
+    MOTION_DURATIONS = {
+        'k': 1.0,
+        'm': 0.3,
+        'i': 0.3,
+        'd': 1.0,
+    }
+
+    # The idle seconds after the last received byte to take as the end of a command.
+    # (Same as the timeout of the serial reading in the firmware.)
+    COMMAND_GAP: float = 0.005
+
+    POSTURES = (
+        'balance', 'buttUp', 'calib', 'dropped', 'lifted', 'rest', 'sit', 'str', 'zero',
+    )
+
+    BEHAVIORS = (
+        'ck', 'cmh', 'dg', 'fiv', 'gdb', 'hds', 'hi', 'hu', 'jy', 'pee', 'pu', 'pu1', 'rc', 'stp', 'ts',
+    )
+
+    # They keep moving until the next command, so acknowledged at the start.
+    GAITS = (
+        'bd', 'bk', 'cr', 'ly', 'rn', 'tr', 'vt', 'wk',
+    )
+
+    GAIT_DIRECTIONS = ('', 'F', 'L', 'R')
+
+    JOINTS = 16
+
+    def __init__(self, **kwargs) -> None:
+        """Open a pseudo-terminal pair.
+
+        Args:
+            kwargs: Arbitrary keyword arguments.
+                - baudrate (int): Simulated baud rate. Defaults to BAUDRATE.
+                - boot_time (float): Seconds to boot. Defaults to BOOT_TIME.
+                - motion_durations (dict): Seconds of the motion per token. Defaults to MOTION_DURATIONS.
+                - time_scale (float): Multiplier of all the simulated seconds. Defaults to 1.
+        """
+        self.baudrate = kwargs.get('baudrate', self.BAUDRATE)
+        self.time_scale = kwargs.get('time_scale', 1.0)
+        self.boot_time = kwargs.get('boot_time', self.BOOT_TIME)
+        self.motion_durations = {
+            **self.MOTION_DURATIONS, **kwargs.get('motion_durations', {})}
+
+        self.received = []
+        self.posture = None
+        self.joints = [0] * self.JOINTS
+        self.boot_count = 0
+
+        self._master_fd, slave_fd = os.openpty()
+        self.port = os.ttyname(slave_fd)
+        # Not to hold the slave, to detect the port is closed.
+        os.close(slave_fd)
+
+        # Packet mode notifies the flush of the input buffer on the slave side.
+        fcntl.ioctl(self._master_fd, termios.TIOCPKT, struct.pack('i', 1))
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start emulating on a background thread."""
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run, name='VirtualBittle', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop emulating and close the pseudo-terminal."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        if self._master_fd is not None:
+            os.close(self._master_fd)
+            self._master_fd = None
+
+    def emit(self, *messages, throttle=True):
+        """Send the messages to the port as the board printed them.
+
+        Args:
+            messages (str): Lines to send.
+            throttle (bool, optional): Simulate the throughput of the baud rate. Defaults to True.
+        """
+        for msg in messages:
+            self._send(msg, throttle)
+
+    def is_known_skill(self, name: str):
+        """Checks the skill name (without the token 'k') is available."""
+        if name in self.POSTURES or name in self.BEHAVIORS:
+            return True
+
+        return any(name == f'{gait}{d}' for gait in self.GAITS for d in self.GAIT_DIRECTIONS)
+
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._master_fd, select.POLLIN | select.POLLPRI)
+
+        pending = bytearray()
+        while not self._stop_event.is_set():
+            events = poller.poll(self.COMMAND_GAP * 1000 if pending else 50)
+
+            if any(ev & select.POLLHUP for _, ev in events):
+                # The port is not opened.
+                pending.clear()
+                self._stop_event.wait(0.01)
+                continue
+
+            if any(ev & (select.POLLIN | select.POLLPRI) for _, ev in events):
+                try:
+                    packet = os.read(self._master_fd, 1024)
+                except OSError:
+                    continue
+
+                if packet[0] == termios.TIOCPKT_DATA:
+                    pending += packet[1:]
+                elif packet[0] & termios.TIOCPKT_FLUSHREAD:
+                    pending.clear()
+                    self._boot()
+                continue
+
+            if pending:
+                cmd = pending.decode('utf-8', 'ignore')
+                pending.clear()
+                self._handle(cmd)
+
+    def _boot(self):
+        """Print the boot sequence as the board reset."""
+        self.boot_count += 1
+        self.posture = None
+        interval = self.boot_time / len(self.BOOT_MESSAGES)
+        for msg in self.BOOT_MESSAGES:
+            self._sleep(interval)
+            self._send(msg)
+
+    def _handle(self, cmd: str):
+        """Act the command and reply to it."""
+        # Time of the command on the wire.
+        self._sleep(len(cmd) * 10 / self.baudrate, scaled=False)
+        if not cmd:
+            # Nothing but the invalid bytes.
+            logging.debug('VirtualBittle: <<< (ignored the undecodable bytes)')
+            return
+
+        self.received.append(cmd)
+        logging.debug('VirtualBittle: <<< %s', cmd)
+
+        token = cmd[0]
+        if token == 'k':
+            name = cmd[1:].strip()
+            if not self.is_known_skill(name):
+                self._send(self.ERROR_MESSAGE)
+                return
+
+            self.posture = name
+            if name.rstrip('FLR') not in self.GAITS:
+                self._sleep(self.motion_durations['k'])
+        elif token in ('m', 'i'):
+            values = re.findall(r'-?\d+', cmd[1:])
+            if len(values) % 2 != 0:
+                self._send(self.ERROR_MESSAGE)
+                return
+
+            for joint, angle in zip(values[0::2], values[1::2]):
+                if 0 <= int(joint) < self.JOINTS:
+                    self.joints[int(joint)] = int(angle)
+            self._sleep(self.motion_durations[token])
+        elif token == 'd':
+            self.posture = 'rest'
+            self._sleep(self.motion_durations['d'])
+
+        self._send(token)
+
+    def _send(self, msg: str, throttle=True):
+        data = f'{msg}\r\n'.encode('utf-8')
+        if throttle:
+            self._sleep(len(data) * 10 / self.baudrate, scaled=False)
+        try:
+            os.write(self._master_fd, data)
+        except OSError:
+            # The port has been closed.
+            logging.debug('VirtualBittle: fails to send (%s)', traceback.format_exc())
+
+    def _sleep(self, seconds, scaled=True):
+        if scaled:
+            seconds *= self.time_scale
+        if seconds > 0:
+            self._stop_event.wait(seconds)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    def __repr__(self) -> str:
+        return 'VirtualBittle'
+
+
+if __name__ == '__main__':
+    pass
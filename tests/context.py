@@ -31,6 +31,20 @@ def init_test_logger():
         level=TESTING_LOG_LEVEL
     )
 
+class FakeClock:
+    """Monotonic clock advanced by the sleeping, and by every reading if the step is set (for the spinning)."""
+
+    def __init__(self, now=0.0, step=0.0) -> None:
+        self.now = now
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0, seconds)
+
 def has_active_devenv():
     cp = subprocess.run(['which', 'docker'])
     if cp.returncode != 0:
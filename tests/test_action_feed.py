@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import threading
+import unittest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+from tests.context import *
+from modules.api_client import ApiClient
+from modules.action_feed import ActionFeed
+from modules.scheduler import IntervalScheduler
+from modules.pipeline import ActionPipeline
+
+
+def make_action(*cmds):
+    return json.dumps({'commandPack': [{'cmd': cmd, 'duration': 1} for cmd in cmds]})
+
+
+class ActionHandler(BaseHTTPRequestHandler):
+    """Stand-in of the action end point.
+
+    Each stream connection takes the next script of the server,
+    a script is a list of the raw chunks to send (then the stream is closed),
+    'hold' keeps the stream open until the server is shut down.
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+
+        if 'text/event-stream' not in self.headers.get('Accept', '') or server.mode == 'poll':
+            return self._send(200, 'application/json', make_action('ksit').encode('utf-8'))
+        if server.mode == 'unsupported':
+            return self._send(404, 'text/plain', b'Not Found')
+        if server.mode == 'long-poll':
+            return self._send(200, 'application/json', make_action('kbalance').encode('utf-8'))
+
+        script = server.scripts.pop(0) if server.scripts else []
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for chunk in script:
+            if chunk == 'hold':
+                server.stopped.wait(5)
+                break
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            time.sleep(0.01)
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestActionFeed(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def setUp(self) -> None:
+        # The stand-in is served over the plain http.
+        patcher = patch.dict(os.environ, {'OAUTHLIB_INSECURE_TRANSPORT': '1'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ActionHandler)
+        self.server.daemon_threads = True
+        self.server.mode = 'stream'
+        self.server.scripts = []
+        self.server.requests = []
+        self.server.stopped = threading.Event()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(self.server.stopped.set)
+
+        self.client = ApiClient(
+            'dummyclientid', 'dummysecret',
+            end_point_action=f'http://127.0.0.1:{self.server.server_address[1]}/action',
+            cache_dir=f'{os.path.dirname(os.path.abspath(__file__))}/tmp',
+            stream_read_timeout=5)
+        self.client._set_token({
+            'access_token': 'dummytoken', 'token_type': 'bearer', 'expires_at': time.time() + 3600})
+
+    def _event(self, id, *cmds):
+        return f'id: {id}\ndata: {make_action(*cmds)}\n\n'.encode('utf-8')
+
+    def test_stream_actions(self):
+        event = self._event(1, 'ksit', 'kbalance')
+        self.server.scripts = [[b': hello\n\n', event[:10], event[10:], b'retry: 2000\n\n']]
+
+        packs = list(self.client.stream_actions())
+
+        self.assertEqual(len(packs), 1)
+        self.assertEqual([item['cmd'] for item in packs[0].items], ['ksit', 'kbalance'])
+        self.assertEqual(self.client.last_event_id, '1')
+        self.assertEqual(self.client.stream_retry, 2.0)
+        self.assertEqual(self.server.requests[0]['Authorization'], 'Bearer dummytoken')
+
+    def test_stream_actions_resume(self):
+        self.server.scripts = [[self._event(1, 'ksit')], [self._event(2, 'krest')]]
+
+        list(self.client.stream_actions())
+        packs = list(self.client.stream_actions())
+
+        self.assertEqual(packs[0].items[0]['cmd'], 'krest')
+        self.assertNotIn('Last-Event-ID', self.server.requests[0])
+        self.assertEqual(self.server.requests[1]['Last-Event-ID'], '1')
+
+    def test_stream_actions_long_poll(self):
+        self.server.mode = 'long-poll'
+
+        packs = list(self.client.stream_actions())
+
+        self.assertEqual(len(packs), 1)
+        self.assertEqual(packs[0].items[0]['cmd'], 'kbalance')
+        self.assertFalse(self.client.stream_supported)
+
+    def test_stream_actions_not_supported(self):
+        self.server.mode = 'unsupported'
+
+        with self.assertRaises(requests.HTTPError):
+            list(self.client.stream_actions())
+
+    def test_feed_reconnects(self):
+        self.server.scripts = [
+            [self._event(1, 'ksit')],
+            [self._event(2, 'kbalance'), b'data: {broken\n\n', self._event(3, 'krest')],
+        ]
+        feed = ActionFeed(self.client, reconnect_delay=0.01)
+
+        received = []
+        for pack in feed.packs():
+            received.append(pack.items[0]['cmd'])
+            if len(received) == 3:
+                feed.stop()
+
+        self.assertEqual(received, ['ksit', 'kbalance', 'krest'])
+        self.assertEqual(self.server.requests[1]['Last-Event-ID'], '1')
+        self.assertGreaterEqual(feed.stats['reconnects'], 1)
+
+    def test_feed_falls_back_to_polling(self):
+        self.server.mode = 'unsupported'
+        feed = ActionFeed(self.client, interval=0.01, fallback_period=60)
+
+        packs = feed.packs()
+        pack = next(packs)
+        feed.stop()
+
+        self.assertEqual(pack.items[0]['cmd'], 'ksit')
+        self.assertEqual(feed.mode, ActionFeed.MODE_POLL)
+        self.assertEqual(feed.stats['fallbacks'], 1)
+        self.assertEqual(feed.stats['polls'], 1)
+
+    def test_feed_falls_back_on_json(self):
+        # The current action end point answers a JSON for the stream too.
+        self.server.mode = 'poll'
+        feed = ActionFeed(self.client, scheduler=IntervalScheduler(0.3, floor=0.3),
+                          reconnect_delay=0.01, fallback_period=60)
+
+        received = []
+        fetcher = threading.Thread(target=lambda: received.extend(feed.packs()), daemon=True)
+        fetcher.start()
+        time.sleep(1)
+        feed.stop()
+        fetcher.join(5)
+
+        # The stream once, then the polls on the schedule (not reconnected over and over).
+        self.assertEqual(feed.mode, ActionFeed.MODE_POLL)
+        self.assertEqual(feed.stats['fallbacks'], 1)
+        self.assertLessEqual(len(self.server.requests), 5)
+        self.assertEqual(len(received), len(self.server.requests))
+
+    def test_feed_retries_stream_after_fallback(self):
+        self.server.mode = 'unsupported'
+        feed = ActionFeed(self.client, interval=0.01, fallback_period=0)
+
+        packs = feed.packs()
+        next(packs)
+        self.server.mode = 'stream'
+        self.server.scripts = [[self._event(1, 'krest')]]
+        pack = next(packs)
+        feed.stop()
+
+        self.assertEqual(pack.items[0]['cmd'], 'krest')
+        self.assertEqual(feed.mode, ActionFeed.MODE_STREAM)
+
+    def test_pipeline_with_feed(self):
+        self.server.scripts = [[self._event(1, 'ksit'), 'hold']]
+        performed = threading.Event()
+        agent = unittest.mock.Mock()
+        agent.has_error_response.return_value = False
+        feed = ActionFeed(self.client, reconnect_delay=0.01)
+        pipeline = ActionPipeline(
+            self.client, agent, feed=feed, on_performed=lambda pack: performed.set())
+
+        pipeline.start()
+        self.assertTrue(performed.wait(5))
+        started = time.monotonic()
+        pipeline.stop(5)
+
+        agent.write_command.assert_called_once_with('ksit', 1)
+        self.assertFalse(pipeline.is_running())
+        self.assertLess(time.monotonic() - started, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
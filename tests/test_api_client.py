@@ -5,10 +5,12 @@ import datetime
 import os
 from pathlib import Path
 from random import randint
+import threading
 import unittest
 import requests
 from oauthlib.oauth2.rfc6749.errors import MissingTokenError, TokenExpiredError
 import requests_mock
+from unittest.mock import patch
 
 from tests.context import *
 from modules.api_client import ApiClient
@@ -54,6 +56,8 @@ class TestApiClient(unittest.TestCase):
     def tearDown(self) -> None:
         # clear tmp directory
         for file in os.listdir(self.TEST_CACHE_DIR):
+            if file == '.gitignore':
+                continue
             os.remove(f'{self.TEST_CACHE_DIR}/{file}')
 
         return super().tearDown()
@@ -82,7 +86,10 @@ class TestApiClient(unittest.TestCase):
             # Note: create empty file example
             # Path(f"{self.TEST_CACHE_DIR}/token.{dummy_date.timestamp()}").touch()
 
-        return [os.path.basename(x) for x in os.listdir(self.TEST_CACHE_DIR)]
+        return self._list_token_cache()
+
+    def _list_token_cache(self):
+        return [x for x in os.listdir(self.TEST_CACHE_DIR) if x.startswith('token.')]
 
     def _make_api_action_url(self):
         return f"{self.TEST_API_SETTINGS['end_point_action']}/{self.TEST_API_SETTINGS['client_id']}"
@@ -108,6 +115,67 @@ class TestApiClient(unittest.TestCase):
         self.assertIsInstance(res, CommandPack)
         self.assertTrue(len(res.items) == 0)
 
+    @requests_mock.Mocker()
+    def test_get_action_not_modified(self, req_mock):
+        client = self._get_authorized_client()
+        req_mock.get(self._make_api_action_url(), [
+            {'json': {'commandPack': [{'cmd': 'ksit', 'duration': 3}]},
+             'headers': {'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2026 07:28:00 GMT'}},
+            {'status_code': 304, 'headers': {'ETag': '"v1"'}},
+        ])
+
+        status1, res1 = client.get_action()
+        with patch('modules.api_client.CommandPack') as pack_mock:
+            status2, res2 = client.get_action()
+
+        self.assertEqual((status1, status2), (200, 304))
+        self.assertIs(res2, res1)
+        self.assertEqual(res2.items, [{'cmd': 'ksit', 'duration': 3}])
+        pack_mock.assert_not_called()
+
+        headers = req_mock.last_request.headers
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Wed, 21 Oct 2026 07:28:00 GMT')
+
+    @requests_mock.Mocker()
+    def test_get_action_without_validators(self, req_mock):
+        client = self._get_authorized_client()
+        req_mock.get(self._make_api_action_url(), json={})
+
+        client.get_action()
+        client.get_action()
+
+        self.assertNotIn('If-None-Match', req_mock.last_request.headers)
+        self.assertNotIn('If-Modified-Since', req_mock.last_request.headers)
+
+    @requests_mock.Mocker()
+    def test_get_action_changed(self, req_mock):
+        client = self._get_authorized_client()
+        req_mock.get(self._make_api_action_url(), [
+            {'json': {'commandPack': [{'cmd': 'ksit', 'duration': 3}]}, 'headers': {'ETag': '"v1"'}},
+            {'json': {'commandPack': [{'cmd': 'kbalance', 'duration': 5}]}, 'headers': {'ETag': '"v2"'}},
+            {'status_code': 304},
+        ])
+
+        client.get_action()
+        _, res2 = client.get_action()
+        _, res3 = client.get_action()
+
+        self.assertEqual(req_mock.last_request.headers['If-None-Match'], '"v2"')
+        self.assertIs(res3, res2)
+        self.assertEqual(res3.items, [{'cmd': 'kbalance', 'duration': 5}])
+
+    @requests_mock.Mocker()
+    def test_clear_action_cache(self, req_mock):
+        client = self._get_authorized_client()
+        req_mock.get(self._make_api_action_url(), json={}, headers={'ETag': '"v1"'})
+
+        client.get_action()
+        client.clear_action_cache()
+        client.get_action()
+
+        self.assertNotIn('If-None-Match', req_mock.last_request.headers)
+
     @requests_mock.Mocker()
     def test_get_action_with_expired_token(self, req_mock):
         client = self._get_authorized_client(**{'expires_in': 1})
@@ -139,7 +207,7 @@ class TestApiClient(unittest.TestCase):
         self.assertTrue(len(dummy_files) == 3)
 
         client.cleanup_cache_dir(leave_latest=False)
-        self.assertTrue(len(os.listdir(self.TEST_CACHE_DIR)) == 0)
+        self.assertTrue(len(self._list_token_cache()) == 0)
 
     def test_cleanup_cache_leave_latest(self):
         client = ApiClient(**self.TEST_API_SETTINGS)
@@ -161,7 +229,143 @@ class TestApiClient(unittest.TestCase):
         self.assertTrue(len(dummy_files) == 3)
 
         client.cleanup_cache_dir(leave_latest=True)
-        self.assertTrue(len(os.listdir(self.TEST_CACHE_DIR)) == 0)
+        self.assertTrue(len(self._list_token_cache()) == 0)
+
+    def test_cleanup_cache_ignores_other_files(self):
+        client = ApiClient(**self.TEST_API_SETTINGS)
+        dummy_files = self._generate_token_cache_mock(amount=1)
+
+        latest = client.cleanup_cache_dir(leave_latest=True)
+        self.assertIn(latest, dummy_files)
+        self.assertTrue(os.path.exists(f'{self.TEST_CACHE_DIR}/.gitignore'))
+
+    def test_load_cached_token_at_startup(self):
+        self._generate_token_cache_mock(amount=1)
+
+        client = ApiClient(**self.TEST_API_SETTINGS)
+        self.assertTrue(client.has_cached_token())
+        self.assertEqual(client._get_cached_token()['access_token'], self.MOCK_TOKEN_RESPONSE['access_token'])
+
+    @requests_mock.Mocker()
+    def test_get_action_does_not_read_cache_dir(self, req_mock):
+        client = self._get_authorized_client()
+        req_mock.get(self._make_api_action_url(), json={})
+
+        with patch('os.listdir') as listdir_mock, patch('builtins.open') as open_mock:
+            client.get_action()
+            client.get_action()
+
+        listdir_mock.assert_not_called()
+        open_mock.assert_not_called()
+
+    def test_cached_token_expired(self):
+        self._generate_token_cache_mock(amount=1)
+        client = ApiClient(**self.TEST_API_SETTINGS)
+
+        client._set_token({**self.MOCK_TOKEN_RESPONSE, 'expires_at': time.time() - 1})
+        self.assertFalse(client.has_cached_token())
+
+    def _mock_slow_token_end_point(self, req_mock, seconds=0.2, **response_token):
+        def respond(request, context):
+            time.sleep(seconds)
+            return {**self.MOCK_TOKEN_RESPONSE, **response_token}
+
+        return req_mock.post(self.TEST_API_SETTINGS.get('end_point_token'), json=respond)
+
+    @requests_mock.Mocker()
+    def test_refresh_token_single_flight(self, req_mock):
+        token_mock = self._mock_slow_token_end_point(req_mock)
+        client = ApiClient(**self.TEST_API_SETTINGS)
+
+        results = []
+        callers = [threading.Thread(target=lambda: results.append(client.refresh_token()))
+                   for _ in range(5)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+
+        self.assertEqual(token_mock.call_count, 1)
+        self.assertEqual(results, [True] * 5)
+
+    @requests_mock.Mocker()
+    def test_auto_refresh(self, req_mock):
+        token_mock = self._mock_slow_token_end_point(req_mock, seconds=0, expires_in=2)
+        client = ApiClient(**self.TEST_API_SETTINGS, refresh_margin=60)
+
+        client.start_auto_refresh()
+        self.addCleanup(client.stop_auto_refresh)
+
+        # Refreshed at the half of the lifetime (shorter than the margin).
+        deadline = time.monotonic() + 3
+        while token_mock.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self.assertEqual(token_mock.call_count, 2)
+        self.assertTrue(client.has_cached_token())
+
+    @requests_mock.Mocker()
+    def test_auto_refresh_without_expiry(self, req_mock):
+        token = {key: value for key, value in self.MOCK_TOKEN_RESPONSE.items() if key != 'expires_in'}
+        token_mock = req_mock.post(self.TEST_API_SETTINGS.get('end_point_token'), json=token)
+        client = ApiClient(**self.TEST_API_SETTINGS)
+
+        client.start_auto_refresh()
+        self.addCleanup(client.stop_auto_refresh)
+
+        deadline = time.monotonic() + 3
+        while token_mock.call_count < 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.3)
+
+        # Backs off until the REFRESH_RETRY_INTERVAL, not requests over and over.
+        self.assertEqual(token_mock.call_count, 1)
+        self.assertFalse(client.has_cached_token())
+
+    @requests_mock.Mocker()
+    def test_get_action_does_not_block_on_auto_refresh(self, req_mock):
+        # Note: The requests_mock serializes the requests, so stub the token request.
+        req_mock.get(self._make_api_action_url(), status_code=401, json={})
+        client = ApiClient(**self.TEST_API_SETTINGS)
+        client.fetch_token = lambda **kwargs: time.sleep(1)
+
+        client.start_auto_refresh()
+        self.addCleanup(client.stop_auto_refresh)
+
+        started = time.monotonic()
+        status, _ = client.get_action()
+        self.assertEqual(status, 401)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    @requests_mock.Mocker()
+    def test_get_action_retry(self, req_mock):
+        client = self._get_authorized_client()
+        client._retry.backoff_base = 0
+        req_mock.get(self._make_api_action_url(), [
+            {'exc': requests.exceptions.ConnectTimeout},
+            {'status_code': 503, 'json': {}},
+            {'status_code': 200, 'json': {}},
+        ])
+
+        status, _ = client.get_action()
+
+        self.assertEqual(status, 200)
+        self.assertEqual(client.last_request_stats.attempts, 3)
+        self.assertEqual(client.last_request_stats.status, 200)
+        self.assertEqual(req_mock.last_request.timeout, ApiClient.TIMEOUT)
+
+    @requests_mock.Mocker()
+    def test_fetch_token_retry(self, req_mock):
+        req_mock.post(self.TEST_API_SETTINGS.get('end_point_token'), [
+            {'exc': requests.exceptions.ConnectionError},
+            {'json': self.MOCK_TOKEN_RESPONSE},
+        ])
+        client = ApiClient(**self.TEST_API_SETTINGS, backoff_base=0)
+
+        client.fetch_token()
+
+        self.assertTrue(client.has_cached_token())
+        self.assertEqual(client.last_token_stats.attempts, 2)
 
     def test_fetch_token_use_external_end_point(self):
         if TestApiClient.SKIP_SYSTEM_TEST:
@@ -173,7 +377,7 @@ class TestApiClient(unittest.TestCase):
         # **Only for local self-signed certificate**
         client.fetch_token(**{'verify': False})
 
-        cached = os.listdir(self.TEST_CACHE_DIR)
+        cached = self._list_token_cache()
         self.assertEqual(len(cached), 1)
         with open(f'{self.TEST_CACHE_DIR}/{cached[0]}', 'r') as token_cache:
             logging.debug(token_cache.readlines())
@@ -0,0 +1,164 @@
+import os
+import asyncio
+import unittest
+
+from tests.context import *
+from modules.async_serial_agent import AsyncSerialAgent, make_async_serial_agent, terminate_async_serial_agent
+
+
+class TestAsyncSerialAgent(unittest.TestCase):
+    """Testing with a pseudo-terminal as the port of the board."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def setUp(self) -> None:
+        self.master_fd, slave_fd = os.openpty()
+        self.port = os.ttyname(slave_fd)
+        os.close(slave_fd)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        os.close(self.master_fd)
+        return super().tearDown()
+
+    def _board_send(self, *lines):
+        os.write(self.master_fd, b''.join(line.encode('utf-8') + b'\r\n' for line in lines))
+
+    def _board_receive(self):
+        return os.read(self.master_fd, 1024)
+
+    def test_create_instance(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port)
+            self.assertIsInstance(agent, AsyncSerialAgent)
+            self.assertFalse(agent.is_board_ready)
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_read_port(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port)
+            self._board_send('Initialize I2C', 'DMP ready!')
+            await asyncio.sleep(0.1)
+
+            self.assertEqual(await agent.read_port(), ['Initialize I2C', 'DMP ready!'])
+            self.assertEqual(await agent.read_port(), [])
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_wait_until_ready(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port)
+            asyncio.get_running_loop().call_later(0.05, self._board_send, 'DMP ready!')
+
+            self.assertTrue(await agent.wait_until_ready(2))
+            self.assertTrue(await agent.is_ready())
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_wait_until_ready_timeout(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port)
+            self._board_send('Initialize I2C')
+
+            self.assertFalse(await agent.wait_until_ready(0.1))
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_write_command(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port, min_act_duration=0)
+
+            self.assertTrue(await agent.write_command('ksit', 0.01))
+            self.assertEqual(self._board_receive(), b'ksit')
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_write_command_with_ack_pacing(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port, ack_pacing=True)
+            asyncio.get_running_loop().call_later(0.05, self._board_send, 'k')
+
+            started = asyncio.get_running_loop().time()
+            await agent.write_command('ksit', 10)
+            self.assertLess(asyncio.get_running_loop().time() - started, 1)
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_stale_ack_is_discarded(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port, ack_pacing=True, min_act_duration=0)
+            # Left behind by a timed out command, it isn't the one of the next command.
+            self._board_send('k')
+            await asyncio.sleep(0.1)
+
+            started = asyncio.get_running_loop().time()
+            await agent.write_command('ksit', 0.3)
+            self.assertGreaterEqual(asyncio.get_running_loop().time() - started, 0.3)
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_discard_keeps_error(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port, ack_pacing=True, min_act_duration=0)
+            self._board_send('wrong key!')
+            await asyncio.sleep(0.1)
+
+            await agent.write_command('ksit', 0.01)
+            self.assertTrue(await agent.has_error_response())
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_close_port_clears_lines(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port)
+            self._board_send('DMP ready!')
+            await asyncio.sleep(0.1)
+
+            await agent.close_port()
+            self.assertEqual(await agent.read_port(), [])
+            self.assertFalse(agent._received.is_set())
+
+        asyncio.run(run())
+
+    def test_has_error_response(self):
+        async def run():
+            agent = AsyncSerialAgent(self.port)
+            self._board_send('wrong key!')
+            await asyncio.sleep(0.1)
+
+            self.assertTrue(await agent.has_error_response())
+            self.assertFalse(await agent.has_error_response())
+            await agent.close_port()
+
+        asyncio.run(run())
+
+    def test_make_and_terminate_agent(self):
+        async def run():
+            asyncio.get_running_loop().call_later(0.05, self._board_send, 'DMP ready!')
+            agent = await make_async_serial_agent(self.port, start_up_waiting=2)
+            self.assertIsInstance(agent, AsyncSerialAgent)
+
+            agent.min_act_duration = 0
+            agent.ack_pacing = True
+            asyncio.get_running_loop().call_later(0.05, self._board_send, 'd')
+            await terminate_async_serial_agent(agent)
+            self.assertEqual(self._board_receive(), b'd')
+            self.assertFalse(agent._ser.is_open)
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
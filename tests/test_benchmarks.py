@@ -0,0 +1,85 @@
+import argparse
+import unittest
+from unittest.mock import Mock, patch
+
+from tests.context import *
+from benchmarks import bench_serial, bench_read_port, bench_api_load, bench_pack_memory
+from benchmarks.report import percentile, summarize
+from modules.serial_agent import CommandPack
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def _parse_args(self, module, *argv):
+        parser = argparse.ArgumentParser()
+        module.add_arguments(parser)
+        return parser.parse_args(argv)
+
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 50), 3)
+        self.assertEqual(percentile(values, 100), 5)
+        self.assertEqual(percentile(values, 25), 2)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize(self):
+        summary = summarize([0.001, 0.002, 0.003], scale=1000)
+        self.assertEqual(summary['count'], 3)
+        self.assertAlmostEqual(summary['p50'], 2)
+        self.assertAlmostEqual(summary['max'], 3)
+
+    def test_bench_serial(self):
+        args = self._parse_args(
+            bench_serial, '--commands', '5', '--burst-lines', '50', '--bursts', '2')
+        results = bench_serial.run(args)
+
+        self.assertEqual(results['commands']['latency_ms']['count'], 5)
+        self.assertGreater(results['commands']['per_second'], 0)
+        self.assertEqual(results['drain']['lines'], 50)
+
+    def test_bench_drain_timeout(self):
+        agent = Mock()
+        agent.read_port.return_value = []
+
+        with patch.object(bench_serial, 'DRAIN_TIMEOUT', 0.05):
+            with self.assertRaises(RuntimeError):
+                bench_serial.bench_drain(agent, Mock(), 10, 1)
+
+    def test_bench_read_port(self):
+        args = self._parse_args(bench_read_port, '--lines', '50', '--repeat', '2')
+        results = bench_read_port.run(args)
+
+        self.assertEqual(results['legacy']['lines'], 50)
+        self.assertEqual(results['bulk']['lines'], 50)
+
+    def test_bench_api_load(self):
+        args = self._parse_args(
+            bench_api_load, '--clients', '3', '--requests', '5', '--error-rate', '0.2', '--retries', '5')
+        results = bench_api_load.run(args)
+
+        self.assertEqual(results['requests'], 15)
+        self.assertEqual(results['latency_ms']['count'], 15)
+        self.assertEqual(results['server']['token_fetches'], 3)
+        self.assertEqual(results['statuses'].get('200', 0) + results['statuses'].get('304', 0), 15)
+
+    def test_bench_pack_memory(self):
+        args = self._parse_args(bench_pack_memory, '--commands', '500')
+        results = bench_pack_memory.run(args)
+
+        self.assertLess(results['compact']['retained_bytes'], results['legacy']['retained_bytes'])
+        self.assertGreater(results['reduction'], 1)
+
+    def test_legacy_command_pack(self):
+        payload = bench_pack_memory.make_payload(50)
+
+        self.assertEqual(bench_pack_memory.legacy_command_pack(payload), list(CommandPack(payload).items))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import io
+import json
+import unittest
+
+from tests.context import *
+from modules.serial_agent import CommandPack
+from modules.command_stream import CommandPackParser, iter_commands, load_command_pack
+
+
+class TestCommandStream(unittest.TestCase):
+
+    PAYLOAD = json.dumps({
+        'id': 'x[{"commandPack": []}]',
+        'meta': {'commandPack': [{'cmd': 'kignored', 'duration': 1}]},
+        'commandPack': [
+            {'cmd': 'ksit', 'duration': 3},
+            {'cmd': 'kbalance é', 'duration': 2, 'note': 'a } ] " \\'},
+            {'cmd': 5, 'duration': 1},
+            {'cmd': 'krest', 'duration': 'x'},
+            'ksit',
+            {'cmd': 'm0 30', 'duration': '4', 'extra': [{'a': [1, 2]}]},
+        ],
+        'after': [1, {'b': 2}],
+    }, ensure_ascii=False)
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def _feed_bytewise(self, parser, data: bytes):
+        items = []
+        for i in range(len(data)):
+            items += parser.feed(data[i:i+1])
+        parser.close()
+        return items
+
+    def test_same_items_as_command_pack(self):
+        expected = CommandPack(self.PAYLOAD).items
+
+        items = list(iter_commands([self.PAYLOAD]))
+
+        self.assertEqual(items, expected)
+        self.assertEqual([item['cmd'] for item in items], ['ksit', 'kbalance é', 'm0 30'])
+
+    def test_feed_in_pieces(self):
+        items = self._feed_bytewise(CommandPackParser(), self.PAYLOAD.encode('utf-8'))
+
+        self.assertEqual(items, CommandPack(self.PAYLOAD).items)
+
+    def test_yields_as_each_element_completes(self):
+        parser = CommandPackParser()
+
+        self.assertEqual(parser.feed('{"commandPack": [{"cmd": "ksit", "dur'), [])
+        self.assertEqual(parser.feed('ation": 3}, {"cmd"'), [{'cmd': 'ksit', 'duration': 3}])
+        self.assertEqual(parser.feed(': "krest"}]}'), [{'cmd': 'krest', 'duration': 0}])
+        parser.close()
+
+    def test_memory_is_bounded(self):
+        parser = CommandPackParser()
+        parser.feed('{"commandPack": [')
+        for _ in range(1000):
+            parser.feed('{"cmd": "ksit", "duration": 1},')
+            self.assertLess(len(parser._buf), 64)
+
+        with self.assertRaises(ValueError):
+            CommandPackParser(max_item_size=32).feed('{"commandPack": [{"cmd": "' + 'k' * 64)
+
+    def test_file_like(self):
+        pack = load_command_pack(io.BytesIO(self.PAYLOAD.encode('utf-8')), chunk_size=7)
+
+        self.assertEqual(pack.items, CommandPack(self.PAYLOAD).items)
+
+    def test_invalid_payload(self):
+        for payload in ('["ksit"]', '{"commandPack": [{"cmd": "ksit"}', '{"commandPack": []}}', '', '{} {}', '{} x', 'x {}'):
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValueError):
+                    list(iter_commands([payload]))
+                with self.assertRaises(ValueError):
+                    self._feed_bytewise(CommandPackParser(), payload.encode('utf-8'))
+
+    def test_no_command_pack(self):
+        self.assertEqual(list(iter_commands([b'{"error": "none"}'])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
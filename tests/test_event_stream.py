@@ -0,0 +1,60 @@
+import unittest
+
+from tests.context import *
+from modules.event_stream import EventStreamParser
+
+
+class TestEventStream(unittest.TestCase):
+
+    def _feed_bytewise(self, parser, data: bytes):
+        events = []
+        for i in range(len(data)):
+            events += parser.feed(data[i:i+1])
+        return events
+
+    def test_feed(self):
+        parser = EventStreamParser()
+
+        events = parser.feed(b'id: 1\nevent: action\ndata: {"a":\ndata: 1}\n\n: keep-alive\n\ndata: x\n\n')
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual((events[0].id, events[0].event, events[0].data), ('1', 'action', '{"a":\n1}'))
+        self.assertEqual((events[1].id, events[1].event, events[1].data), ('1', 'message', 'x'))
+
+    def test_feed_in_pieces(self):
+        stream = 'id: 7\r\ndata: ksit\r\n\r\ndata: kbalance é\r\rdata: krest\n\n'.encode('utf-8')
+
+        events = self._feed_bytewise(EventStreamParser(), stream)
+
+        self.assertEqual([e.data for e in events], ['ksit', 'kbalance é', 'krest'])
+
+    def test_incomplete_event(self):
+        parser = EventStreamParser()
+
+        self.assertEqual(parser.feed(b'id: 2\ndata: ksit\n'), [])
+        self.assertIsNone(parser.last_event_id)
+
+        parser.reset()
+        self.assertEqual(parser.feed(b'\n'), [])
+
+    def test_last_event_id(self):
+        parser = EventStreamParser(last_event_id='5')
+
+        self.assertEqual(parser.last_event_id, '5')
+        # An event without the data updates the id.
+        parser.feed(b'id: 6\n\n')
+        self.assertEqual(parser.last_event_id, '6')
+        # The id with NULL is ignored.
+        events = parser.feed(b'id: 7\x00\ndata: x\n\n')
+        self.assertEqual(events[0].id, '6')
+
+    def test_retry(self):
+        parser = EventStreamParser()
+
+        parser.feed(b'retry: 3000\n\nretry: soon\n\n')
+
+        self.assertEqual(parser.retry, 3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+
+from tests.context import *
+from modules.joint_validator import JointValidator
+from modules.gait import GaitParams, GaitTable, GaitGenerator
+
+
+class TestGait(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def test_foot_positions(self):
+        x, z = GaitGenerator().foot_positions(GaitParams(stride=40, lift=10, height=80, steps=4))
+
+        # Trot: the diagonal legs move together, the others a half cycle later.
+        np.testing.assert_allclose(x[:, 0], [20, 0, -20, 0])
+        np.testing.assert_allclose(z[:, 0], [80, 80, 80, 70])
+        np.testing.assert_allclose(x[:, 1], x[[2, 3, 0, 1], 0])
+        np.testing.assert_allclose(x[:, 2], x[:, 0])
+
+    def test_solve_ik(self):
+        generator = GaitGenerator()
+        x = np.array([0.0, 20.0, -20.0])
+        z = np.array([80.0, 75.0, 70.0])
+
+        shoulders, knees = generator.solve_ik(x, z)
+
+        # Forward kinematics of the solved angles reaches the positions.
+        s, k = np.radians(shoulders), np.radians(knees)
+        fx = generator.upper_leg * np.sin(s) + generator.lower_leg * np.sin(s - k)
+        fz = generator.upper_leg * np.cos(s) + generator.lower_leg * np.cos(s - k)
+        np.testing.assert_allclose(fx, x, atol=1e-9)
+        np.testing.assert_allclose(fz, z, atol=1e-9)
+
+        with self.assertRaises(ValueError):
+            generator.solve_ik(np.array([0.0]), np.array([100.0]))
+
+    def test_table(self):
+        table = GaitGenerator().table()
+
+        self.assertIsInstance(table, GaitTable)
+        self.assertEqual(table.angles.shape, (24, 8))
+        self.assertEqual(list(table.joints), [8, 9, 10, 11, 12, 13, 14, 15])
+        self.assertFalse(table.angles.flags.writeable)
+
+        frames = table.frames(cycles=2)
+        self.assertEqual(len(frames), 48)
+        self.assertEqual(frames[0], frames[24])
+        self.assertTrue(frames[0].startswith(b'i8 '))
+        self.assertEqual(JointValidator().validate(frame.decode() for frame in frames), [])
+
+        pack = table.command_pack(duration=1)
+        self.assertEqual(len(pack.items), 24)
+        self.assertEqual(pack.items[0], {'cmd': frames[0].decode(), 'duration': 1})
+
+    def test_invalid_params(self):
+        generator = GaitGenerator()
+
+        for kwargs in ({'steps': 0}, {'duty': 1}, {'phases': (0, 0.5)},
+                       {'height': 100}, {'stride': 40, 'lift': 15, 'height': 70}):
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    generator.table(**kwargs)
+
+    def test_cache(self):
+        generator = GaitGenerator(cache_size=2)
+
+        first = generator.table(stride=20)
+        self.assertIs(generator.table(GaitParams(stride=20)), first)
+        # Same parameters with the phases as a list.
+        self.assertIs(generator.table(stride=20, phases=[0, 0.5, 0, 0.5]), first)
+        self.assertEqual(generator.stats, {'hits': 2, 'misses': 1, 'evictions': 0})
+
+        generator.table(stride=25)
+        generator.table(stride=20)
+        generator.table(stride=30)
+        self.assertEqual(generator.stats['evictions'], 1)
+        # The least recently used one (stride=25) has been evicted.
+        self.assertIs(generator.table(stride=20), first)
+        generator.table(stride=25)
+        self.assertEqual(generator.stats['misses'], 4)
+
+        generator.clear_cache()
+        self.assertIsNot(generator.table(stride=20), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
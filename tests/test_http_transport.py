@@ -0,0 +1,111 @@
+import threading
+import unittest
+from unittest.mock import patch, Mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+from tests.context import *
+from modules.http_transport import RequestStats, RetryPolicy, mount_timed_adapter, recording
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpTransport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def _response(self, status_code, headers=None):
+        return Mock(status_code=status_code, headers=headers or {})
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=0.5)
+
+        for attempt, delay in ((1, 1), (2, 2), (3, 4), (4, 5), (10, 5)):
+            backoff = policy.backoff(attempt)
+            self.assertLessEqual(backoff, delay)
+            self.assertGreaterEqual(backoff, delay * 0.5)
+
+    @patch('time.sleep')
+    def test_retry_on_connection_error(self, sleep_mock):
+        request = Mock(side_effect=[requests.ConnectionError(), requests.Timeout(), self._response(200)])
+        stats = RequestStats()
+
+        res = RetryPolicy(attempts=3).call(request, stats)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(stats.attempts, 3)
+        self.assertEqual(sleep_mock.call_count, 2)
+
+    @patch('time.sleep')
+    def test_retry_exhausted(self, sleep_mock):
+        request = Mock(side_effect=requests.ConnectionError())
+
+        with self.assertRaises(requests.ConnectionError):
+            RetryPolicy(attempts=2).call(request)
+        self.assertEqual(request.call_count, 2)
+
+    @patch('time.sleep')
+    def test_retry_on_status(self, sleep_mock):
+        request = Mock(side_effect=[self._response(503, {'Retry-After': '3'}), self._response(404)])
+        stats = RequestStats()
+
+        res = RetryPolicy(attempts=3, backoff_base=0.1).call(request, stats)
+
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(stats.status, 404)
+        sleep_mock.assert_called_once_with(3)
+
+    @patch('time.sleep')
+    def test_no_retry_for_not_idempotent(self, sleep_mock):
+        request = Mock(side_effect=[self._response(503), self._response(200)])
+
+        res = RetryPolicy(attempts=3).call(request, idempotent=False)
+
+        self.assertEqual(res.status_code, 503)
+        sleep_mock.assert_not_called()
+
+    def test_timed_adapter_keep_alive(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://localhost:{server.server_address[1]}/action'
+
+        session = requests.Session()
+        mount_timed_adapter(session, pool_maxsize=2)
+
+        first = RequestStats()
+        with recording(first):
+            self.assertEqual(session.get(url, timeout=5).status_code, 200)
+
+        second = RequestStats()
+        with recording(second):
+            self.assertEqual(session.get(url, timeout=5).status_code, 200)
+
+        self.assertFalse(first.reused)
+        self.assertGreater(first.dns, 0)
+        self.assertGreater(first.connect, 0)
+        self.assertGreaterEqual(first.total, first.ttfb)
+        self.assertTrue(second.reused)
+        self.assertEqual(second.connect, 0)
+        self.assertIsNotNone(second.ttfb)
+
+
+if __name__ == '__main__':
+    unittest.main()
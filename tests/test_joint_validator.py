@@ -0,0 +1,76 @@
+import unittest
+
+from tests.context import *
+from modules.serial_agent import CommandPack
+from modules.joint_validator import JointValidator, JointError
+
+
+class TestJointValidator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def test_valid(self):
+        validator = JointValidator()
+
+        errors = validator.validate([
+            'm8 15 9 0 13 30 9 38', 'm0 45 0 -45 0 0', 'i 8 -90 15 90', 'ksit', 'd', 1,
+        ])
+
+        self.assertEqual(errors, [])
+
+    def test_reports_all_errors_in_order(self):
+        validator = JointValidator()
+
+        errors = validator.validate([
+            'ksit', 'm0 91', 'm8 30 9', 'm8 30', 'i 16 0 8 -91 1 0', 'mx 30', 'm',
+        ])
+
+        self.assertEqual([(e.position, e.cmd) for e in errors], [
+            (1, 'm0 91'),
+            (2, 'm8 30 9'),
+            (4, 'i 16 0 8 -91 1 0'),
+            (4, 'i 16 0 8 -91 1 0'),
+            (4, 'i 16 0 8 -91 1 0'),
+            (5, 'mx 30'),
+            (6, 'm'),
+        ])
+        self.assertEqual(errors[0].message, 'Angle 91 of the joint 0 is out of -90 to 90.')
+        self.assertEqual(errors[2].message, 'Unavailable joint (16).')
+        self.assertEqual(errors[3].message, 'Unavailable joint (1).')
+
+    def test_positions(self):
+        errors = JointValidator().validate(['m1 0', 'm8 0'], positions=['a', 'b'])
+
+        self.assertEqual(errors, [JointError('a', 'm1 0', 'Unavailable joint (1).')])
+
+    def test_limits(self):
+        validator = JointValidator({8: (-10, 10)})
+
+        errors = validator.validate(['m8 10', 'm8 -11', 'm0 0'])
+
+        self.assertEqual([e.position for e in errors], [1, 2])
+
+    def test_validate_pack(self):
+        pack = CommandPack([
+            {'cmd': 'm8 30', 'duration': 1},
+            {'cmd': 'm8 300', 'duration': 1},
+        ])
+
+        errors = JointValidator().validate_pack(pack)
+
+        self.assertEqual([(e.position, e.cmd) for e in errors], [(1, 'm8 300')])
+
+    def test_large_pack(self):
+        cmds = [f'm{8 + i % 8} {i % 181 - 90}' for i in range(100000)]
+        cmds[54321] = 'm8 99'
+
+        errors = JointValidator().validate(cmds)
+
+        self.assertEqual([e.position for e in errors], [54321])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import unittest
+
+from tests.context import *
+from modules.metrics import AgentMetrics, Histogram
+
+
+class TestMetrics(unittest.TestCase):
+
+    TEST_TMP_DIR = f"{os.path.dirname(os.path.abspath(__file__))}/tmp"
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def test_histogram_observe(self):
+        hist = Histogram('test', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            hist.observe(value)
+
+        self.assertEqual(hist.count, 4)
+        self.assertAlmostEqual(hist.sum, 2.65)
+        self.assertEqual(hist.cumulative_counts(), [(0.1, 2), (1.0, 3), (float('inf'), 4)])
+
+    def test_snapshot(self):
+        metrics = AgentMetrics()
+        metrics.inc('bytes_out', 4)
+        metrics.observe('write', 0.002)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['counters']['bytes_out'], 4)
+        self.assertEqual(snapshot['counters']['reconnects'], 0)
+        self.assertEqual(snapshot['histograms']['write']['count'], 1)
+        self.assertEqual(snapshot['histograms']['write']['buckets'][-1], [float('inf'), 1])
+
+    def test_add_counter(self):
+        metrics = AgentMetrics()
+        counter = metrics.add_counter('custom', 'Custom counter.')
+
+        self.assertIs(metrics.add_counter('custom'), counter)
+        metrics.inc('custom')
+        self.assertEqual(metrics.snapshot()['counters']['custom'], 1)
+
+    def test_to_prometheus(self):
+        metrics = AgentMetrics(prefix='test')
+        metrics.inc('lines_read', 3)
+        metrics.observe('flush', 0.003)
+
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE test_lines_read_total counter\ntest_lines_read_total 3\n', text)
+        self.assertIn('# TYPE test_flush_seconds histogram\n', text)
+        self.assertIn('test_flush_seconds_bucket{le="0.0025"} 0\n', text)
+        self.assertIn('test_flush_seconds_bucket{le="0.005"} 1\n', text)
+        self.assertIn('test_flush_seconds_bucket{le="+Inf"} 1\n', text)
+        self.assertIn('test_flush_seconds_count 1\n', text)
+
+    def test_dump_prometheus(self):
+        filepath = f'{self.TEST_TMP_DIR}/metrics.prom'
+        self.addCleanup(os.remove, filepath)
+
+        metrics = AgentMetrics()
+        metrics.dump_prometheus(filepath)
+
+        with open(filepath, 'r') as f:
+            self.assertEqual(f.read(), metrics.to_prometheus())
+        self.assertFalse(os.path.exists(f'{filepath}.tmp'))
+
+    def test_try_dump_prometheus(self):
+        filepath = f'{self.TEST_TMP_DIR}/metrics.prom'
+        self.addCleanup(os.remove, filepath)
+
+        metrics = AgentMetrics()
+        self.assertTrue(metrics.try_dump_prometheus(filepath))
+        self.assertTrue(os.path.exists(filepath))
+
+        # Not configured, or failed (not raised).
+        self.assertFalse(metrics.try_dump_prometheus(None))
+        self.assertFalse(metrics.try_dump_prometheus(f'{self.TEST_TMP_DIR}/not-found/metrics.prom'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+import requests
+
+from tests.context import *
+from modules.api_client import ApiClient
+from modules.mock_api_server import MockApiServer
+
+
+class TestMockApiServer(unittest.TestCase):
+
+    TEST_CACHE_DIR = f"{os.path.dirname(os.path.abspath(__file__))}/tmp"
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def setUp(self) -> None:
+        # The mock server is served over the plain http.
+        patcher = patch.dict(os.environ, {'OAUTHLIB_INSECURE_TRANSPORT': '1'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        for file in os.listdir(self.TEST_CACHE_DIR):
+            if file.startswith('token.'):
+                os.remove(f'{self.TEST_CACHE_DIR}/{file}')
+        return super().tearDown()
+
+    def _start_server(self, **kwargs):
+        server = MockApiServer(**kwargs)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _make_client(self, server, client_id='dummyclientid', client_secret='dummysecret', **kwargs):
+        return ApiClient(
+            client_id, client_secret,
+            end_point_token=server.end_point_token,
+            end_point_action=server.end_point_action,
+            cache_dir=self.TEST_CACHE_DIR, **kwargs)
+
+    def test_get_action(self):
+        server = self._start_server()
+        client = self._make_client(server)
+
+        client.fetch_token()
+        status1, res1 = client.get_action()
+        status2, res2 = client.get_action()
+
+        self.assertEqual((status1, status2), (200, 304))
+        self.assertEqual(res1.items, MockApiServer.DEFAULT_ACTION['commandPack'])
+        self.assertIs(res2, res1)
+        self.assertEqual(server.stats['token_requests'], 1)
+        self.assertEqual(server.stats['action_requests'], 2)
+        self.assertEqual(server.stats['statuses'], {200: 2, 304: 1})
+
+    def test_set_action(self):
+        server = self._start_server()
+        client = self._make_client(server)
+        client.fetch_token()
+        client.get_action()
+
+        server.set_action({'commandPack': [{'cmd': 'krest', 'duration': 1}]})
+        status, res = client.get_action()
+
+        self.assertEqual(status, 200)
+        self.assertEqual(res.items, [{'cmd': 'krest', 'duration': 1}])
+
+    def test_set_action_per_client(self):
+        server = self._start_server()
+        server.set_action({'commandPack': [{'cmd': 'krest', 'duration': 1}]}, client_id='other')
+        client = self._make_client(server)
+        other = self._make_client(server, client_id='other')
+        client.fetch_token(do_cache=False)
+        other.fetch_token(do_cache=False)
+
+        self.assertEqual(client.get_action()[1].items[0]['cmd'], 'ksit')
+        self.assertEqual(other.get_action()[1].items[0]['cmd'], 'krest')
+
+    def test_iter_action(self):
+        server = self._start_server()
+        client = self._make_client(server)
+        client.fetch_token()
+        commands = [{'cmd': f'm0 {i % 90}', 'duration': i % 5} for i in range(5000)]
+        server.set_action({'commandPack': commands})
+
+        self.assertEqual(list(client.iter_action()), commands)
+        # Not conditional, always downloaded in full.
+        self.assertEqual(len(list(client.iter_action())), len(commands))
+        self.assertEqual(server.stats['action_requests'], 2)
+
+        server.revoke_tokens()
+        with self.assertRaises(requests.HTTPError):
+            list(client.iter_action())
+
+    def test_unauthorized(self):
+        server = self._start_server()
+        client = self._make_client(server)
+        client.fetch_token()
+
+        server.revoke_tokens()
+        status, _ = client.get_action()
+
+        self.assertEqual(status, 401)
+
+    def test_invalid_client(self):
+        server = self._start_server(clients={'dummyclientid': 'secret'})
+        client = self._make_client(server, client_secret='wrong')
+
+        with self.assertRaises(Exception):
+            client.fetch_token()
+        self.assertEqual(server.stats['statuses'], {401: 1})
+
+    def test_errors(self):
+        server = self._start_server(error_rate=1, error_status=502)
+        client = self._make_client(server, retries=2, backoff_base=0)
+        client.fetch_token()
+
+        status, _ = client.get_action()
+
+        self.assertEqual(status, 502)
+        self.assertEqual(client.last_request_stats.attempts, 2)
+        self.assertEqual(server.stats['action_requests'], 2)
+
+    def test_not_modified_disabled(self):
+        server = self._start_server(not_modified=False)
+        client = self._make_client(server)
+        client.fetch_token()
+
+        client.get_action()
+        status, _ = client.get_action()
+
+        self.assertEqual(status, 200)
+
+    def test_latency(self):
+        server = self._start_server(latency=(0.05, 0.06))
+        client = self._make_client(server)
+        client.fetch_token()
+
+        client.get_action()
+
+        self.assertGreaterEqual(client.last_request_stats.total, 0.05)
+
+    def test_keep_alive(self):
+        server = self._start_server()
+        client = self._make_client(server)
+        client.fetch_token()
+
+        client.get_action()
+        client.get_action()
+
+        self.assertTrue(client.last_request_stats.reused)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import time
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from tests.context import *
+from modules.pipeline import ActionPipeline
+from modules.serial_agent import CommandPack
+
+
+def make_pack(*cmds):
+    return CommandPack([{'cmd': cmd, 'duration': 1} for cmd in cmds])
+
+
+class TestPipeline(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def _make_pipeline(self, responses=(), **kwargs):
+        client = Mock()
+        client.get_action.side_effect = list(responses)
+        agent = Mock()
+        agent.has_error_response.return_value = False
+        pipeline = ActionPipeline(client, agent, **kwargs)
+        self.addCleanup(pipeline.stop, 1)
+        return pipeline, client, agent
+
+    def test_unknown_drop_policy(self):
+        with self.assertRaises(ValueError):
+            ActionPipeline(Mock(), Mock(), drop_policy='random')
+
+    def test_fetch(self):
+        pipeline, _, _ = self._make_pipeline([
+            (200, make_pack('ksit')),
+            (304, make_pack('ksit')),
+            (200, CommandPack()),
+            (401, make_pack('ksit')),
+            Exception('connection refused'),
+        ], depth=5)
+
+        results = [pipeline.fetch() for _ in range(5)]
+
+        self.assertEqual(results, [True, True, False, False, False])
+        self.assertEqual(pipeline.qsize(), 2)
+        self.assertEqual(pipeline.stats['fetched'], 4)
+        self.assertEqual(pipeline.stats['fetch_errors'], 1)
+
+    def test_fetch_rejects_invalid_joints(self):
+        valid = make_pack('ksit', 'm8 30')
+        pipeline, _, _ = self._make_pipeline([
+            (200, valid),
+            (200, make_pack('ksit', 'm1 30', 'm8 91', 'm8 30')),
+            (200, make_pack('m1 30')),
+        ], depth=5)
+
+        results = [pipeline.fetch() for _ in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertIs(pipeline.take(0), valid)
+        self.assertEqual([item['cmd'] for item in pipeline.take(0).items], ['ksit', 'm8 30'])
+        self.assertEqual(pipeline.stats['rejected_commands'], 3)
+
+    def test_drop_oldest(self):
+        pipeline, _, _ = self._make_pipeline(depth=2)
+        packs = [make_pack('ksit'), make_pack('kbalance'), make_pack('krest')]
+
+        for pack in packs:
+            self.assertTrue(pipeline.put(pack))
+
+        self.assertIs(pipeline.take(0), packs[1])
+        self.assertIs(pipeline.take(0), packs[2])
+        self.assertEqual(pipeline.stats['dropped_full'], 1)
+
+    def test_drop_newest(self):
+        pipeline, _, _ = self._make_pipeline(depth=1, drop_policy='newest')
+        packs = [make_pack('ksit'), make_pack('kbalance')]
+
+        self.assertTrue(pipeline.put(packs[0]))
+        self.assertFalse(pipeline.put(packs[1]))
+
+        self.assertIs(pipeline.take(0), packs[0])
+        self.assertIsNone(pipeline.take(0))
+
+    def test_drop_stale(self):
+        pipeline, _, _ = self._make_pipeline(depth=2, ttl=10)
+        stale, fresh = make_pack('ksit'), make_pack('kbalance')
+
+        with patch('time.monotonic', return_value=100):
+            pipeline.put(stale)
+        with patch('time.monotonic', return_value=115):
+            pipeline.put(fresh)
+            self.assertIs(pipeline.take(0), fresh)
+
+        self.assertEqual(pipeline.stats['dropped_stale'], 1)
+
+    def test_take_timeout(self):
+        pipeline, _, _ = self._make_pipeline()
+
+        started = time.monotonic()
+        self.assertIsNone(pipeline.take(0.05))
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    def test_perform(self):
+        performed = []
+        pipeline, _, agent = self._make_pipeline(on_performed=performed.append)
+        pack = make_pack('ksit', 'kbalance')
+
+        pipeline.perform(pack)
+
+        self.assertEqual([c.args for c in agent.write_command.call_args_list],
+                         [('ksit', 1), ('kbalance', 1)])
+        self.assertEqual(performed, [pack])
+        self.assertEqual(pipeline.stats['performed'], 1)
+
+    def test_fetch_while_acting(self):
+        acting = threading.Event()
+        finish = threading.Event()
+        packs = [make_pack('ksit'), make_pack('kbalance')]
+        pipeline, client, agent = self._make_pipeline(
+            [(200, pack) for pack in packs] + [(200, CommandPack())] * 10,
+            interval=0.05, depth=1)
+
+        def write_command(cmd, duration):
+            acting.set()
+            finish.wait(5)
+        agent.write_command.side_effect = write_command
+
+        pipeline.start()
+        self.assertTrue(acting.wait(5))
+
+        # The next one is fetched and queued while the first one is still acting.
+        deadline = time.monotonic() + 5
+        while pipeline.qsize() == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pipeline.qsize(), 1)
+        self.assertEqual(agent.write_command.call_count, 1)
+
+        finish.set()
+        while pipeline.stats['performed'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pipeline.stop(1)
+
+        self.assertEqual(pipeline.stats['performed'], 2)
+        self.assertFalse(pipeline.is_running())
+
+    def test_fetcher_error_stops_pipeline(self):
+        feed = Mock()
+        feed.packs.side_effect = AttributeError('read1')
+        pipeline, _, agent = self._make_pipeline(feed=feed)
+
+        pipeline.start()
+        deadline = time.monotonic() + 5
+        while pipeline.is_running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Not only the actor is kept running.
+        self.assertFalse(pipeline.is_running())
+        self.assertEqual(pipeline.stats['fetch_errors'], 1)
+        agent.write_command.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
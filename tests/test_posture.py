@@ -0,0 +1,119 @@
+import unittest
+from configparser import ConfigParser
+
+from tests.context import *
+from modules.posture import PostureTracker, make_posture_tracker
+
+
+class TestPostureTracker(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def test_posture(self):
+        tracker = PostureTracker()
+        self.assertFalse(tracker.is_redundant('kbalance'))
+
+        tracker.update('kbalance')
+        self.assertEqual(tracker.posture, 'balance')
+        self.assertTrue(tracker.is_redundant('kbalance'))
+        self.assertFalse(tracker.is_redundant('ksit'))
+        self.assertFalse(tracker.is_redundant('d'))
+
+    def test_rest(self):
+        tracker = PostureTracker()
+
+        tracker.update('d')
+        self.assertTrue(tracker.is_redundant('d'))
+        self.assertTrue(tracker.is_redundant('krest'))
+
+    def test_joints(self):
+        tracker = PostureTracker()
+        tracker.update('kzero')
+        self.assertFalse(tracker.is_redundant('m8 30'))
+
+        tracker.update('m8 30')
+        tracker.update('i9 -15 10 0')
+        self.assertTrue(tracker.is_redundant('m8 30'))
+        self.assertTrue(tracker.is_redundant('i9 -15 8 30'))
+        self.assertFalse(tracker.is_redundant('m8 31'))
+        self.assertFalse(tracker.is_redundant('m11 0'))
+
+        # The posture has been changed by the joints.
+        self.assertFalse(tracker.is_redundant('kzero'))
+
+    def test_other_commands_reset(self):
+        tracker = PostureTracker()
+
+        for cmd in ('kwkF', 'khi', 'p', 'm8', 'mx 30'):
+            with self.subTest(cmd=cmd):
+                tracker.update('ksit')
+                tracker.update(cmd)
+                self.assertIsNone(tracker.posture)
+                self.assertFalse(tracker.is_redundant('ksit'))
+                self.assertFalse(tracker.is_redundant(cmd))
+
+    def test_reset(self):
+        tracker = PostureTracker()
+        tracker.update('ksit')
+        tracker.update('m8 30')
+
+        tracker.reset()
+        self.assertFalse(tracker.is_redundant('ksit'))
+        self.assertFalse(tracker.is_redundant('m8 30'))
+
+    def test_policy_of(self):
+        tracker = PostureTracker(policies={'d': 'skip', 'k': 'send', 'kzero': 'skip'})
+        self.assertEqual(tracker.policy_of('d'), 'send')
+
+        tracker.update('d')
+        self.assertEqual(tracker.policy_of('d'), 'skip')
+
+        tracker.update('kbalance')
+        self.assertEqual(tracker.policy_of('kbalance'), 'send')
+
+        tracker.update('kzero')
+        self.assertEqual(tracker.policy_of('kzero'), 'skip')
+
+        tracker.update('m8 30')
+        self.assertEqual(tracker.policy_of('m8 30'), PostureTracker.DEFAULT_POLICY)
+
+    def test_collapse(self):
+        tracker = PostureTracker(policies={'d': 'skip'})
+        tracker.update('d')
+
+        self.assertEqual(tracker.collapse('d'), 'skip')
+        self.assertEqual(tracker.collapse('krest'), 'shorten')
+        self.assertEqual(tracker.collapse('ksit'), 'send')
+        self.assertEqual(tracker.stats, {'skipped': 1, 'shortened': 1})
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            PostureTracker(policies={'d': 'drop'})
+
+        with self.assertRaises(ValueError):
+            PostureTracker(default_policy='drop')
+
+    def test_parse_policies(self):
+        self.assertEqual(PostureTracker.parse_policies('d:skip, kbalance : send,'), {'d': 'skip', 'kbalance': 'send'})
+        self.assertEqual(PostureTracker.parse_policies(''), {})
+
+        with self.assertRaises(ValueError):
+            PostureTracker.parse_policies('d skip')
+
+    def test_make_posture_tracker(self):
+        conf = ConfigParser()
+        conf.read_string('[Petoi]\nelide_redundant = true\nelide_policies = d:skip, m:send\n')
+
+        tracker = make_posture_tracker(conf)
+        self.assertEqual(tracker.policies, {'d': 'skip', 'm': 'send'})
+
+        conf.set('Petoi', 'elide_redundant', 'false')
+        self.assertIsNone(make_posture_tracker(conf))
+        self.assertIsNone(make_posture_tracker(ConfigParser()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import time
+import unittest
+import numpy as np
+
+from tests.context import *
+from modules.serial_agent import CommandPack
+from modules.scenario import ScenarioLibrary
+from modules.preview import MotionPreview
+
+
+class TestPreview(unittest.TestCase):
+
+    SAMPLE_SCENARIOS = f"{os.path.dirname(os.path.abspath(__file__))}/../src/resources/automate.sample.bittle.json"
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def test_replay(self):
+        preview = MotionPreview(min_act_duration=2, start_up_waiting=10, initial={8: 0})
+
+        timeline = preview.replay([
+            ('m8 30', 1),
+            ('', 1),
+            ('i 8 -30 9 10', 3),
+            ('ksit', 5),
+            ('m9 40 9 20', 0),
+        ])
+
+        np.testing.assert_allclose(timeline.times, [10, 12, 13, 16, 21])
+        self.assertEqual(timeline.duration, 23)
+        np.testing.assert_allclose(timeline.angles[:, 8], [30, 30, -30, np.nan, np.nan])
+        np.testing.assert_allclose(timeline.angles[:, 9], [np.nan, np.nan, 10, np.nan, 20])
+        self.assertEqual(timeline.travel[8], 90)
+        # Unknown before and after the skill, then moves from 40 to 20 in the last command.
+        self.assertEqual(timeline.travel[9], 20)
+        self.assertAlmostEqual(timeline.peak_velocity[8], 60 / 0.3)
+
+    def test_motion_shorter_than_sleep(self):
+        preview = MotionPreview(min_act_duration=0, start_up_waiting=0, initial={8: 0})
+
+        timeline = preview.replay([('m8 30', 0.1), ('m8 0', 0)])
+
+        self.assertAlmostEqual(timeline.duration, 0.1)
+        np.testing.assert_allclose(timeline.peak_velocity[8], 300)
+
+    def test_repeated_joint(self):
+        preview = MotionPreview(min_act_duration=0, start_up_waiting=0, initial={0: 0, 8: 0})
+
+        timeline = preview.replay([
+            # Shakes the head in sequence.
+            ('m0 45 0 -45 0 0', 5),
+            # The sub-steps are squeezed into the sleep.
+            ('m8 30 8 0', 0.3),
+            # Simultaneously, only the last one.
+            ('i8 10 8 20', 1),
+        ])
+
+        np.testing.assert_allclose(timeline.angles[:, 0], [0, 0, 0])
+        np.testing.assert_allclose(timeline.angles[:, 8], [0, 0, 20])
+        self.assertEqual(timeline.travel[0], 180)
+        self.assertAlmostEqual(timeline.peak_velocity[0], 90 / 0.3)
+        self.assertEqual(timeline.travel[8], 80)
+        self.assertAlmostEqual(timeline.peak_velocity[8], 30 / 0.15)
+
+    def test_replay_pack(self):
+        pack = CommandPack([{'cmd': 'm8 10', 'duration': 1}, {'cmd': 'm8 40', 'duration': 1}])
+
+        summary = MotionPreview(start_up_waiting=0).replay_pack(pack).summary()
+
+        self.assertEqual(summary, {
+            'duration': 2.0,
+            'commands': 2,
+            'joints': {8: {'travel': 30.0, 'peak_velocity': 100.0}},
+        })
+
+    def test_replay_empty(self):
+        summary = MotionPreview().replay([]).summary()
+
+        self.assertEqual(summary, {'duration': 10.0, 'commands': 0, 'joints': {}})
+
+    def test_replay_library(self):
+        library = ScenarioLibrary.load(self.SAMPLE_SCENARIOS)
+        # The library of the many scenarios.
+        library = ScenarioLibrary(list(library) * 50)
+
+        started = time.perf_counter()
+        timelines = [MotionPreview().replay_scenario(scenario) for scenario in library]
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(timelines), len(library))
+        self.assertLess(elapsed, 1)
+
+        timelines = MotionPreview().replay_library(ScenarioLibrary.load(self.SAMPLE_SCENARIOS))
+        self.assertEqual(timelines['skill-sit-down'].duration, 20)
+        self.assertEqual(timelines['dig-the-ground'].duration, 17)
+        # 15, then 0 and 38 in sequence twice.
+        self.assertEqual(timelines['dig-the-ground'].summary()['joints'][8]['travel'], 129)
+        # Unknown at the start, then from 45 to -45 and 0.
+        self.assertEqual(timelines['no-!'].summary()['joints'][0]['travel'], 135)
+        self.assertIn(13, timelines['not-yet-?'].summary()['joints'])
+
+
+if __name__ == '__main__':
+    unittest.main()
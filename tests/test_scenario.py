@@ -0,0 +1,119 @@
+import os
+import json
+import random
+import unittest
+from unittest.mock import Mock
+
+from tests.context import *
+from modules.joint_validator import JointValidator
+from modules.scenario import Frame, Scenario, ScenarioLibrary, ScenarioError, perform_scenario
+
+
+class TestScenario(unittest.TestCase):
+
+    SAMPLE_SCENARIO = f"{os.path.dirname(os.path.abspath(__file__))}/../src/resources/automate.sample.bittle.json"
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def test_compile(self):
+        library = ScenarioLibrary.compile([
+            {'name': 'walk', 'commands': [
+                {'cmd': 'kbalance', 'duration': 3},
+                {'cmd': 'kwkF', 'duration': '5'},
+                {'cmd': '', 'duration': 1},
+            ]},
+        ])
+
+        self.assertEqual(len(library), 1)
+        self.assertEqual(library['walk'].frames, (
+            Frame(b'kbalance', 3, False),
+            Frame(b'kwkF', 5, True),
+            Frame(b'', 1, False),
+        ))
+        self.assertEqual(library['walk'].duration, 9)
+
+    def test_compile_is_immutable(self):
+        library = ScenarioLibrary.compile([{'name': 'sit', 'commands': [{'cmd': 'ksit', 'duration': 3}]}])
+        frame = library['sit'].frames[0]
+
+        with self.assertRaises(AttributeError):
+            frame.duration = 5
+        with self.assertRaises(TypeError):
+            library['sit'].frames[0] = frame
+
+    def test_compile_reports_all_errors(self):
+        with self.assertRaises(ScenarioError) as cm:
+            ScenarioLibrary.compile([
+                {'name': 'ok', 'commands': [{'cmd': 'ksit', 'duration': 3}]},
+                {'name': 'bad', 'commands': [
+                    {'cmd': 1, 'duration': 3},
+                    {'cmd': 'ksit', 'duration': 301},
+                    {'cmd': 'ksit', 'duration': None},
+                    'ksit',
+                ]},
+                {'name': 'empty', 'commands': []},
+                'no-dict',
+            ])
+
+        errors = cm.exception.errors
+        self.assertEqual(len(errors), 6)
+        self.assertTrue(errors[0].startswith("[1] 'bad' command 0"))
+        self.assertTrue(errors[3].startswith("[1] 'bad' command 3"))
+        self.assertTrue(errors[4].startswith("[2] 'empty'"))
+        self.assertTrue(errors[5].startswith('[3]'))
+
+    def test_compile_reports_joint_errors(self):
+        with self.assertRaises(ScenarioError) as cm:
+            ScenarioLibrary.compile([
+                {'name': 'ok', 'commands': [{'cmd': 'm8 30 9 -30', 'duration': 1}]},
+                {'name': 'bad', 'commands': [
+                    {'cmd': 'm8 30', 'duration': 1},
+                    {'cmd': 'm1 30', 'duration': 1},
+                    {'cmd': 'i 0 120', 'duration': 1},
+                ]},
+            ])
+
+        self.assertEqual(cm.exception.errors, [
+            "[1] 'bad' command 1: Unavailable joint (1). ('m1 30')",
+            "[1] 'bad' command 2: Angle 120 of the joint 0 is out of -90 to 90. ('i 0 120')",
+        ])
+
+        library = ScenarioLibrary.compile(
+            [{'name': 'head', 'commands': [{'cmd': 'i 0 120', 'duration': 1}]}],
+            JointValidator({0: (-120, 120)}))
+        self.assertEqual(library['head'].frames[0].data, b'i 0 120')
+
+    def test_compile_not_list(self):
+        with self.assertRaises(ScenarioError):
+            ScenarioLibrary.compile({'name': 'sit'})
+
+    def test_load_sample(self):
+        with open(self.SAMPLE_SCENARIO) as fp:
+            data = json.load(fp)
+
+        library = ScenarioLibrary.load(self.SAMPLE_SCENARIO)
+
+        self.assertEqual(library.names(), [item['name'] for item in data])
+        for scenario, item in zip(library, data):
+            self.assertEqual([frame.data.decode('utf-8') for frame in scenario.frames],
+                             [command['cmd'] for command in item['commands']])
+
+    def test_choice(self):
+        library = ScenarioLibrary.load(self.SAMPLE_SCENARIO)
+
+        self.assertIn(library.choice(random.Random(0)), library.scenarios)
+
+    def test_perform_scenario(self):
+        agent = Mock(**{'write_frame.return_value': True})
+        scenario = Scenario('sit', (Frame(b'ksit', 3, False), Frame(b'kwkF', 5, True)))
+
+        self.assertTrue(perform_scenario(agent, scenario))
+        self.assertEqual([c.args for c in agent.write_frame.call_args_list],
+                         [(b'ksit', 3, False), (b'kwkF', 5, True)])
+
+
+if __name__ == '__main__':
+    unittest.main()
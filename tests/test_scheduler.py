@@ -0,0 +1,90 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from tests.context import *
+from modules.scheduler import IntervalScheduler
+
+
+class TestScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def _make_scheduler(self, interval, floor=0):
+        clock = FakeClock(now=1000.0)
+        patcher = patch('time.sleep', side_effect=clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return IntervalScheduler(interval, floor=floor, clock=clock), clock
+
+    def test_interval_is_raised_to_floor(self):
+        scheduler = IntervalScheduler(60, floor=180)
+        self.assertEqual(scheduler.interval, 180)
+
+    def test_first_tick_is_immediate(self):
+        scheduler, clock = self._make_scheduler(10)
+
+        self.assertTrue(scheduler.wait())
+        self.assertEqual(scheduler.last_fired_at, 1000.0)
+
+    def test_no_drift(self):
+        scheduler, clock = self._make_scheduler(10)
+
+        fired = []
+        for _ in range(5):
+            scheduler.wait()
+            fired.append(clock.now)
+            # The work takes time.
+            clock.sleep(3.7)
+
+        self.assertEqual(fired, [1000.0, 1010.0, 1020.0, 1030.0, 1040.0])
+
+    def test_skip_missed_ticks(self):
+        scheduler, clock = self._make_scheduler(10)
+
+        scheduler.wait()
+        clock.sleep(25)
+        scheduler.wait()
+        fired_late = clock.now
+        scheduler.wait()
+
+        self.assertEqual(fired_late, 1025.0)
+        self.assertEqual(scheduler.skipped, 1)
+        # Back on the grid.
+        self.assertEqual(clock.now, 1030.0)
+
+    def test_never_faster_than_floor(self):
+        scheduler, clock = self._make_scheduler(10, floor=10)
+
+        scheduler.wait()
+        clock.sleep(19)
+        scheduler.wait()
+        fired_late = clock.now
+        scheduler.wait()
+
+        self.assertEqual(fired_late, 1019.0)
+        self.assertGreaterEqual(clock.now - fired_late, 10)
+
+    def test_time_until_next(self):
+        scheduler, clock = self._make_scheduler(10)
+
+        self.assertEqual(scheduler.time_until_next(), 0)
+        scheduler.wait()
+        clock.sleep(4)
+        self.assertEqual(scheduler.time_until_next(), 6)
+
+    def test_stop_event(self):
+        scheduler = IntervalScheduler(60)
+        stop_event = threading.Event()
+
+        self.assertTrue(scheduler.wait(stop_event))
+        threading.Timer(0.05, stop_event.set).start()
+        self.assertFalse(scheduler.wait(stop_event))
+        self.assertEqual(scheduler.ticks, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
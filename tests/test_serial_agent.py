@@ -1,4 +1,6 @@
 from datetime import date
+import json
+import threading
 import unittest
 from unittest import mock
 from unittest.case import SkipTest
@@ -6,7 +8,55 @@ from unittest.mock import Mock, MagicMock, call, patch
 import serial
 
 from tests.context import *
-from modules.serial_agent import SerialAgent
+from modules.serial_agent import SerialAgent, CommandPack
+from modules.posture import PostureTracker
+
+
+class FakeSerial:
+    """Minimal stand-in of the 'serial.Serial' fed lines from the test."""
+
+    def __init__(self, timeout=0.05) -> None:
+        self.is_open = True
+        self.timeout = timeout
+        self.written = []
+        self.on_write = None
+        self._rx = bytearray()
+        self._rx_cond = threading.Condition()
+
+    def feed(self, *lines):
+        self.feed_bytes(b''.join(line.encode('utf-8') + b'\r\n' for line in lines))
+
+    def feed_bytes(self, data):
+        with self._rx_cond:
+            self._rx += data
+            self._rx_cond.notify_all()
+
+    @property
+    def in_waiting(self):
+        return len(self._rx)
+
+    def read(self, size=1):
+        with self._rx_cond:
+            self._rx_cond.wait_for(lambda: len(self._rx) > 0, self.timeout)
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+        return data
+
+    def write(self, data):
+        self.written.append(data)
+        if self.on_write is not None:
+            self.on_write(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def open(self):
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
 
 class TestSerialAgent(unittest.TestCase):
 
@@ -18,14 +68,25 @@ class TestSerialAgent(unittest.TestCase):
         return super().setUpClass()
 
     def setUp(self) -> None:
-        self.time_sleep_patcher = patch('time.sleep')
+        # The waiting for the messages ends at the deadline of the clock, advanced by the sleeping.
+        self.clock = FakeClock(step=0.0005)
+        self.time_sleep_patcher = patch('time.sleep', side_effect=self.clock.sleep)
         self.time_sleep_mock = self.time_sleep_patcher.start()
+        self.time_monotonic_patcher = patch('time.monotonic', side_effect=self.clock)
+        self.time_monotonic_patcher.start()
         return super().setUp()
 
     def tearDown(self) -> None:
+        if self.time_monotonic_patcher is not None:
+            self.time_monotonic_patcher.stop()
         self.time_sleep_patcher.stop()
         return super().tearDown()
 
+    def _use_real_monotonic(self):
+        # The reader thread wakes up the waiting in real time, not by the sleeping.
+        self.time_monotonic_patcher.stop()
+        self.time_monotonic_patcher = None
+
     def addCleanup(self, function, *args, **kwargs) -> None:
         patch.stopall()
         return super().addCleanup(function, *args, **kwargs)
@@ -81,7 +142,7 @@ class TestSerialAgent(unittest.TestCase):
             agent.open_port()
             serial_mock.open.assert_called()
 
-    @patch('serial.Serial', **{'readline.return_value': b'DMP ready!'})
+    @patch('serial.Serial', **{'read.return_value': b'DMP ready!\r\n', 'in_waiting': 12})
     def test_open_port_for_already_open(self, serial_mock):
         agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=serial_mock)
         agent._ser = serial_mock
@@ -123,8 +184,8 @@ class TestSerialAgent(unittest.TestCase):
 
         self.assertTrue(res)
         serial_mock.write.assert_not_called()
-        expected_calls = [call(SerialAgent.START_UP_WAITING), call(1)]
-        self.time_sleep_mock.assert_has_calls(expected_calls)
+        self.time_sleep_mock.assert_called_with(1)
+        self.assertNotIn(call(SerialAgent.START_UP_WAITING), self.time_sleep_mock.call_args_list)
         
     @patch('serial.Serial', **{'write.return_value': 1})
     def test_write_command_with_too_short_duration(self, serial_mock):
@@ -135,8 +196,496 @@ class TestSerialAgent(unittest.TestCase):
 
         self.assertTrue(res)
         serial_mock.write.assert_called()
-        expected_calls = [call(SerialAgent.START_UP_WAITING), call(SerialAgent.MIN_ACT_DURATION)]
-        self.time_sleep_mock.assert_has_calls(expected_calls)
+        self.time_sleep_mock.assert_called_with(SerialAgent.MIN_ACT_DURATION)
+
+    def test_read_port(self):
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial)
+
+        fake_serial.feed('Initialize I2C', 'DMP ready!')
+        self.assertEqual(agent.read_port(), ['Initialize I2C', 'DMP ready!'])
+        self.assertEqual(agent.read_port(), [])
+
+    def test_read_port_keeps_partial_line(self):
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial)
+
+        fake_serial.feed_bytes(b'Enable DMP\r\nDMP re')
+        self.assertEqual(agent.read_port(), ['Enable DMP'])
+
+        fake_serial.feed_bytes(b'ady!\n\r\n')
+        self.assertEqual(agent.read_port(), ['DMP ready!', ''])
+
+    def test_create_instance_waits_until_ready(self):
+        fake_serial = FakeSerial()
+        fake_serial.feed('Initialize I2C', 'DMP ready!')
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial)
+
+        self.assertTrue(agent.is_board_ready)
+        self.assertNotIn(call(SerialAgent.START_UP_WAITING), self.time_sleep_mock.call_args_list)
+
+    def test_wait_until_ready_timeout(self):
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial, start_up_waiting=1)
+        self.assertFalse(agent.is_board_ready)
+
+        fake_serial.feed('Initialize I2C')
+        self.assertFalse(agent.wait_until_ready(0.5))
+        self.time_sleep_mock.assert_any_call(SerialAgent.REPEAT_READ_DELAY)
+
+        fake_serial.feed('DMP ready!')
+        self.assertTrue(agent.wait_until_ready(0.5))
+
+    def test_wait_until_ready_with_reader_thread(self):
+        self._use_real_monotonic()
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial,
+                            reader_thread=True, start_up_waiting=0.1)
+        self.addCleanup(agent.stop_reader)
+        self.assertFalse(agent.is_board_ready)
+
+        threading.Timer(0.05, fake_serial.feed, args=('DMP ready!',)).start()
+        self.assertTrue(agent.wait_until_ready(2))
+
+    def test_close_port_resets_board_ready(self):
+        fake_serial = FakeSerial()
+        fake_serial.feed('DMP ready!')
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial)
+        self.assertTrue(agent.is_ready())
+
+        agent.close_port()
+        self.assertFalse(agent.is_board_ready)
+
+    def _make_ack_agent(self, **kwargs):
+        fake_serial = FakeSerial()
+        fake_serial.feed('DMP ready!')
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial, ack_pacing=True, **kwargs)
+        return agent, fake_serial
+
+    def test_write_command_with_ack_pacing(self):
+        agent, fake_serial = self._make_ack_agent()
+        fake_serial.on_write = lambda data: fake_serial.feed(data.decode()[0])
+
+        self.time_sleep_mock.reset_mock()
+        res = agent.write_command('ksit', 10)
+
+        self.assertTrue(res)
+        self.assertEqual(fake_serial.written, [b'ksit'])
+        self.time_sleep_mock.assert_not_called()
+
+    def test_write_command_with_ack_pacing_timeout(self):
+        agent, fake_serial = self._make_ack_agent()
+
+        started = self.clock.now
+        res = agent.write_command('ksit', 2)
+
+        # Waits up to the duration (clamped to the min_act_duration).
+        self.assertTrue(res)
+        self.time_sleep_mock.assert_any_call(SerialAgent.REPEAT_READ_DELAY)
+        self.assertAlmostEqual(self.clock.now - started, SerialAgent.MIN_ACT_DURATION, delta=0.1)
+
+    def test_write_command_with_ack_pacing_for_continuous_skill(self):
+        agent, fake_serial = self._make_ack_agent(min_act_duration=1)
+        fake_serial.on_write = lambda data: fake_serial.feed(data.decode()[0])
+
+        agent.write_command('kwkF', 3)
+        self.time_sleep_mock.assert_called_with(3)
+
+    def test_write_command_with_ack_pacing_error(self):
+        agent, fake_serial = self._make_ack_agent()
+        fake_serial.on_write = lambda data: fake_serial.feed('wrong key!')
+
+        self.time_sleep_mock.reset_mock()
+        agent.write_command('kxx', 10)
+
+        self.time_sleep_mock.assert_not_called()
+        self.assertTrue(agent.has_error_response())
+        self.assertFalse(agent.has_error_response())
+
+    def test_write_command_with_ack_pacing_ignores_stale_ack(self):
+        agent, fake_serial = self._make_ack_agent(min_act_duration=1)
+        # Only the gait is acknowledged, its echo is left unread.
+        fake_serial.on_write = lambda data: fake_serial.feed('k') if data == b'kwkF' else None
+
+        agent.write_command('kwkF', 3)
+        fake_serial.feed('wrong key!')
+        self.time_sleep_mock.reset_mock()
+        agent.write_command('ksit', 1)
+
+        # Waits for its own acknowledgement, not returns at the echo of the gait.
+        self.time_sleep_mock.assert_any_call(SerialAgent.REPEAT_READ_DELAY)
+        self.assertTrue(agent.has_error_response())
+
+    def test_write_frame(self):
+        agent, fake_serial = self._make_ack_agent()
+        fake_serial.on_write = lambda data: fake_serial.feed(data.decode()[0])
+
+        self.time_sleep_mock.reset_mock()
+        res = agent.write_frame(b'm8 15 9 0', 10)
+
+        self.assertTrue(res)
+        self.assertEqual(fake_serial.written, [b'm8 15 9 0'])
+        self.time_sleep_mock.assert_not_called()
+
+    def test_write_frame_continuous(self):
+        agent, fake_serial = self._make_ack_agent(min_act_duration=1)
+        fake_serial.on_write = lambda data: fake_serial.feed(data.decode()[0])
+
+        agent.write_frame(b'kwkF', 3, continuous=True)
+        self.time_sleep_mock.assert_called_with(3)
+
+    def test_write_frame_just_sleep(self):
+        agent, fake_serial = self._make_ack_agent()
+
+        res = agent.write_frame(b'', 1)
+
+        self.assertTrue(res)
+        self.assertEqual(fake_serial.written, [])
+        self.time_sleep_mock.assert_called_with(1)
+
+    def test_send_frame(self):
+        agent, fake_serial = self._make_ack_agent()
+
+        self.time_sleep_mock.reset_mock()
+        res = agent.send_frame(b'i8 15 9 0')
+
+        self.assertTrue(res)
+        self.assertEqual(fake_serial.written, [b'i8 15 9 0'])
+        self.time_sleep_mock.assert_not_called()
+        self.assertEqual(agent.metrics.counters['bytes_out'].value, 9)
+
+    def test_write_command_with_posture_tracker(self):
+        agent, fake_serial = self._make_ack_agent(
+            posture_tracker=PostureTracker(policies={'d': 'skip'}))
+        fake_serial.on_write = lambda data: fake_serial.feed(data.decode()[0])
+
+        agent.write_command('kbalance', 10)
+        self.time_sleep_mock.reset_mock()
+
+        # Shortened: not sent, and not waits with the ack_pacing.
+        self.assertTrue(agent.write_command('kbalance', 2))
+        self.time_sleep_mock.assert_not_called()
+
+        agent.write_command('d', 10)
+        self.time_sleep_mock.reset_mock()
+
+        # Skipped: neither sent nor sleeps.
+        self.assertTrue(agent.write_command('d', 10))
+        self.time_sleep_mock.assert_not_called()
+
+        self.assertEqual(fake_serial.written, [b'kbalance', b'd'])
+        self.assertEqual(agent.metrics.counters['commands_collapsed'].value, 2)
+
+    def test_write_command_with_posture_tracker_shorten(self):
+        fake_serial = FakeSerial()
+        fake_serial.feed('DMP ready!')
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial, posture_tracker=PostureTracker())
+
+        agent.write_command('kbalance', 10)
+        self.time_sleep_mock.reset_mock()
+
+        # Not sent, just sleeps the duration (not raised to the min_act_duration).
+        self.assertTrue(agent.write_command('kbalance', 2))
+        self.time_sleep_mock.assert_called_once_with(2)
+        self.assertEqual(fake_serial.written, [b'kbalance'])
+
+    def test_write_frame_with_posture_tracker_joints(self):
+        agent, fake_serial = self._make_ack_agent(posture_tracker=PostureTracker())
+        fake_serial.on_write = lambda data: fake_serial.feed(data.decode()[0])
+
+        agent.write_frame(b'ksit', 10)
+        agent.send_frame(b'i8 30 9 0')
+        agent.write_frame(b'm8 30', 10)
+        agent.write_frame(b'm8 45', 10)
+        agent.write_frame(b'ksit', 10)
+
+        self.assertEqual(fake_serial.written, [b'ksit', b'i8 30 9 0', b'm8 45', b'ksit'])
+        self.assertEqual(agent.metrics.counters['commands_collapsed'].value, 1)
+
+    def test_posture_tracker_reset(self):
+        agent, fake_serial = self._make_ack_agent(posture_tracker=PostureTracker())
+        fake_serial.on_write = lambda data: fake_serial.feed(data.decode()[0])
+
+        # The error response of the board.
+        agent.write_command('ksit', 10)
+        fake_serial.feed('wrong key!')
+        agent.read_port()
+        agent.write_command('ksit', 10)
+
+        # The reconnection.
+        agent.close_port()
+        fake_serial.feed('DMP ready!')
+        agent.write_command('ksit', 10)
+
+        self.assertEqual(fake_serial.written, [b'ksit'] * 3)
+        self.assertEqual(agent.metrics.counters['commands_collapsed'].value, 0)
+
+    def _make_stream_agent(self):
+        agent, fake_serial = self._make_ack_agent()
+        clock = FakeClock(step=0.0005)
+        self.time_sleep_mock.side_effect = clock.sleep
+        sent_at = []
+        fake_serial.on_write = lambda data: sent_at.append(clock.now)
+        return agent, fake_serial, clock, sent_at
+
+    def test_stream_frames(self):
+        agent, fake_serial, clock, sent_at = self._make_stream_agent()
+
+        stats = agent.stream_frames([b'i8 0', b'', b'i8 10', 'i8 20'], 50, clock=clock)
+
+        self.assertEqual(fake_serial.written, [b'i8 0', b'i8 10', b'i8 20'])
+        for at, deadline in zip(sent_at, (0, 0.04, 0.06)):
+            self.assertAlmostEqual(at - sent_at[0], deadline, delta=0.002)
+        self.assertEqual(
+            {k: stats[k] for k in ('frames', 'sent', 'missed', 'dropped', 'failed')},
+            {'frames': 4, 'sent': 3, 'missed': 0, 'dropped': 0, 'failed': 0})
+        self.assertLess(stats['jitter_max'], 0.002)
+        self.assertEqual(agent.metrics.histograms['frame_lateness'].count, 3)
+
+    def test_stream_frames_corrects_drift(self):
+        agent, fake_serial, clock, sent_at = self._make_stream_agent()
+        # The second write takes 2.5 periods.
+        fake_serial.on_write = lambda data: (
+            sent_at.append(clock.now), data == b'i8 1' and clock.sleep(0.05))
+
+        stats = agent.stream_frames([f'i8 {i}'.encode() for i in range(6)], 50, clock=clock)
+
+        self.assertEqual(len(fake_serial.written), 6)
+        self.assertEqual(stats['missed'], 1)
+        self.assertEqual(agent.metrics.counters['frames_missed'].value, 1)
+        self.assertGreaterEqual(stats['jitter_max'], 0.02)
+        # Back on the schedule after the late ones, not shifted by the delay.
+        self.assertAlmostEqual(sent_at[-1] - sent_at[0], 0.1, delta=0.002)
+
+    def test_stream_frames_drop_late(self):
+        agent, fake_serial, clock, _ = self._make_stream_agent()
+        fake_serial.on_write = lambda data: data == b'i8 1' and clock.sleep(0.05)
+
+        stats = agent.stream_frames(
+            [f'i8 {i}'.encode() for i in range(4)], 50, drop_late=True, clock=clock)
+
+        self.assertEqual(fake_serial.written, [b'i8 0', b'i8 1', b'i8 3'])
+        self.assertEqual((stats['missed'], stats['dropped'], stats['sent']), (1, 1, 3))
+
+    def test_stream_frames_stop(self):
+        agent, fake_serial, clock, _ = self._make_stream_agent()
+        stop_event = threading.Event()
+        stop_event.set()
+
+        stats = agent.stream_frames([b'i8 0'], 50, stop_event=stop_event, clock=clock)
+
+        self.assertEqual(fake_serial.written, [])
+        self.assertEqual(stats['frames'], 0)
+        with self.assertRaises(ValueError):
+            agent.stream_frames([b'i8 0'], 0)
+
+    def test_serial_throughput(self):
+        agent, _ = self._make_ack_agent()
+
+        self.assertEqual(agent.serial_throughput(), SerialAgent.BAUNDRATE / 10)
+
+        agent.metrics.observe('write', 0.001)
+        agent.metrics.observe('flush', 0.009)
+        agent.metrics.inc('bytes_out', 100)
+        self.assertAlmostEqual(agent.serial_throughput(), 10000)
+
+    def test_is_continuous_skill(self):
+        agent, _ = self._make_ack_agent()
+
+        self.assertTrue(agent.is_continuous_skill('kwkF'))
+        self.assertTrue(agent.is_continuous_skill('kbk'))
+        self.assertFalse(agent.is_continuous_skill('kbalance'))
+        self.assertFalse(agent.is_continuous_skill('m0 45'))
+
+    def test_metrics(self):
+        fake_serial = FakeSerial()
+        fake_serial.feed('DMP ready!')
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial)
+
+        agent.write_command('ksit', 5)
+        fake_serial.feed('k', 'wrong key!')
+        agent.read_port()
+
+        snapshot = agent.metrics.snapshot()
+        self.assertEqual(snapshot['counters']['bytes_out'], 4)
+        self.assertEqual(snapshot['counters']['bytes_in'], len(b'DMP ready!\r\nk\r\nwrong key!\r\n'))
+        self.assertEqual(snapshot['counters']['lines_read'], 3)
+        self.assertEqual(snapshot['counters']['board_errors'], 1)
+        self.assertEqual(snapshot['histograms']['write']['count'], 1)
+        self.assertEqual(snapshot['histograms']['flush']['count'], 1)
+        self.assertEqual(snapshot['histograms']['wait']['count'], 1)
+        self.assertEqual(snapshot['histograms']['read_drain']['count'], 2)
+
+    def test_metrics_reconnects(self):
+        fake_serial = FakeSerial()
+        fake_serial.feed('DMP ready!')
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial)
+        agent.close_port()
+
+        fake_serial.feed('DMP ready!')
+        agent.write_command('', 1)
+
+        snapshot = agent.metrics.snapshot()
+        self.assertEqual(snapshot['counters']['reconnects'], 1)
+        self.assertEqual(snapshot['histograms']['reopen']['count'], 1)
+
+    def _wait_until(self, predicate, timeout=2, interval=0.01):
+        # Note: 'time.sleep' is patched, so wait with an event instead.
+        waiter = threading.Event()
+        for _ in range(int(timeout / interval)):
+            if predicate():
+                return
+            waiter.wait(interval)
+
+    def test_read_port_with_reader_thread(self):
+        self._use_real_monotonic()
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial,
+                            reader_thread=True, start_up_waiting=0.1)
+        self.addCleanup(agent.stop_reader)
+
+        fake_serial.feed('Initialize I2C', 'DMP ready!')
+        self._wait_until(lambda: len(agent._reader._lines) == 2)
+
+        self.assertEqual(agent.read_port(), ['Initialize I2C', 'DMP ready!'])
+        self.assertEqual(agent.read_port(), [])
+
+    def test_is_ready_with_reader_thread(self):
+        self._use_real_monotonic()
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial,
+                            reader_thread=True, start_up_waiting=0.1)
+        self.addCleanup(agent.stop_reader)
+
+        self.assertFalse(agent.is_ready())
+
+        fake_serial.feed('MPU successful', 'DMP ready!')
+        self._wait_until(lambda: len(agent._reader._lines) == 2)
+        self.assertTrue(agent.is_ready())
+
+    def test_has_error_response_with_reader_thread(self):
+        self._use_real_monotonic()
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial,
+                            reader_thread=True, start_up_waiting=0.1)
+        self.addCleanup(agent.stop_reader)
+
+        fake_serial.feed('wrong key!')
+        self._wait_until(lambda: len(agent._reader._lines) == 1)
+        self.assertTrue(agent.has_error_response())
+        self.assertFalse(agent.has_error_response())
+
+    def test_reader_thread_drops_oldest_lines(self):
+        self._use_real_monotonic()
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial,
+                            reader_thread=True, read_buffer_size=3, start_up_waiting=0.1)
+        self.addCleanup(agent.stop_reader)
+
+        fake_serial.feed('1', '2', '3', '4', '5')
+        self._wait_until(lambda: agent._reader.dropped == 2)
+
+        self.assertEqual(agent.read_port(), ['3', '4', '5'])
+        self.assertEqual(agent._reader.dropped, 2)
+
+    def test_close_port_clears_reader_thread(self):
+        self._use_real_monotonic()
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial,
+                            reader_thread=True, start_up_waiting=0.1)
+        self.addCleanup(agent.stop_reader)
+
+        fake_serial.feed_bytes(b'Enable DMP\r\nDMP re')
+        self._wait_until(lambda: len(agent._reader._lines) == 1 and fake_serial.in_waiting == 0)
+        agent.close_port()
+
+        # The board is reset, the partial line is not glued onto the first line after it.
+        fake_serial.feed('DMP ready!')
+        fake_serial.open()
+        self._wait_until(lambda: len(agent._reader._lines) > 0)
+        self.assertEqual(agent.read_port(), ['DMP ready!'])
+
+    def test_stop_reader(self):
+        self._use_real_monotonic()
+        fake_serial = FakeSerial()
+        agent = SerialAgent(self.TEST_SERIAL_PORT, serial_api=fake_serial,
+                            reader_thread=True, start_up_waiting=0.1)
+        reader = agent._reader
+
+        agent.stop_reader()
+        self.assertFalse(reader.is_alive())
+        self.assertIsNone(agent._reader)
+
+
+class TestCommandPack(unittest.TestCase):
+
+    SAMPLE_ITEMS = [
+        {'cmd': 'kbalance', 'duration': 3},
+        {'cmd': 'm8 15 9 0', 'duration': 1},
+        {'cmd': '', 'duration': 0},
+        {'cmd': 'kwkF', 'duration': 300},
+    ]
+
+    def test_items(self):
+        pack = CommandPack(self.SAMPLE_ITEMS)
+
+        self.assertEqual(len(pack.items), 4)
+        self.assertEqual(pack.items, self.SAMPLE_ITEMS)
+        self.assertEqual(list(pack.items), self.SAMPLE_ITEMS)
+        self.assertEqual(pack.items[1], {'cmd': 'm8 15 9 0', 'duration': 1})
+        self.assertEqual(pack.items[-1], {'cmd': 'kwkF', 'duration': 300})
+        self.assertEqual(pack.items[1:3], self.SAMPLE_ITEMS[1:3])
+        with self.assertRaises(IndexError):
+            pack.items[4]
+
+    def test_items_from_json(self):
+        pack = CommandPack(json.dumps({'commandPack': [
+            {'cmd': 'ksit', 'duration': '5'},
+            {'cmd': 'kzero', 'duration': 301},
+            {'cmd': 1, 'duration': 1},
+            'kbalance',
+            {'cmd': 'kstr ✓', 'duration': 2},
+        ]}))
+
+        self.assertEqual(pack.items, [
+            {'cmd': 'ksit', 'duration': 5},
+            {'cmd': 'kstr ✓', 'duration': 2},
+        ])
+
+    def test_empty(self):
+        pack = CommandPack()
+
+        self.assertFalse(pack.items)
+        self.assertEqual(pack.items, [])
+        self.assertEqual(repr(pack), 'Empty')
+
+    def test_frames(self):
+        pack = CommandPack(self.SAMPLE_ITEMS)
+
+        self.assertEqual(list(pack.frames()), [
+            (b'kbalance', 3), (b'm8 15 9 0', 1), (b'', 0), (b'kwkF', 300)])
+
+    def test_set_item_and_clear_items(self):
+        pack = CommandPack()
+
+        self.assertTrue(pack.set_item('ksit', '3'))
+        self.assertFalse(pack.set_item('ksit', 'x'))
+        self.assertFalse(pack.set_item(None, 3))
+        self.assertEqual(pack.items, [{'cmd': 'ksit', 'duration': 3}])
+        self.assertEqual(repr(pack), 'cmd:ksit, duration:3')
+
+        pack.clear_items()
+        self.assertEqual(len(pack.items), 0)
+
+    def test_items_are_read_only(self):
+        pack = CommandPack(self.SAMPLE_ITEMS)
+
+        pack.items[0]['cmd'] = 'krest'
+        with self.assertRaises(TypeError):
+            pack.items[0] = {'cmd': 'krest', 'duration': 1}
+
+        self.assertEqual(pack.items[0]['cmd'], 'kbalance')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,116 @@
+import threading
+import unittest
+from unittest.mock import Mock
+import numpy as np
+
+from tests.context import *
+from modules.joint_validator import JointValidator
+from modules.trajectory import Keyframe, Trajectory, max_frame_rate, play
+
+
+def make_agent(throughput=11520):
+    agent = Mock()
+    agent.serial_throughput.return_value = throughput
+    agent.stream_frames.return_value = {'sent': 3}
+    return agent
+
+
+class TestTrajectory(unittest.TestCase):
+
+    KEYFRAMES = [
+        Keyframe(0, {8: 0, 9: 0}),
+        Keyframe(0.5, {8: 45}),
+        Keyframe(1.0, {8: 0, 9: 30}),
+    ]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Trajectory(self.KEYFRAMES, profile='spline')
+        with self.assertRaises(ValueError):
+            Trajectory([])
+        with self.assertRaises(ValueError):
+            Trajectory([(0, {8: 0}), (0, {8: 10})])
+        with self.assertRaises(ValueError):
+            Trajectory(self.KEYFRAMES).sample(0)
+
+    def test_holds_missing_joints(self):
+        trajectory = Trajectory([(0, {8: 10}), (1, {9: 20}), (2, {8: 30})])
+
+        np.testing.assert_array_equal(trajectory.joints, [8, 9])
+        np.testing.assert_array_equal(trajectory.angles, [[10, 20], [10, 20], [30, 20]])
+
+    def test_sample_passes_keyframes(self):
+        for profile in Trajectory.PROFILES:
+            with self.subTest(profile=profile):
+                times, angles = Trajectory(self.KEYFRAMES, profile=profile).sample(10)
+
+                self.assertEqual(len(times), 11)
+                np.testing.assert_allclose(angles[[0, 5, 10]], [[0, 0], [45, 0], [0, 30]])
+
+    def test_sample_profiles(self):
+        _, linear = Trajectory(self.KEYFRAMES, profile='linear').sample(10)
+        _, min_jerk = Trajectory(self.KEYFRAMES, profile='min-jerk').sample(10)
+
+        np.testing.assert_allclose(linear[:6, 0], [0, 9, 18, 27, 36, 45])
+        # Slow at the keyframes, fast in the middle.
+        self.assertLess(min_jerk[1, 0], linear[1, 0])
+        self.assertAlmostEqual(min_jerk[3, 0] - min_jerk[2, 0], 16.4, places=1)
+
+    def test_sample_last_keyframe(self):
+        times, angles = Trajectory([(0, {8: 0}), (0.25, {8: 10})], profile='linear').sample(10)
+
+        np.testing.assert_allclose(times, [0, 0.1, 0.2, 0.25])
+        self.assertEqual(angles[-1, 0], 10)
+
+    def test_frames(self):
+        frames = Trajectory(self.KEYFRAMES, profile='linear').frames(4)
+
+        self.assertEqual(frames, [b'i8 0 9 0', b'i8 22', b'i8 45', b'i8 22 9 15', b'i8 0 9 30'])
+        self.assertEqual(JointValidator().validate(frame.decode() for frame in frames), [])
+
+        frames = Trajectory([(0, {8: 0}), (1, {8: 0})]).frames(2, changed_only=False)
+        self.assertEqual(frames, [b'i8 0', b'i8 0', b'i8 0'])
+        frames = Trajectory([(0, {8: 0}), (1, {8: 0})]).frames(2)
+        self.assertEqual(frames, [b'i8 0', b'', b''])
+
+    def test_max_frame_rate(self):
+        agent = make_agent(throughput=1000)
+
+        self.assertAlmostEqual(max_frame_rate(agent, [b'i8 0', b'', b'i8 10 9 10']), 80)
+        self.assertEqual(max_frame_rate(agent, [b'']), float('inf'))
+
+    def test_play(self):
+        agent = make_agent()
+        trajectory = Trajectory(self.KEYFRAMES)
+        stop_event = threading.Event()
+
+        stats = play(agent, trajectory, rate=100, stop_event=stop_event)
+
+        agent.stream_frames.assert_called_once_with(
+            trajectory.frames(100), 100, drop_late=True, stop_event=stop_event)
+        self.assertEqual(stats, {'rate': 100, 'sent': 3})
+
+    def test_play_limited_by_throughput(self):
+        agent = make_agent(throughput=100)
+        trajectory = Trajectory(self.KEYFRAMES)
+
+        stats = play(agent, trajectory, rate=1000)
+
+        frames, rate = agent.stream_frames.call_args.args
+        self.assertLess(stats['rate'], 1000)
+        self.assertEqual(rate, stats['rate'])
+        self.assertLessEqual(rate, max_frame_rate(agent, frames))
+        self.assertEqual(frames, trajectory.frames(rate))
+
+        # Sampled at the limited rate, the motion isn't stretched.
+        played = (len(frames) - 1) / rate
+        self.assertGreaterEqual(played, trajectory.duration)
+        self.assertLess(played, trajectory.duration + 1 / rate)
+
+if __name__ == '__main__':
+    unittest.main()
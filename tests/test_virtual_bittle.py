@@ -0,0 +1,96 @@
+import time
+import unittest
+
+from tests.context import *
+from modules.serial_agent import SerialAgent
+from modules.virtual_bittle import VirtualBittle
+
+
+class TestVirtualBittle(unittest.TestCase):
+    """Testing the SerialAgent end to end against the emulator."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        init_test_logger()
+        return super().setUpClass()
+
+    def setUp(self) -> None:
+        self.bittle = VirtualBittle(
+            boot_time=0.1, motion_durations={'k': 0.2, 'm': 0.05, 'd': 0.2})
+        self.bittle.start()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.bittle.stop()
+        return super().tearDown()
+
+    def _make_agent(self, **kwargs):
+        agent = SerialAgent(port=self.bittle.port, start_up_waiting=2, **kwargs)
+        self.addCleanup(agent.close_port)
+        return agent
+
+    def test_boot_sequence(self):
+        agent = self._make_agent()
+
+        self.assertTrue(agent.is_ready())
+        self.assertEqual(self.bittle.boot_count, 1)
+
+    def test_boot_on_reopen(self):
+        agent = self._make_agent()
+        agent.close_port()
+
+        agent.open_port()
+        self.assertTrue(agent.is_ready())
+        self.assertEqual(self.bittle.boot_count, 2)
+
+    def test_write_command_with_ack_pacing(self):
+        agent = self._make_agent(ack_pacing=True, min_act_duration=0)
+
+        started = time.monotonic()
+        self.assertTrue(agent.write_command('ksit', 5))
+        elapsed = time.monotonic() - started
+
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 1)
+        self.assertEqual(self.bittle.received, ['ksit'])
+        self.assertEqual(self.bittle.posture, 'sit')
+        self.assertFalse(agent.has_error_response())
+
+    def test_joint_command(self):
+        agent = self._make_agent(ack_pacing=True, min_act_duration=0)
+
+        agent.write_command('m8 15 9 0 13 30', 5)
+        self.assertEqual(self.bittle.joints[8], 15)
+        self.assertEqual(self.bittle.joints[13], 30)
+
+    def test_wrong_key(self):
+        agent = self._make_agent(ack_pacing=True, min_act_duration=0)
+
+        agent.write_command('kunknown', 1)
+        self.assertTrue(agent.has_error_response())
+
+    def test_undecodable_bytes(self):
+        agent = self._make_agent(ack_pacing=True, min_act_duration=0)
+
+        agent.send_frame(b'\xff\xfe')
+        time.sleep(0.2)
+        agent.write_command('ksit', 5)
+
+        self.assertTrue(self.bittle._thread.is_alive())
+        self.assertEqual(self.bittle.received, ['ksit'])
+
+    def test_rest(self):
+        agent = self._make_agent(ack_pacing=True, min_act_duration=0)
+
+        agent.write_command('d', 5)
+        self.assertEqual(self.bittle.posture, 'rest')
+
+    def test_is_known_skill(self):
+        self.assertTrue(self.bittle.is_known_skill('balance'))
+        self.assertTrue(self.bittle.is_known_skill('wkF'))
+        self.assertTrue(self.bittle.is_known_skill('bk'))
+        self.assertFalse(self.bittle.is_known_skill('wkX'))
+
+
+if __name__ == '__main__':
+    unittest.main()